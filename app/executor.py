@@ -0,0 +1,128 @@
+"""
+Execution layer for CPU-bound inference in the API.
+
+Route handlers are async, so inference must not run on the event loop: one
+slow call would stall every other request. InferenceExecutor runs it on a
+thread pool or a process pool instead. A process pool gives pure-Python
+work one core per worker, free of the GIL.
+
+Admission is bounded. At most workers + max_queue calls are in flight;
+beyond that, slot() raises Overloaded right away (the API answers 503 with
+Retry-After) instead of letting the backlog and everyone's latency grow.
+A request that dispatches several pool calls at once (face, voice and text
+in /infer) takes one slot per call.
+
+Calls that touch in-process state (such as the text cache) must use
+local=True. Those always run on the thread pool, and they still count
+against the same limit. State that is not thread-safe (the streaming
+sessions) stays on the event loop.
+"""
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+KINDS = ("thread", "process")
+
+
+class Overloaded(Exception):
+    """Every worker is busy and the queue is full."""
+
+
+class InferenceExecutor:
+    """
+    Bounded thread- or process-pool dispatch for async handlers.
+
+    Args:
+        kind: "thread" or "process"
+        workers: Pool size (defaults to the CPU count)
+        max_queue: Calls allowed to wait for a worker before new ones are rejected
+    """
+
+    def __init__(self, kind: str = "thread", workers: Optional[int] = None, max_queue: int = 64):
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}, got {kind!r}")
+        self.kind = kind
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.max_queue = max(0, int(max_queue))
+        self.max_in_flight = self.workers + self.max_queue
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """Thread pool for local calls (created on first use)."""
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(self.workers, thread_name_prefix="inference")
+            return self._thread_pool
+
+    def _pool(self, local: bool) -> Executor:
+        if local or self.kind == "thread":
+            return self.thread_pool
+        with self._lock:
+            if self._process_pool is None:
+                # spawn, not fork: the server process has running threads
+                self._process_pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._process_pool
+
+    @contextlib.asynccontextmanager
+    async def slot(self, calls: int = 1):
+        """
+        Hold in-flight slots for the duration of the block.
+
+        Args:
+            calls: Pool calls the block dispatches concurrently (capped at
+                max_in_flight, so a large request can still run on an idle server)
+
+        Raises:
+            Overloaded: when the slots would exceed max_in_flight
+        """
+        calls = max(1, min(int(calls), self.max_in_flight))
+        with self._lock:
+            if self.in_flight + calls > self.max_in_flight:
+                self.rejected += 1
+                raise Overloaded(f"Server busy: {self.in_flight} calls in flight")
+            self.in_flight += calls
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= calls
+                self.completed += 1
+
+    async def call(self, fn: Callable, *args, local: bool = False):
+        """Run fn(*args) on the pool without taking a slot (the caller holds one)."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool(local), fn, *args)
+
+    async def run(self, fn: Callable, *args, local: bool = False):
+        """Take a slot, then run fn(*args) on the pool. Process calls need picklable fn and args."""
+        async with self.slot():
+            return await self.call(fn, *args, local=local)
+
+    def stats(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait)
+        self._thread_pool = self._process_pool = None
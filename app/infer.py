@@ -0,0 +1,127 @@
+"""
+Raw-input multimodal inference for /infer.
+
+One request carries any of an image frame, an audio chunk (WAV or raw
+16-bit PCM) and a text string. The parts are decoded and scored
+concurrently: face and voice on the inference executor (a thread pool by
+default), text through the text micro-batcher. The outputs are then fused
+with compute_emotion_state. The response reports how long each part took,
+so one round trip replaces the three client-side pipelines.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from modules.fusion.fusion import batch_to_records, compute_emotion_state, compute_emotion_state_batch
+from modules.vision.face_emotion import infer_from_frame
+from modules.voice.voice_emotion import decode_audio, infer_from_audio_chunk
+
+
+def decode_frame(data: bytes) -> np.ndarray:
+    """Decode an encoded image (JPEG, PNG, ...) into a BGR frame."""
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Unreadable image")
+    return frame
+
+
+def no_face_engine():
+    return None
+
+
+def face_from_bytes(data: bytes, get_engine: Callable = no_face_engine) -> Optional[Dict]:
+    return infer_from_frame(decode_frame(data), get_engine())
+
+
+def voice_from_bytes(data: bytes, sample_rate: int = 16000) -> Dict:
+    samples, _ = decode_audio(data, sample_rate)
+    if len(samples) == 0:
+        raise ValueError("Empty audio")
+    return infer_from_audio_chunk(samples)
+
+
+def fuse_batch(valence, arousal, confidence, sources, mask=None) -> List[Dict]:
+    """Batch fusion straight to JSON records (one picklable call for a process pool)."""
+    return batch_to_records(compute_emotion_state_batch(valence, arousal, confidence, sources, mask))
+
+
+async def _timed(name: str, timings: Dict, work: Awaitable):
+    start = time.perf_counter()
+    try:
+        return await work
+    except ValueError as e:
+        # Bad input for one part; the caller turns this into a 422
+        raise ValueError(f"{name}: {e}") from None
+    finally:
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+
+async def infer_multimodal(
+    image: Optional[bytes] = None,
+    audio: Optional[bytes] = None,
+    text: Optional[str] = None,
+    sample_rate: int = 16000,
+    score_text: Optional[Callable[[str], Awaitable[Dict]]] = None,
+    get_face_engine: Callable = no_face_engine,
+    run: Callable[..., Awaitable] = run_in_threadpool,
+) -> Dict:
+    """
+    Score the given inputs concurrently and fuse them.
+
+    Args:
+        image: Encoded image bytes
+        audio: WAV bytes or raw mono int16 PCM
+        text: Text to score
+        sample_rate: Sample rate of raw PCM audio
+        score_text: Async text scorer (e.g. MicroBatcher.submit); runs
+            infer_from_text in the thread pool if None
+        get_face_engine: Returns the face engine to use (or None for the
+            heuristic); called in the worker, so a first call may load it
+        run: Async fn(*args) dispatcher for face and voice (e.g.
+            InferenceExecutor.call)
+
+    Returns:
+        Fused valence, arousal, confidence and dominant_signal, plus
+        "modules" (each modality's output), "skipped" (inputs that gave no
+        output, e.g. no face found) and "timings_ms" per modality, fusion
+        and total
+
+    Raises:
+        ValueError: no inputs, an input could not be decoded, or no input gave an output
+    """
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+    work = {}
+    if image is not None:
+        work["face"] = run(face_from_bytes, image, get_face_engine)
+    if audio is not None:
+        work["voice"] = run(voice_from_bytes, audio, sample_rate)
+    if text is not None:
+        if score_text is None:
+            from modules.text.text_sentiment import infer_from_text
+            work["text"] = run_in_threadpool(infer_from_text, text)
+        else:
+            work["text"] = score_text(text)
+    if not work:
+        raise ValueError("Send at least one of image, audio or text")
+
+    results = await asyncio.gather(
+        *(_timed(name, timings, w) for name, w in work.items()), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    outputs = [r for r in results if r is not None]
+    skipped = [name for name, r in zip(work, results) if r is None]
+    if not outputs:
+        raise ValueError(f"No output from {', '.join(skipped)} (no face found)")
+
+    fusion_start = time.perf_counter()
+    fused = compute_emotion_state(outputs)
+    timings["fusion"] = round((time.perf_counter() - fusion_start) * 1000, 3)
+    timings["total"] = round((time.perf_counter() - start) * 1000, 3)
+    return {**fused, "modules": outputs, "skipped": skipped, "timings_ms": timings}
@@ -1,6 +1,10 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile, WebSocket
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from typing import List, Optional
+import functools
+import json
 import uvicorn
 import sys
 import os
@@ -8,8 +12,83 @@ import os
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import modules.fusion.fusion as fusion
+from modules.fusion.streaming import StreamingFusion
+from modules.text.backends import make_backend
+from modules.text.batcher import MicroBatcher
+from modules.text.text_sentiment import infer_from_texts, set_backend, text_cache, text_scorer
+from modules.vision.face_emotion import FaceEmotionEngine
+from app.executor import InferenceExecutor, Overloaded
+from app.infer import fuse_batch, infer_multimodal
+from app.registry import ModelRegistry
+from app.stream import serve_stream
 
-app = FastAPI(title="Emotion Sales MVP - Fusion API")
+# Models load on first use, or at startup per SOYL_WARM: "background"
+# (default; /readyz reports 503 until loaded), "blocking" (before the server
+# accepts requests, e.g. in a Lambda init phase) or "lazy"
+WARM_MODES = ("background", "blocking", "lazy")
+WARM = os.environ.get("SOYL_WARM", "background")
+if WARM not in WARM_MODES:
+    raise ValueError(f"SOYL_WARM must be one of {', '.join(WARM_MODES)}, got {WARM!r}")
+registry = ModelRegistry()
+
+# Inference runs off the event loop: SOYL_EXECUTOR=thread (default) or process,
+# SOYL_EXECUTOR_WORKERS (default: CPU count), and up to SOYL_EXECUTOR_QUEUE
+# waiting calls before requests are shed with 503
+inference = InferenceExecutor(
+    kind=os.environ.get("SOYL_EXECUTOR", "thread"),
+    workers=int(os.environ["SOYL_EXECUTOR_WORKERS"]) if os.environ.get("SOYL_EXECUTOR_WORKERS") else None,
+    max_queue=int(os.environ.get("SOYL_EXECUTOR_QUEUE", "64")),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    registry.warm([] if WARM == "lazy" else None, background=WARM == "background")
+    yield
+    # Stop pool workers with the server instead of leaving them behind
+    inference.shutdown()
+
+app = FastAPI(title="Emotion Sales MVP - Fusion API", lifespan=lifespan)
+
+@app.exception_handler(Overloaded)
+async def overloaded(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+# Per-session smoothed state for clients that post one reading at a time
+stream_engine = StreamingFusion(
+    half_life=float(os.environ.get("SOYL_STREAM_HALF_LIFE", "2.0")),
+    ttl=float(os.environ.get("SOYL_STREAM_TTL", "300")),
+)
+
+# Largest /text/batch answered as one JSON body; larger batches must ask
+# for NDJSON (Accept: application/x-ndjson) or get 413
+TEXT_BATCH_JSON_LIMIT = int(os.environ.get("SOYL_TEXT_JSON_LIMIT", "1000"))
+
+# Text backend: "lexicon" (default) or "transformer"
+text_backend = make_backend(
+    os.environ.get("SOYL_TEXT_BACKEND", "lexicon"),
+    model_name=os.environ.get("SOYL_TEXT_MODEL"),
+    device=os.environ.get("SOYL_TEXT_DEVICE", "cpu"),
+)
+set_backend(text_backend)
+registry.register("text", text_backend.load, imports=text_backend.requires)
+# Single /text requests arriving together are scored as one batch
+text_batcher = MicroBatcher(
+    text_scorer.many,
+    max_batch_size=int(os.environ.get("SOYL_TEXT_MAX_BATCH", "32")),
+    max_wait=float(os.environ.get("SOYL_TEXT_MAX_WAIT_MS", "5")) / 1000.0,
+    # Batches share the inference workers (text state is in-process, so local)
+    run=functools.partial(inference.call, local=True),
+)
+
+# Face model for /infer: a Keras .h5 file. Without one, frames are scored
+# with the brightness heuristic.
+FACE_MODEL_FILE = os.environ.get("SOYL_FACE_MODEL")
+if FACE_MODEL_FILE:
+    registry.register("face", lambda: FaceEmotionEngine(model_file=FACE_MODEL_FILE), imports=("tensorflow",))
+
+def get_face_engine():
+    # Process-pool workers import this module too and load their own copy
+    return registry.get("face") if "face" in registry else None
 
 class ModuleOutput(BaseModel):
     valence: float
@@ -20,14 +99,141 @@ class ModuleOutput(BaseModel):
 class FusionRequest(BaseModel):
     modules: List[ModuleOutput]
 
+class BatchFusionRequest(BaseModel):
+    # Columnar layout: one row per session, one column per module
+    sources: List[str]
+    valence: List[List[float]]
+    arousal: List[List[float]]
+    confidence: List[List[float]]
+    mask: Optional[List[List[bool]]] = None
+
+class TextRequest(BaseModel):
+    text: str
+
+class TextBatchRequest(BaseModel):
+    texts: List[str]
+
+class StreamUpdateRequest(BaseModel):
+    session_id: str
+    module: ModuleOutput
+
+# Every inference route takes an executor slot first (503 when full), then
+# dispatches the work; calls on in-process state use local=True
+
 @app.post("/getEmotionState")
 async def get_emotion_state(req: FusionRequest):
+    async with inference.slot():
+        try:
+            fused = await inference.call(fusion.compute_emotion_state, [m.dict() for m in req.modules])
+            return fused
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/getEmotionStateBatch")
+async def get_emotion_state_batch(req: BatchFusionRequest):
+    async with inference.slot():
+        try:
+            results = await inference.call(
+                fuse_batch, req.valence, req.arousal, req.confidence, req.sources, req.mask
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    return {"results": results}
+
+@app.post("/updateEmotionState")
+async def update_emotion_state(req: StreamUpdateRequest):
+    # Microseconds of numpy work; it stays on the event loop like /stream,
+    # since StreamingFusion is not thread-safe
     try:
-        fused = fusion.compute_emotion_state([m.dict() for m in req.modules])
-        return fused
+        return stream_engine.update(req.session_id, req.module.dict())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.delete("/session/{session_id}")
+async def reset_session(session_id: str):
+    if not stream_engine.reset(session_id):
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return {"status": "ok"}
+
+@app.post("/text")
+async def text_single(req: TextRequest):
+    async with inference.slot():
+        try:
+            return await text_batcher.submit(req.text)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/text/batch")
+async def text_batch(req: TextBatchRequest, request: Request):
+    # The format follows the Accept header only, never the batch size
+    wants_ndjson = "application/x-ndjson" in request.headers.get("accept", "")
+    if not wants_ndjson and len(req.texts) > TEXT_BATCH_JSON_LIMIT:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batches over {TEXT_BATCH_JSON_LIMIT} texts need Accept: application/x-ndjson",
+        )
+    async with inference.slot():
+        try:
+            results = await inference.call(infer_from_texts, req.texts, local=True)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    if wants_ndjson:
+        lines = (json.dumps(r, separators=(",", ":")) + "\n" for r in results)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    return {"results": results}
+
+@app.get("/text/cache")
+async def text_cache_stats():
+    return {**text_cache.stats(), "batcher": text_batcher.stats()}
+
+@app.get("/executor")
+async def executor_stats():
+    return inference.stats()
+
+@app.post("/infer")
+async def infer(
+    image: Optional[UploadFile] = File(None),
+    audio: Optional[UploadFile] = File(None),
+    text: Optional[str] = Form(None),
+    sample_rate: int = Form(16000),
+):
+    # Face, voice and text are dispatched concurrently: one slot per part
+    parts = sum(part is not None for part in (image, audio, text))
+    async with inference.slot(parts):
+        try:
+            return await infer_multimodal(
+                image=await image.read() if image is not None else None,
+                audio=await audio.read() if audio is not None else None,
+                text=text,
+                sample_rate=sample_rate,
+                score_text=text_batcher.submit,
+                get_face_engine=get_face_engine,
+                run=inference.call,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.websocket("/stream")
+async def stream(websocket: WebSocket, session_id: Optional[str] = None):
+    if not session_id:
+        await websocket.close(code=1008, reason="session_id query parameter is required")
+        return
+    await serve_stream(websocket, stream_engine, session_id)
+
+@app.get("/healthz")
+async def healthz():
+    # Liveness: the process is up and serving, whatever the models are doing
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    status = registry.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content={"warm": WARM, **status})
+
 @app.get("/")
 async def root():
     return {"status": "ok", "message": "Emotion Sales MVP Fusion API"}
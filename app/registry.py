@@ -0,0 +1,132 @@
+"""
+Lazy model registry for the API.
+
+Each component (the face engine, the text backend, ...) is registered with
+a loader and the heavy modules it needs. Nothing is imported or loaded when
+the app module is imported, so the server starts in well under a second.
+A component loads on its first get(), or ahead of time when warm() loads
+it, either in a background thread or in the foreground.
+
+The registry records how long each component spent importing its modules
+and loading its weights. It also tells liveness (the process is up) apart
+from readiness (every component being warmed has loaded), for the
+/healthz and /readyz probes.
+"""
+import importlib
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+
+class Component:
+    """
+    One lazily loaded model or resource. state is pending, loading, ready or failed.
+
+    Args:
+        name: Component name
+        loader: Builds and returns the loaded object (called once)
+        imports: Heavy modules to import before calling loader, timed separately
+    """
+
+    def __init__(self, name: str, loader: Callable, imports: Sequence[str] = ()):
+        self.name = name
+        self.loader = loader
+        self.imports = list(imports)
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.import_ms: Optional[float] = None
+        self.load_ms: Optional[float] = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        The loaded object, loading it first if needed. Concurrent callers wait
+        for a single load; after a failed load the next call tries again.
+        """
+        if self.state == "ready":
+            return self._value
+        with self._lock:
+            if self.state != "ready":
+                self._load()
+            return self._value
+
+    def _load(self):
+        self.state, self.error = "loading", None
+        start = time.perf_counter()
+        try:
+            for module in self.imports:
+                importlib.import_module(module)
+            loaded = time.perf_counter()
+            self.import_ms = round((loaded - start) * 1000, 3)
+            self._value = self.loader()
+            self.load_ms = round((time.perf_counter() - loaded) * 1000, 3)
+        except Exception as e:
+            self.state, self.error = "failed", f"{type(e).__name__}: {e}"
+            raise
+        self.state = "ready"
+
+    def status(self) -> Dict:
+        return {"state": self.state, "import_ms": self.import_ms, "load_ms": self.load_ms, "error": self.error}
+
+
+class ModelRegistry:
+    """Named components, loaded on first use or warmed ahead of time."""
+
+    def __init__(self):
+        self.components: Dict[str, Component] = {}
+        self.warming: set = set()
+        self._created = time.perf_counter()
+        # From registry creation (app import) until warm() has finished
+        self.startup_ms: Optional[float] = None
+
+    def register(self, name: str, loader: Callable, imports: Sequence[str] = ()) -> Component:
+        self.components[name] = Component(name, loader, imports)
+        return self.components[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.components
+
+    def get(self, name: str):
+        return self.components[name].get()
+
+    def warm(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Load components before their first request.
+
+        Args:
+            names: Components to load (default: all); readiness waits for them
+            background: Load in a daemon thread and return it; otherwise load
+                here, one after another (failures are recorded, not raised)
+
+        Returns:
+            The warming thread, or None when loading in the foreground
+        """
+        names = list(self.components if names is None else names)
+        self.warming.update(names)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    pass  # kept in the component's status; the next get() retries
+            self.startup_ms = round((time.perf_counter() - self._created) * 1000, 3)
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def ready(self) -> bool:
+        """True once every component being warmed has loaded (always true if none are)."""
+        return all(self.components[name].state == "ready" for name in self.warming)
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready(),
+            "startup_ms": self.startup_ms,
+            "components": {name: c.status() for name, c in self.components.items()},
+        }
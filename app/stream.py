@@ -0,0 +1,122 @@
+"""
+WebSocket streaming protocol for continuous emotion updates.
+
+A client opens /stream?session_id=<id> once and sends text frames, each a
+JSON module reading ({"valence", "arousal", "confidence", "source"}) or a
+list of readings. Every reading is folded into the session's smoothed state
+as soon as it arrives. Replies carry the latest state plus "seq", the number
+of readings folded so far.
+
+Invalid frames (malformed or non-finite readings, binary frames) are
+answered with {"error": ..., "status": 422} and the session is left
+untouched.
+
+Backpressure: the reader never waits on the writer. If the client reads
+replies slower than it sends readings, intermediate states are coalesced and
+only the newest is sent, so per-connection memory stays constant.
+"""
+import asyncio
+import json
+import math
+from typing import Dict, List
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+MAX_MESSAGE_BYTES = 64 * 1024
+MAX_READINGS_PER_MESSAGE = 256
+FIELDS = ("valence", "arousal", "confidence")
+
+
+def parse_readings(message: str) -> List[Dict]:
+    """
+    Parse and validate one client frame.
+
+    Plain json + type checks instead of pydantic keeps the per-message cost small.
+
+    Raises:
+        ValueError: if the frame is too large or a reading is malformed or
+            not finite (NaN/Infinity would poison the session's running sums)
+    """
+    if len(message.encode()) > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message exceeds {MAX_MESSAGE_BYTES} bytes.")
+    data = json.loads(message)
+    readings = data if isinstance(data, list) else [data]
+    if len(readings) > MAX_READINGS_PER_MESSAGE:
+        raise ValueError(f"At most {MAX_READINGS_PER_MESSAGE} readings per message.")
+
+    out = []
+    for r in readings:
+        if not isinstance(r, dict):
+            raise ValueError("Each reading must be a JSON object.")
+        reading = {}
+        for key in FIELDS:
+            value = r.get(key)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"'{key}' must be a number.")
+            reading[key] = float(value)
+            if not math.isfinite(reading[key]):
+                raise ValueError(f"'{key}' must be finite.")
+        source = r.get("source")
+        if not isinstance(source, str):
+            raise ValueError("'source' must be a string.")
+        reading["source"] = source
+        out.append(reading)
+    return out
+
+
+async def serve_stream(websocket: WebSocket, engine, session_id: str):
+    """Run one streaming session until the client disconnects."""
+    await websocket.accept()
+    latest = {"state": None, "seq": 0, "error": None}
+    pending = asyncio.Event()
+    closed = asyncio.Event()
+
+    async def reader():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                try:
+                    if message.get("text") is None:
+                        raise ValueError("Binary frames are not supported; send JSON text frames.")
+                    readings = parse_readings(message["text"])
+                except ValueError as e:
+                    latest["error"] = str(e)
+                    pending.set()
+                    continue
+                for r in readings:
+                    latest["state"] = engine.update(session_id, r)
+                    latest["seq"] += 1
+                if readings:
+                    pending.set()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            closed.set()
+            pending.set()
+
+    async def writer():
+        # Only this task sends, so frames never interleave
+        sent_seq = 0
+        while True:
+            await pending.wait()
+            pending.clear()
+            if closed.is_set():
+                return
+            try:
+                if latest["error"] is not None:
+                    error, latest["error"] = latest["error"], None
+                    await websocket.send_json({"error": error, "status": 422})
+                if latest["seq"] != sent_seq:
+                    sent_seq = latest["seq"]
+                    reply = dict(latest["state"])
+                    reply["seq"] = sent_seq
+                    await websocket.send_json(reply)
+            except (WebSocketDisconnect, RuntimeError):
+                return
+
+    reader_task = asyncio.create_task(reader())
+    writer_task = asyncio.create_task(writer())
+    await reader_task
+    await writer_task
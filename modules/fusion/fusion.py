@@ -1,7 +1,9 @@
 """
 Simple fusion logic: confidence-weighted average of valence & arousal
 """
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
+
+import numpy as np
 
 def compute_emotion_state(module_outputs: List[Dict]) -> Dict:
     """
@@ -51,6 +53,118 @@ def compute_emotion_state(module_outputs: List[Dict]) -> Dict:
     }
 
 
+def _round4(x: np.ndarray) -> np.ndarray:
+    """
+    Round to 4 decimals exactly like Python's built-in round().
+
+    np.round scales by 10**4 and rounds half-to-even, which disagrees with
+    round() on values sitting next to a .5 boundary; those few are redone
+    with round() so batch and scalar results stay identical.
+    """
+    scaled = x * 1e4
+    out = np.rint(scaled) / 1e4
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        out.flat[i] = round(float(x.flat[i]), 4)
+    return out
+
+
+def compute_emotion_state_batch(
+    valence,
+    arousal,
+    confidence,
+    sources: Optional[Sequence] = None,
+    mask=None,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute fused emotion states for many sessions in one vectorized pass.
+
+    Args:
+        valence: (N, M) array-like, one row per session, one column per module
+        arousal: (N, M) array-like
+        confidence: (N, M) array-like
+        sources: Module names, either one per column (length M) or (N, M)
+        mask: Optional (N, M) bool array, True where a module reading is present.
+            Use it for sessions with fewer than M modules.
+
+    Returns:
+        Dict of columnar arrays (length N): valence, arousal, confidence and
+        dominant_signal. Row i equals compute_emotion_state() on session i.
+    """
+    v = np.asarray(valence, dtype=np.float64)
+    a = np.asarray(arousal, dtype=np.float64)
+    c = np.asarray(confidence, dtype=np.float64)
+    if v.ndim != 2 or v.shape != a.shape or v.shape != c.shape:
+        raise ValueError("valence, arousal and confidence must be (N, M) arrays of equal shape.")
+    n, m = v.shape
+
+    if mask is None:
+        present = np.ones((n, m), dtype=bool)
+    else:
+        present = np.asarray(mask, dtype=bool)
+        if present.shape != v.shape:
+            raise ValueError("mask must have the same shape as the module arrays.")
+
+    counts = present.sum(axis=1)
+    if m == 0 or not counts.all():
+        raise ValueError("No module outputs provided.")
+
+    v = np.where(present, v, 0.0)
+    a = np.where(present, a, 0.0)
+    c = np.where(present, c, 0.0)
+
+    # Accumulate column by column so the floating point summation order
+    # matches the scalar loop in compute_emotion_state.
+    valence_sum = np.zeros(n)
+    arousal_sum = np.zeros(n)
+    total_weight = np.zeros(n)
+    for j in range(m):
+        valence_sum += v[:, j] * c[:, j]
+        arousal_sum += a[:, j] * c[:, j]
+        total_weight += c[:, j]
+
+    total_weight = np.where(total_weight == 0, 1.0, total_weight)
+    overall = np.clip(total_weight / counts, 0.0, 1.0)
+
+    # First module with the highest confidence wins, as in the scalar loop
+    ranked = np.where(present, c, -np.inf)
+    best = ranked.argmax(axis=1)
+    best_conf = ranked[np.arange(n), best]
+
+    if sources is None:
+        names = np.full((n, m), "unknown", dtype=object)
+    else:
+        names = np.asarray(sources, dtype=object)
+        if names.ndim == 1:
+            if names.shape[0] != m:
+                raise ValueError("sources must have one entry per module column.")
+            names = np.broadcast_to(names, (n, m))
+        elif names.shape != v.shape:
+            raise ValueError("sources must be length M or shaped (N, M).")
+    dominant = names[np.arange(n), best].copy()
+    dominant[best_conf <= -1.0] = None
+
+    return {
+        "valence": _round4(valence_sum / total_weight),
+        "arousal": _round4(arousal_sum / total_weight),
+        "confidence": _round4(overall),
+        "dominant_signal": dominant,
+    }
+
+
+def batch_to_records(batch: Dict[str, np.ndarray]) -> List[Dict]:
+    """Convert compute_emotion_state_batch() output into per-session dicts."""
+    return [
+        {"valence": v, "arousal": a, "confidence": c, "dominant_signal": d}
+        for v, a, c, d in zip(
+            batch["valence"].tolist(),
+            batch["arousal"].tolist(),
+            batch["confidence"].tolist(),
+            batch["dominant_signal"].tolist(),
+        )
+    ]
+
+
 # Quick local test helper
 if __name__ == "__main__":
     sample = [
@@ -0,0 +1,224 @@
+"""
+Streaming fusion: per-session, time-decayed confidence-weighted fusion.
+
+Clients post only the newest module reading for a session; the engine keeps
+exponentially decayed valence/arousal sums per session and returns the
+smoothed state. State lives in preallocated NumPy arrays indexed by a slot
+number, so an update is O(1) and idle sessions are evicted after a TTL.
+"""
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_SOURCES = ("face", "voice", "text")
+
+
+class StreamingFusion:
+    """
+    Exponentially smoothed fusion keyed by session ID.
+
+    Each reading adds valence * confidence, arousal * confidence and
+    confidence to the session's running sums after decaying them by
+    0.5 ** (elapsed / half_life). With a single reading the result equals
+    compute_emotion_state() on that reading.
+    """
+
+    def __init__(
+        self,
+        half_life: float = 2.0,
+        ttl: float = 300.0,
+        capacity: int = 1024,
+        sources: Sequence[str] = DEFAULT_SOURCES,
+        evict_every: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            half_life: Seconds for a reading's weight to halve (<= 0 keeps only the latest)
+            ttl: Seconds of inactivity before a session is evicted
+            capacity: Initial number of session slots; grows by doubling
+            sources: Known module sources; unseen sources are added on demand
+            evict_every: Run a TTL sweep every this many updates
+            clock: Time source used when no timestamp is passed
+        """
+        self.half_life = float(half_life)
+        self.ttl = float(ttl)
+        self.evict_every = int(evict_every)
+        self.clock = clock
+
+        self._sources = list(sources)
+        self._source_index = {s: i for i, s in enumerate(self._sources)}
+        self._slots: Dict[str, int] = {}
+        self._free = []
+        self._updates = 0
+        self._allocate(max(1, int(capacity)))
+
+    def _allocate(self, capacity: int):
+        self._capacity = capacity
+        self._valence_sum = np.zeros(capacity)
+        self._arousal_sum = np.zeros(capacity)
+        self._weight = np.zeros(capacity)
+        self._count = np.zeros(capacity)
+        self._last_seen = np.full(capacity, -np.inf)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._ids = [None] * capacity
+        # Decayed confidence per source; negative means "not seen yet"
+        self._source_weight = np.full((capacity, len(self._sources)), -1.0)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        old = self._capacity
+        new = old * 2
+        for name in ("_valence_sum", "_arousal_sum", "_weight", "_count"):
+            arr = getattr(self, name)
+            setattr(self, name, np.concatenate([arr, np.zeros(new - old)]))
+        self._last_seen = np.concatenate([self._last_seen, np.full(new - old, -np.inf)])
+        self._active = np.concatenate([self._active, np.zeros(new - old, dtype=bool)])
+        self._ids.extend([None] * (new - old))
+        self._source_weight = np.vstack(
+            [self._source_weight, np.full((new - old, len(self._sources)), -1.0)]
+        )
+        self._free.extend(range(new - 1, old - 1, -1))
+        self._capacity = new
+
+    def _add_source(self, source: str) -> int:
+        idx = len(self._sources)
+        self._sources.append(source)
+        self._source_index[source] = idx
+        self._source_weight = np.hstack(
+            [self._source_weight, np.full((self._capacity, 1), -1.0)]
+        )
+        return idx
+
+    def _slot(self, session_id: str, now: float) -> int:
+        slot = self._slots.get(session_id)
+        if slot is not None:
+            if now - float(self._last_seen[slot]) <= self.ttl:
+                return slot
+            self.reset(session_id)
+        if not self._free:
+            self.evict_expired(now)
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._slots[session_id] = slot
+        self._ids[slot] = session_id
+        self._active[slot] = True
+        self._valence_sum[slot] = 0.0
+        self._arousal_sum[slot] = 0.0
+        self._weight[slot] = 0.0
+        self._count[slot] = 0.0
+        self._last_seen[slot] = now
+        self._source_weight[slot] = -1.0
+        return slot
+
+    def _release(self, slot: int):
+        self._active[slot] = False
+        self._ids[slot] = None
+        self._last_seen[slot] = -np.inf
+        self._free.append(slot)
+
+    def update(self, session_id: str, module_output: Dict, now: Optional[float] = None) -> Dict:
+        """
+        Fold one module reading into a session and return its smoothed state.
+
+        Args:
+            session_id: Client session key
+            module_output: Dict with keys: valence, arousal, confidence, source
+            now: Timestamp in seconds (defaults to the engine clock)
+
+        Returns:
+            Dict with smoothed valence, arousal, confidence, and dominant_signal
+        """
+        if now is None:
+            now = self.clock()
+        self._updates += 1
+        if self.evict_every > 0 and self._updates % self.evict_every == 0:
+            self.evict_expired(now)
+
+        slot = self._slot(session_id, now)
+        c = float(module_output.get("confidence", 0.5))
+        v = float(module_output.get("valence", 0.5))
+        a = float(module_output.get("arousal", 0.5))
+        source = module_output.get("source", "unknown")
+
+        elapsed = max(0.0, now - float(self._last_seen[slot]))
+        if self.half_life > 0:
+            decay = 0.5 ** (elapsed / self.half_life)
+        else:
+            decay = 0.0
+
+        self._valence_sum[slot] = self._valence_sum[slot] * decay + v * c
+        self._arousal_sum[slot] = self._arousal_sum[slot] * decay + a * c
+        self._weight[slot] = self._weight[slot] * decay + c
+        self._count[slot] = self._count[slot] * decay + 1.0
+        self._last_seen[slot] = now
+
+        s = self._source_index.get(source)
+        if s is None:
+            s = self._add_source(source)
+        row = self._source_weight[slot]
+        # Leave the -1 "not seen" markers alone (decay 0 would turn them into -0.0)
+        row[row > 0] *= decay
+        row[s] = max(row[s], 0.0) + c
+
+        return self._state(slot)
+
+    def _state(self, slot: int) -> Dict:
+        total_weight = float(self._weight[slot])
+        if total_weight == 0:
+            total_weight = 1.0
+        row = self._source_weight[slot]
+        best = int(row.argmax())
+        return {
+            "valence": round(float(self._valence_sum[slot]) / total_weight, 4),
+            "arousal": round(float(self._arousal_sum[slot]) / total_weight, 4),
+            "confidence": round(min(1.0, max(0.0, total_weight / float(self._count[slot]))), 4),
+            "dominant_signal": self._sources[best] if row[best] >= 0 else None,
+        }
+
+    def get(self, session_id: str, now: Optional[float] = None) -> Optional[Dict]:
+        """Return the current smoothed state of a session, or None if unknown/expired."""
+        slot = self._slots.get(session_id)
+        if slot is None:
+            return None
+        if now is None:
+            now = self.clock()
+        if now - float(self._last_seen[slot]) > self.ttl:
+            self.reset(session_id)
+            return None
+        return self._state(slot)
+
+    def reset(self, session_id: str) -> bool:
+        """Forget a session. Returns True if it existed."""
+        slot = self._slots.pop(session_id, None)
+        if slot is None:
+            return False
+        self._release(slot)
+        return True
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop every session idle for longer than the TTL. Returns the number evicted."""
+        if now is None:
+            now = self.clock()
+        expired = np.flatnonzero(self._active & (self._last_seen < now - self.ttl))
+        if len(expired) == 0:
+            return 0
+        for slot in expired.tolist():
+            del self._slots[self._ids[slot]]
+            self._release(slot)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._slots
+
+
+if __name__ == "__main__":
+    engine = StreamingFusion(half_life=1.0)
+    print(engine.update("s1", {"valence": 0.8, "arousal": 0.6, "confidence": 0.9, "source": "face"}, now=0.0))
+    print(engine.update("s1", {"valence": 0.2, "arousal": 0.4, "confidence": 0.7, "source": "voice"}, now=0.5))
+    print(engine.update("s1", {"valence": 0.2, "arousal": 0.4, "confidence": 0.7, "source": "voice"}, now=5.0))
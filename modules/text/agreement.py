@@ -0,0 +1,147 @@
+"""
+Inter-annotator agreement for valence/arousal ratings.
+
+Ratings are held as a float matrix with one row per item and one column per
+annotator; NaN marks a missing or unparseable rating. Every statistic is
+computed for all annotators at once with array operations, so any number of
+annotators and hundreds of thousands of items are cheap:
+
+- mean_ratings: per-item mean over the annotators who rated it
+- pairwise_pearson: Pearson r for every annotator pair over the items both
+  rated, from masked sums (one matrix product per sum)
+- krippendorff_alpha: interval-metric alpha, which allows missing ratings
+- icc: two-way random-effects ICC(2,1) and ICC(2,k) over fully rated items
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def annotation_matrix(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """Annotator columns as a float matrix; values that are not numbers become NaN."""
+    if not columns:
+        return np.empty((len(df), 0))
+    return np.column_stack([
+        pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float) for c in columns
+    ])
+
+
+def mean_ratings(matrix: np.ndarray) -> np.ndarray:
+    """Mean of the available ratings per item (NaN where nobody rated it)."""
+    valid = ~np.isnan(matrix)
+    counts = valid.sum(axis=1)
+    sums = np.where(valid, matrix, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _pearson_pvalue(r: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Two-sided p-value of r with n - 2 degrees of freedom (NaN without scipy)."""
+    try:
+        from scipy.special import betainc
+    except ImportError:
+        return np.full_like(r, np.nan)
+    dof = n - 2.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = dof / (dof + r ** 2 * dof / np.maximum(1.0 - r ** 2, 1e-300))
+        p = betainc(dof / 2.0, 0.5, x)
+    return np.where(dof > 0, np.clip(p, 0.0, 1.0), np.nan)
+
+
+def pairwise_pearson(matrix: np.ndarray, names: Optional[List[str]] = None, min_items: int = 6) -> List[Dict]:
+    """
+    Pearson correlation for every annotator pair over the items both rated.
+
+    Args:
+        matrix: Items x annotators ratings (NaN = missing)
+        names: Annotator names (defaults to column indices)
+        min_items: Pairs with fewer shared items are left out
+
+    Returns:
+        List of dicts with a, b, r, p, n
+    """
+    k = matrix.shape[1]
+    names = names if names is not None else [str(i) for i in range(k)]
+    mask = ~np.isnan(matrix)
+    valid = mask.astype(float)
+    # Center each column first so the sums stay well conditioned
+    counts = valid.sum(axis=0)
+    col_means = np.where(mask, matrix, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    centered = np.where(mask, matrix - col_means, 0.0)
+    n = valid.T @ valid
+    sx = centered.T @ valid          # sx[i, j] = sum of x_i over items rated by i and j
+    sxx = (centered ** 2).T @ valid
+    sxy = centered.T @ centered
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sx.T
+        var = n * sxx - sx ** 2
+        r = cov / np.sqrt(var * var.T)
+    r = np.clip(r, -1.0, 1.0)
+    p = _pearson_pvalue(r, n)
+
+    out = []
+    for i in range(k):
+        for j in range(i + 1, k):
+            if n[i, j] >= min_items:
+                out.append({"a": names[i], "b": names[j], "r": float(r[i, j]), "p": float(p[i, j]), "n": int(n[i, j])})
+    return out
+
+
+def krippendorff_alpha(matrix: np.ndarray) -> float:
+    """
+    Krippendorff's alpha with the interval metric.
+
+    Only items with at least two ratings count. Returns NaN when there is no
+    variation to compare against.
+    """
+    valid = ~np.isnan(matrix)
+    m = valid.sum(axis=1)
+    pairable = m >= 2
+    if not pairable.any():
+        return float("nan")
+    values = np.where(valid, matrix, 0.0)[pairable]
+    m = m[pairable].astype(float)
+    s1 = values.sum(axis=1)
+    s2 = (values ** 2).sum(axis=1)
+    n = m.sum()
+    # Sum over ordered pairs within an item of (a - b)^2 is 2 * (m * sum(v^2) - sum(v)^2)
+    observed = (2.0 * (m * s2 - s1 ** 2) / (m - 1.0)).sum() / n
+    expected = 2.0 * (n * s2.sum() - s1.sum() ** 2) / (n * (n - 1.0))
+    if expected <= 0:
+        return float("nan")
+    return float(1.0 - observed / expected)
+
+
+def icc(matrix: np.ndarray) -> Dict:
+    """
+    Two-way random-effects, absolute-agreement ICC (Shrout & Fleiss ICC(2,1)
+    and ICC(2,k)) over the items every annotator rated.
+
+    Returns:
+        Dict with icc2_1, icc2_k and n_items
+    """
+    complete = matrix[~np.isnan(matrix).any(axis=1)]
+    n, k = complete.shape
+    if n < 2 or k < 2:
+        return {"icc2_1": float("nan"), "icc2_k": float("nan"), "n_items": int(n)}
+    grand = complete.mean()
+    row_means = complete.mean(axis=1)
+    col_means = complete.mean(axis=0)
+    msr = k * ((row_means - grand) ** 2).sum() / (n - 1)
+    msc = n * ((col_means - grand) ** 2).sum() / (k - 1)
+    resid = complete - row_means[:, None] - col_means[None, :] + grand
+    mse = (resid ** 2).sum() / ((n - 1) * (k - 1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        icc1 = (msr - mse) / (msr + (k - 1) * mse + k * (msc - mse) / n)
+        icck = (msr - mse) / (msr + (msc - mse) / n)
+    return {"icc2_1": float(icc1), "icc2_k": float(icck), "n_items": int(n)}
+
+
+def agreement_report(matrix: np.ndarray, names: Optional[List[str]] = None, min_items: int = 6) -> Dict:
+    """All agreement statistics for one rating dimension."""
+    return {
+        "pairwise": pairwise_pearson(matrix, names, min_items),
+        "alpha": krippendorff_alpha(matrix),
+        **icc(matrix),
+    }
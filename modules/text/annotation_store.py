@@ -0,0 +1,124 @@
+"""
+Append-only journal for annotation sessions.
+
+Every label is one INSERT into a SQLite database in WAL mode, committed
+right away, so a crash loses nothing that was entered and each write costs
+the same however large the sheet is. Several annotators (separate
+processes) can write to the same journal at once; WAL lets readers carry on
+while one writer appends, and writers wait up to `timeout` seconds for each
+other.
+
+Re-annotating appends a new row; the newest row per (item, annotator) wins.
+compact() folds the journal into the annotation sheet in its usual layout
+(annotator_{k}_valence / annotator_{k}_arousal columns) with an atomic
+write, and drops the superseded rows.
+"""
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from modules.text.table_io import read_table, write_table
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id TEXT NOT NULL,
+    annotator INTEGER NOT NULL,
+    valence REAL NOT NULL,
+    arousal REAL NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS labels_item ON labels (item_id, annotator, seq);
+"""
+
+LATEST = """
+SELECT item_id, annotator, valence, arousal FROM labels
+WHERE seq IN (SELECT MAX(seq) FROM labels GROUP BY item_id, annotator)
+"""
+
+
+def journal_path(sheet: Union[str, Path]) -> Path:
+    """Journal that belongs to an annotation sheet (sample_for_annotation.labels.sqlite)."""
+    sheet = Path(sheet)
+    return sheet.with_name(sheet.stem + ".labels.sqlite")
+
+
+class AnnotationStore:
+    """
+    Annotation journal backed by SQLite.
+
+    Args:
+        path: Database file (created if missing)
+        timeout: Seconds to wait for another writer's lock
+        fsync: synchronous=FULL, durable across power loss as well as crashes
+    """
+
+    def __init__(self, path: Union[str, Path], timeout: float = 10.0, fsync: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: every statement is its own transaction unless one is opened explicitly
+        self._conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._conn.executescript(SCHEMA)
+
+    def record(self, item_id, annotator: int, valence: float, arousal: float):
+        """Append one label; it is committed before this returns."""
+        self._conn.execute(
+            "INSERT INTO labels (item_id, annotator, valence, arousal, created) VALUES (?, ?, ?, ?, ?)",
+            (str(item_id), int(annotator), float(valence), float(arousal), time.time()),
+        )
+
+    def latest(self, annotator: Optional[int] = None) -> pd.DataFrame:
+        """Newest label per (item_id, annotator), optionally for one annotator."""
+        query, params = LATEST, ()
+        if annotator is not None:
+            query, params = LATEST + " AND annotator = ?", (int(annotator),)
+        return pd.read_sql_query(query, self._conn, params=params)
+
+    def overlay(self, sheet: pd.DataFrame) -> pd.DataFrame:
+        """The sheet with journal labels written into its annotator columns (journal wins)."""
+        sheet = sheet.copy()
+        ids = sheet["id"].astype(str)
+        for annotator, labels in self.latest().groupby("annotator"):
+            labels = labels.set_index("item_id")
+            for dim in ("valence", "arousal"):
+                col = f"annotator_{annotator}_{dim}"
+                values = ids.map(labels[dim]).to_numpy(dtype=float)
+                if col in sheet.columns:
+                    current = pd.to_numeric(sheet[col], errors="coerce").to_numpy(dtype=float)
+                    values = np.where(np.isnan(values), current, values)
+                sheet[col] = values
+        return sheet
+
+    def compact(self, sheet_path: Union[str, Path], out_path: Union[str, Path, None] = None) -> Path:
+        """
+        Write the sheet with every journal label applied, then drop superseded
+        journal rows.
+
+        Args:
+            sheet_path: Annotation sheet (any table format)
+            out_path: Where to write (defaults to sheet_path)
+
+        Returns:
+            Path written
+        """
+        out = write_table(self.overlay(read_table(sheet_path)), out_path or sheet_path)
+        self._conn.execute(
+            "DELETE FROM labels WHERE seq NOT IN (SELECT MAX(seq) FROM labels GROUP BY item_id, annotator)"
+        )
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return out
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,158 @@
+"""
+Text scoring backends.
+
+A backend turns a batch of texts into emotion dicts (valence, arousal,
+confidence, source). LexiconBackend wraps the keyword lexicon.
+TransformerBackend runs a Hugging Face sequence classification model
+(DistilBERT by default) on padded batches. transformers and torch are
+imported only when the model is first loaded.
+"""
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from modules.text.lexicon import get_default_lexicon
+from modules.text.text_sentiment import score_text
+
+DEFAULT_TEXT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+
+class TextBackend(ABC):
+    """Interface for text scorers. Subclasses implement score_batch."""
+
+    name = "base"
+    # Heavy modules load() imports, for the API's model registry
+    requires = ()
+
+    def load(self):
+        """Load whatever the backend needs before its first batch."""
+        return self
+
+    @abstractmethod
+    def score_batch(self, texts: List[str]) -> List[Dict]:
+        """Score texts; one result per text, in order."""
+
+    def score(self, text: str) -> Dict:
+        return self.score_batch([text])[0]
+
+
+class LexiconBackend(TextBackend):
+    """Rule-based keyword lexicon (the default)."""
+
+    name = "lexicon"
+
+    def load(self):
+        get_default_lexicon()
+        return self
+
+    def score_batch(self, texts: List[str]) -> List[Dict]:
+        return [score_text(t) for t in texts]
+
+
+def label_valences(id2label: Dict[int, str]) -> List[float]:
+    """
+    Valence for each class label: "pos*" -> 1, "neg*" -> 0, "neu*" -> 0.5.
+    Any other labels are spread evenly from 0 to 1 in index order.
+    """
+    n = len(id2label)
+    values = []
+    for i in range(n):
+        label = str(id2label[i]).lower()
+        if label.startswith("pos"):
+            values.append(1.0)
+        elif label.startswith("neg"):
+            values.append(0.0)
+        elif label.startswith("neu"):
+            values.append(0.5)
+        else:
+            values.append(i / (n - 1) if n > 1 else 0.5)
+    return values
+
+
+class TransformerBackend(TextBackend):
+    """
+    Sequence classification model scored on padded batches.
+
+    Valence is the expected label valence under the softmax (see
+    label_valences), arousal grows with how far valence is from neutral,
+    and confidence is the top class probability.
+
+    Args:
+        model_name: Hub name or local path, used when model/tokenizer are not given
+        model: Preloaded transformers model (optional)
+        tokenizer: Preloaded tokenizer (optional)
+        device: torch device string
+        max_length: Truncation length in tokens
+    """
+
+    name = "transformer"
+    requires = ("torch", "transformers")
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_TEXT_MODEL,
+        model=None,
+        tokenizer=None,
+        device: str = "cpu",
+        max_length: int = 128,
+    ):
+        self.model_name = model_name
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.max_length = max_length
+        self._valences = None
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """Import transformers/torch and load the model if needed (once, even from several threads)."""
+        with self._load_lock:
+            if self._valences is not None:
+                return self
+            import torch
+            if self.tokenizer is None or self.model is None:
+                from transformers import AutoModelForSequenceClassification, AutoTokenizer
+                if self.tokenizer is None:
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                if self.model is None:
+                    self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            self.model.to(torch.device(self.device)).eval()
+            self._valences = torch.tensor(label_valences(self.model.config.id2label))
+        return self
+
+    def score_batch(self, texts: List[str]) -> List[Dict]:
+        if not texts:
+            return []
+        import torch
+        if self._valences is None:
+            self.load()
+        enc = self.tokenizer(
+            list(texts),
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt",
+        )
+        enc = {k: v.to(self.device) for k, v in enc.items() if k in ("input_ids", "attention_mask")}
+        with torch.inference_mode():
+            probs = torch.softmax(self.model(**enc).logits.float(), dim=-1).cpu()
+        valence = probs @ self._valences
+        confidence = probs.max(dim=-1).values
+        out = []
+        for v, c in zip(valence.tolist(), confidence.tolist()):
+            out.append({
+                "valence": round(v, 4),
+                "arousal": round(0.35 + 0.5 * abs(v - 0.5), 4),
+                "confidence": round(c, 4),
+                "source": "text",
+            })
+        return out
+
+
+def make_backend(name: str = "lexicon", model_name: Optional[str] = None, device: str = "cpu") -> TextBackend:
+    """Build a backend by name: "lexicon" or "transformer"."""
+    if name == "lexicon":
+        return LexiconBackend()
+    if name == "transformer":
+        return TransformerBackend(model_name or DEFAULT_TEXT_MODEL, device=device)
+    raise ValueError(f"Unknown text backend: {name}")
@@ -0,0 +1,125 @@
+"""
+Async micro-batching for text scoring.
+
+Single requests that arrive close together are coalesced into one batch:
+the first request opens a batch, which is flushed once it holds
+max_batch_size items or max_wait seconds have passed since it opened.
+The batch function runs in a thread pool, so the event loop keeps
+accepting requests (and filling the next batch) while a batch is scored.
+The added latency is bounded by max_wait plus at most one batch in flight.
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent submit() calls into calls of score_batch.
+
+    Args:
+        score_batch: Function list of texts -> list of results, same order
+        max_batch_size: Largest batch handed to score_batch
+        max_wait: Seconds to wait for more requests after the first one
+        executor: Executor for score_batch (the loop's default if None)
+        run: Async fn(score_batch, texts) dispatcher used instead of
+            executor (e.g. InferenceExecutor.call)
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[str]], List[Dict]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        executor: Optional[Executor] = None,
+        run: Optional[Callable[..., Awaitable]] = None,
+    ):
+        self.score_batch = score_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self.executor = executor
+        self.run = run
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, text: str) -> Dict:
+        """Score one text as part of the next batch."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return [(text, f) for text, f in batch if not f.cancelled()]
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            try:
+                if self.run is not None:
+                    results = await self.run(self.score_batch, texts)
+                else:
+                    results = await self._loop.run_in_executor(self.executor, self.score_batch, texts)
+                if len(results) != len(batch):
+                    raise ValueError(f"score_batch returned {len(results)} results for {len(batch)} texts")
+            except Exception as e:
+                for _, f in batch:
+                    if not f.done():
+                        f.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, f), result in zip(batch, results):
+                if not f.done():
+                    f.set_result(result)
+
+    async def close(self):
+        """Stop the worker; pending submits are cancelled."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, f = self._queue.get_nowait()
+            f.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "max_batch_size": self.max_batch_size,
+            "max_wait": self.max_wait,
+        }
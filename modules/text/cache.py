@@ -0,0 +1,155 @@
+"""
+Bounded result cache for text scorers.
+
+Chat text repeats a lot ("nice", "not sure", "maybe"), so scorer results are
+memoized on the normalized text (lowercased, whitespace collapsed). Entries
+are evicted least-recently-used once the cache is full, and expire after a
+TTL so a retrained or reconfigured scorer is picked up eventually.
+
+CachedScorer wraps any scorer function, optionally with a batch variant, so
+the same cache sits in front of the lexicon scorer today and a model-backed
+scorer later.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Cache key for a text: lowercased with whitespace runs collapsed."""
+    return " ".join(text.lower().split())
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL.
+
+    Args:
+        maxsize: Maximum number of entries (<= 0 disables caching)
+        ttl: Seconds an entry stays valid (<= 0 means no expiry)
+        clock: Time source
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """Return the cached value or None, counting a hit or a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or self.clock() < expires:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Dict):
+        if self.maxsize <= 0:
+            return
+        expires = self.clock() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        """Counters plus current size and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CachedScorer:
+    """
+    Memoize a text scorer on normalized text.
+
+    Args:
+        score: Function text -> result dict
+        score_many: Optional function list of texts -> list of result dicts,
+            used for the cache misses of a batch
+        cache: ResultCache to use (a new default one if omitted)
+        normalize: Function text -> cache key
+    """
+
+    def __init__(
+        self,
+        score: Callable[[str], Dict],
+        score_many: Optional[Callable[[List[str]], List[Dict]]] = None,
+        cache: Optional[ResultCache] = None,
+        normalize: Callable[[str], Hashable] = normalize_text,
+    ):
+        self.score = score
+        self.score_many = score_many
+        self.cache = cache if cache is not None else ResultCache()
+        self.normalize = normalize
+
+    def __call__(self, text: str) -> Dict:
+        key = self.normalize(text)
+        value = self.cache.get(key)
+        if value is None:
+            value = self.score(text)
+            self.cache.put(key, value)
+        return dict(value)
+
+    def many(self, texts: List[str]) -> List[Dict]:
+        """
+        Score a batch. Each distinct key is looked up once, and all misses go
+        to the scorer together. Results are in input order.
+        """
+        keys = [self.normalize(t) for t in texts]
+        found: Dict[Hashable, Dict] = {}
+        missing: Dict[Hashable, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            value = self.cache.get(key)
+            if value is None:
+                missing[key] = text
+            else:
+                found[key] = value
+        if missing:
+            batch = list(missing.values())
+            if self.score_many is not None:
+                values = self.score_many(batch)
+            else:
+                values = [self.score(t) for t in batch]
+            for key, value in zip(missing, values):
+                self.cache.put(key, value)
+                found[key] = value
+        return [dict(found[key]) for key in keys]
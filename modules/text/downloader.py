@@ -0,0 +1,220 @@
+"""
+Parallel, resumable HTTP downloads with SHA-256 checks.
+
+Each file is streamed to <name>.part in fixed-size chunks while it is
+hashed. If a transfer breaks, the next attempt asks for the rest with an
+HTTP Range request and appends to the partial file. A server that ignores
+the Range header (200 instead of 206) just makes it start over. A finished
+file is checked against its expected SHA-256 (when one is known) and only
+then renamed into place, so the target name never holds a partial or
+corrupt download.
+
+Several files are fetched at once on a thread pool. Only the standard
+library is used.
+"""
+import hashlib
+import http.client
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+CHUNK_SIZE = 1 << 20
+USER_AGENT = "soyl-dataset-downloader"
+# Errors worth retrying: the partial file is kept and the next attempt resumes it
+TRANSIENT_ERRORS = (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError)
+
+
+class ChecksumError(Exception):
+    """Downloaded data does not match the expected SHA-256."""
+
+
+def sha256_file(path: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _content_range_total(header: Optional[str]) -> Optional[int]:
+    match = re.match(r"bytes (?:\d+-\d+|\*)/(\d+)", header or "")
+    return int(match.group(1)) if match else None
+
+
+def _transfer(url: str, part: Path, digest, chunk_size: int, timeout: float) -> Dict:
+    """One request: append the rest of the file to part, hashing as it goes."""
+    offset = part.stat().st_size if part.exists() else 0
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        # 416: nothing left to send, the partial file is already complete
+        if e.code == 416 and offset and _content_range_total(e.headers.get("Content-Range")) == offset:
+            return {"resumed_from": offset, "total": offset}
+        raise
+    with response:
+        if offset and response.status != 206:
+            offset = 0
+        if offset:
+            start = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+            if not start or int(start.group(1)) != offset:
+                raise http.client.HTTPException(f"Unexpected Content-Range {response.headers.get('Content-Range')!r}")
+            total = _content_range_total(response.headers.get("Content-Range"))
+        else:
+            length = response.headers.get("Content-Length")
+            total = int(length) if length is not None else None
+        with open(part, "ab" if offset else "wb") as fh:
+            if offset:
+                # Hash what is already on disk before appending to it
+                with open(part, "rb") as existing:
+                    for block in iter(lambda: existing.read(chunk_size), b""):
+                        digest.update(block)
+            for block in iter(lambda: response.read(chunk_size), b""):
+                fh.write(block)
+                digest.update(block)
+            fh.flush()
+            os.fsync(fh.fileno())
+    size = part.stat().st_size
+    if total is not None and size != total:
+        raise http.client.IncompleteRead(b"", total - size)
+    return {"resumed_from": offset, "total": size}
+
+
+def fetch(
+    url: str,
+    dest: Union[str, Path],
+    sha256: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    timeout: float = 60.0,
+    retries: int = 3,
+    backoff: float = 1.0,
+) -> Dict:
+    """
+    Download url to dest, resuming dest.part if a previous attempt left one.
+
+    Args:
+        url: File URL
+        dest: Target path
+        sha256: Expected hex digest; None accepts any content (the digest is returned)
+        chunk_size: Bytes per read/write
+        timeout: Socket timeout per request in seconds
+        retries: Extra attempts after a transient error (each resumes)
+        backoff: Seconds before the first retry, doubled on each one
+
+    Returns:
+        Dict with path, status ("exists", "downloaded" or "resumed"), bytes and sha256
+
+    Raises:
+        ChecksumError: The finished file does not match sha256 (the partial file is
+            removed; a previous copy at dest is put back, as after any failure)
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    bad = dest.with_name(dest.name + ".bad")
+    if dest.exists():
+        digest = sha256_file(dest, chunk_size)
+        if sha256 is None or digest == sha256:
+            return {"path": dest, "status": "exists", "bytes": dest.stat().st_size, "sha256": digest}
+        # Corrupt or outdated copy: keep it aside until the new one has been verified
+        dest.replace(bad)
+
+    part = dest.with_name(dest.name + ".part")
+    try:
+        for attempt in range(retries + 1):
+            digest = hashlib.sha256()
+            try:
+                result = _transfer(url, part, digest, chunk_size, timeout)
+                break
+            except TRANSIENT_ERRORS as e:
+                if isinstance(e, urllib.error.HTTPError) and e.code < 500:
+                    raise
+                if attempt == retries:
+                    raise
+                time.sleep(backoff * 2 ** attempt)
+
+        actual = digest.hexdigest()
+        if sha256 is not None and actual != sha256:
+            part.unlink()
+            raise ChecksumError(f"{dest.name}: expected sha256 {sha256}, got {actual}")
+    except BaseException:
+        # A failed re-download leaves the previous copy where it was
+        if bad.exists() and not dest.exists():
+            bad.replace(dest)
+        raise
+    os.replace(part, dest)
+    if bad.exists():
+        bad.unlink()
+    return {
+        "path": dest,
+        "status": "resumed" if result["resumed_from"] else "downloaded",
+        "bytes": result["total"],
+        "sha256": actual,
+    }
+
+
+def load_manifest(path: Union[str, Path]) -> Dict[str, Dict]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_manifest(path: Union[str, Path], manifest: Dict[str, Dict]):
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def download_all(
+    files: List[Dict],
+    directory: Union[str, Path],
+    manifest_path: Union[str, Path, None] = None,
+    jobs: int = 4,
+    **fetch_kwargs,
+) -> Dict[str, Dict]:
+    """
+    Fetch several files concurrently.
+
+    Expected digests come from each entry's "sha256" or, failing that, from
+    the manifest. A file without either is trusted on first download and its
+    digest is recorded, so later runs verify it.
+
+    Args:
+        files: Dicts with name, url and optionally sha256
+        directory: Where the files go
+        manifest_path: JSON manifest of name -> {url, bytes, sha256} (updated)
+        jobs: Concurrent downloads
+        **fetch_kwargs: Passed to fetch()
+
+    Returns:
+        Dict of name -> fetch() result, or {"status": "failed", "error": ...}
+    """
+    directory = Path(directory)
+    manifest = load_manifest(manifest_path) if manifest_path else {}
+
+    def run(entry):
+        expected = entry.get("sha256") or manifest.get(entry["name"], {}).get("sha256")
+        try:
+            return fetch(entry["url"], directory / entry["name"], sha256=expected, **fetch_kwargs)
+        except (ChecksumError, OSError, http.client.HTTPException) as e:
+            return {"path": directory / entry["name"], "status": "failed", "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        results = dict(zip((f["name"] for f in files), pool.map(run, files)))
+
+    if manifest_path:
+        for entry in files:
+            result = results[entry["name"]]
+            if result["status"] != "failed":
+                manifest[entry["name"]] = {"url": entry["url"], "bytes": result["bytes"], "sha256": result["sha256"]}
+        save_manifest(manifest_path, manifest)
+    return results
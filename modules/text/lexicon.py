@@ -0,0 +1,132 @@
+"""
+Compiled keyword lexicon for the rule-based text scorer.
+
+All keywords are merged into one trie-shaped regular expression with word
+boundaries, so a text is scanned once however many keywords there are:
+keywords sharing a prefix share the same branch, and the regex engine only
+follows branches that match the next character. Multi-word keywords match
+any run of whitespace between their words.
+
+Lexicon files are TSV with a header: keyword, category, weight.
+"""
+import csv
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_LEXICON_FILE = Path(__file__).resolve().parent / "resources" / "lexicon.tsv"
+
+# Category order doubles as the tie-break priority
+CATEGORIES = ("positive", "negative", "uncertain")
+
+
+def _normalize(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation shaped like a character trie of the words."""
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def to_regex(node: Dict) -> str:
+        ends = "" in node
+        branches = []
+        single_chars = []
+        for ch in sorted(k for k in node if k):
+            piece = r"\s+" if ch == " " else re.escape(ch)
+            sub = to_regex(node[ch])
+            if sub:
+                branches.append(piece + sub)
+            elif ch == " ":
+                branches.append(piece)
+            else:
+                single_chars.append(piece)
+        if single_chars:
+            branches.append(single_chars[0] if len(single_chars) == 1 else "[" + "".join(single_chars) + "]")
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and not ends else "(?:" + "|".join(branches) + ")"
+        # A word may end here; try the longer continuations first
+        return body + "?" if ends else body
+
+    return to_regex(trie)
+
+
+class Lexicon:
+    """
+    Weighted keyword lexicon scored in a single regex pass.
+
+    Args:
+        entries: (keyword, category, weight) tuples; keywords are case-insensitive
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, float]]):
+        self.entries: Dict[str, Tuple[str, float]] = {}
+        for keyword, category, weight in entries:
+            key = _normalize(keyword)
+            if key:
+                self.entries[key] = (category, float(weight))
+        self.categories = list(CATEGORIES) + sorted(
+            {c for c, _ in self.entries.values()} - set(CATEGORIES)
+        )
+        if self.entries:
+            body = _trie_pattern(self.entries)
+            self.pattern: Optional[re.Pattern] = re.compile(r"(?<!\w)" + body + r"(?!\w)")
+        else:
+            self.pattern = None
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_LEXICON_FILE) -> "Lexicon":
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f, delimiter="\t")
+            return cls(
+                (row["keyword"], row["category"], float(row.get("weight") or 1.0))
+                for row in reader
+            )
+
+    def matches(self, text: str) -> List[str]:
+        """Return the matched keywords (normalized) in order of appearance."""
+        if self.pattern is None:
+            return []
+        found = []
+        for m in self.pattern.finditer(text.lower()):
+            g = m.group()
+            found.append(g if g in self.entries else _normalize(g))
+        return found
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Sum keyword weights per category."""
+        scores: Dict[str, float] = {}
+        for key in self.matches(text):
+            category, weight = self.entries[key]
+            scores[category] = scores.get(category, 0.0) + weight
+        return scores
+
+    def classify(self, text: str) -> Optional[str]:
+        """Return the highest scoring category (ties go to the earlier category), or None."""
+        scores = self.score(text)
+        best, best_score = None, 0.0
+        for category in self.categories:
+            s = scores.get(category, 0.0)
+            if s > best_score:
+                best, best_score = category, s
+        return best
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+_default_lexicon: Optional[Lexicon] = None
+
+
+def get_default_lexicon() -> Lexicon:
+    """Load (once) the lexicon shipped in resources/lexicon.tsv."""
+    global _default_lexicon
+    if _default_lexicon is None:
+        _default_lexicon = Lexicon.from_file(DEFAULT_LEXICON_FILE)
+    return _default_lexicon
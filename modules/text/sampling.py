@@ -0,0 +1,129 @@
+"""
+Streaming reservoir sampling for annotation batches.
+
+Every row gets a uniform random key and the sampler keeps the rows with the
+smallest keys, which is a uniform sample without replacement. Chunks are
+handled with array operations, and once a reservoir is full only rows whose
+key beats its largest kept key are looked at, so a pass over a large corpus
+costs little more than reading it. Keys are drawn in row order, so the
+sample does not depend on the chunk size.
+
+With stratification each stratum keeps up to n rows and the stratum sizes
+are counted, so n can be split over the strata (proportionally or equally)
+after the pass. Memory is bounded by n rows per stratum.
+"""
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ALLOCATIONS = ("proportional", "equal")
+
+
+def allocate(counts: Dict[str, int], n: int, mode: str = "proportional") -> Dict[str, int]:
+    """
+    Split n sample slots over strata, never giving a stratum more rows than it has.
+
+    Args:
+        counts: Rows available per stratum
+        n: Total sample size
+        mode: "proportional" (largest-remainder shares by stratum size) or
+            "equal" (the same per stratum; slots a small stratum cannot fill
+            go to the larger ones)
+
+    Returns:
+        Dict of stratum -> rows to draw
+    """
+    if mode not in ALLOCATIONS:
+        raise ValueError(f"allocation must be one of {', '.join(ALLOCATIONS)}, got {mode!r}")
+    total = sum(counts.values())
+    if total <= n:
+        return dict(counts)
+    if mode == "proportional":
+        quotas = {s: n * c / total for s, c in counts.items()}
+        alloc = {s: int(q) for s, q in quotas.items()}
+        left = n - sum(alloc.values())
+        for s in sorted(quotas, key=lambda s: (alloc[s] - quotas[s], s))[:left]:
+            alloc[s] += 1
+        return alloc
+    alloc = {}
+    left = n
+    strata = sorted(counts, key=lambda s: (counts[s], s))
+    for i, s in enumerate(strata):
+        alloc[s] = min(counts[s], left // (len(strata) - i))
+        left -= alloc[s]
+    return alloc
+
+
+class ReservoirSampler:
+    """
+    One-pass sampler over DataFrame chunks.
+
+    Args:
+        n: Sample size
+        seed: Random seed
+        stratify: Columns whose combined values define the strata (missing values count as "")
+        exclude: IDs (compared as strings against the "id" column) that must not be drawn
+    """
+
+    def __init__(self, n: int, seed: Optional[int] = None, stratify: Optional[Sequence[str]] = None,
+                 exclude: Optional[Iterable] = None):
+        self.n = n
+        self.stratify = list(stratify or [])
+        self.exclude = {str(i) for i in exclude} if exclude else set()
+        self.rng = np.random.default_rng(seed)
+        self.seen = 0
+        self.excluded = 0
+        self.counts: Dict[str, int] = {}
+        self._reservoir: Optional[pd.DataFrame] = None
+        self._thresholds = pd.Series(dtype=float)
+
+    def strata(self, chunk: pd.DataFrame) -> pd.Series:
+        if not self.stratify:
+            return pd.Series("", index=chunk.index, dtype="string")
+        parts = [chunk[c].astype("string").fillna("") for c in self.stratify]
+        key = parts[0]
+        for part in parts[1:]:
+            key = key + " / " + part
+        return key
+
+    def add(self, chunk: pd.DataFrame):
+        # Keys are drawn before exclusion so excluding more IDs leaves the other rows' keys unchanged
+        chunk = chunk.assign(_key=self.rng.random(len(chunk)))
+        if self.exclude and "id" in chunk.columns:
+            keep = ~chunk["id"].astype(str).isin(self.exclude)
+            self.excluded += int((~keep).sum())
+            chunk = chunk[keep]
+        if len(chunk) == 0:
+            return
+        self.seen += len(chunk)
+        strata = self.strata(chunk)
+        # Per-row work on integer codes; only the few distinct strata are looked up
+        codes, uniques = pd.factorize(strata)
+        for s, c in zip(uniques, np.bincount(codes, minlength=len(uniques))):
+            self.counts[s] = self.counts.get(s, 0) + int(c)
+        chunk = chunk.assign(_stratum=strata)
+
+        if self._reservoir is not None:
+            limit = self._thresholds.reindex(uniques).fillna(np.inf).to_numpy(dtype=float)[codes]
+            chunk = chunk[chunk["_key"].to_numpy() < limit]
+            if len(chunk) == 0:
+                return
+            chunk = pd.concat([self._reservoir, chunk], ignore_index=True)
+        chunk = chunk.sort_values("_key", kind="stable")
+        self._reservoir = chunk.groupby("_stratum", sort=False).head(self.n)
+        sizes = self._reservoir.groupby("_stratum")["_key"].agg(["size", "max"])
+        self._thresholds = sizes.loc[sizes["size"] >= self.n, "max"]
+
+    def allocation(self, mode: str = "proportional") -> Dict[str, int]:
+        return allocate(self.counts, self.n, mode)
+
+    def result(self, allocation: str = "proportional") -> pd.DataFrame:
+        """The sample in random order, without the sampler's key columns."""
+        if self._reservoir is None:
+            return pd.DataFrame()
+        quotas = self.allocation(allocation)
+        rank = self._reservoir.groupby("_stratum", sort=False).cumcount()
+        keep = rank < self._reservoir["_stratum"].map(quotas)
+        out = self._reservoir[keep].sort_values("_key", kind="stable")
+        return out.drop(columns=["_key", "_stratum"]).reset_index(drop=True)
@@ -0,0 +1,103 @@
+"""
+Benchmark dynamic micro-batching of single text requests.
+
+Concurrent clients each send one text at a time through MicroBatcher. For
+each max_batch_size the script reports throughput and p50/p99 latency.
+By default the model is a randomly initialized DistilBERT built locally
+(no download); --model scores with a real checkpoint instead.
+
+Run: python -m modules.text.scripts.bench_batcher --clients 64 --batch-sizes 1 8 32
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from modules.text.backends import TransformerBackend
+from modules.text.batcher import MicroBatcher
+
+WORDS = (
+    "i like this love it great nice not sure maybe worst bad hate size color "
+    "price the a is too much fit blue red shoes jacket return again"
+).split()
+
+
+def tiny_transformer_backend(dim=32, layers=1, heads=2, seed=0):
+    """DistilBERT classifier with random weights and a word-level tokenizer over WORDS."""
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import DistilBertConfig, DistilBertForSequenceClassification, PreTrainedTokenizerFast
+
+    specials = ["[PAD]", "[UNK]"]
+    vocab = {w: i for i, w in enumerate(specials + WORDS)}
+    tok = Tokenizer(models.WordLevel(vocab=vocab, unk_token="[UNK]"))
+    tok.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tok, pad_token="[PAD]", unk_token="[UNK]")
+
+    torch.manual_seed(seed)
+    config = DistilBertConfig(
+        vocab_size=len(vocab),
+        dim=dim,
+        n_layers=layers,
+        n_heads=heads,
+        hidden_dim=dim * 4,
+        max_position_embeddings=128,
+        id2label={0: "NEGATIVE", 1: "POSITIVE"},
+        label2id={"NEGATIVE": 0, "POSITIVE": 1},
+    )
+    model = DistilBertForSequenceClassification(config)
+    return TransformerBackend(model=model, tokenizer=tokenizer).load()
+
+
+def make_texts(n, rng):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20))) for _ in range(n)]
+
+
+async def run_clients(batcher, texts, clients):
+    latencies = []
+    per_client = [texts[i::clients] for i in range(clients)]
+
+    async def client(items):
+        for t in items:
+            start = time.perf_counter()
+            await batcher.submit(t)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(items) for items in per_client))
+    elapsed = time.perf_counter() - start
+    await batcher.close()
+    return elapsed, np.array(latencies)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Text micro-batching benchmark")
+    p.add_argument("--model", default=None, help="Checkpoint name/path (default: tiny random DistilBERT)")
+    p.add_argument("--dim", type=int, default=256, help="Hidden size of the random model")
+    p.add_argument("--layers", type=int, default=4, help="Layers of the random model")
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--clients", type=int, default=64)
+    p.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    p.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = p.parse_args()
+
+    if args.model:
+        backend = TransformerBackend(args.model).load()
+    else:
+        backend = tiny_transformer_backend(dim=args.dim, layers=args.layers, heads=4)
+    texts = make_texts(args.requests, random.Random(0))
+
+    print(f"{args.requests} requests from {args.clients} clients, max_wait {args.max_wait_ms} ms")
+    print(f"{'max_batch':>9} {'req/s':>8} {'mean batch':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in args.batch_sizes:
+        batcher = MicroBatcher(backend.score_batch, max_batch_size=size, max_wait=args.max_wait_ms / 1000.0)
+        elapsed, lat = asyncio.run(run_clients(batcher, texts, args.clients))
+        stats = batcher.stats()
+        print(f"{size:>9} {len(texts) / elapsed:>8.0f} {stats['mean_batch']:>10.1f} "
+              f"{np.percentile(lat, 50) * 1e3:>8.1f} {np.percentile(lat, 99) * 1e3:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
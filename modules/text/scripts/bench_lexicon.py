@@ -0,0 +1,70 @@
+"""
+Benchmark lexicon scoring cost against lexicon size.
+
+Compares the old approach (one substring search per keyword) with the
+compiled trie regex in modules.text.lexicon, for lexicons from a handful
+to tens of thousands of entries.
+
+Run: python -m modules.text.scripts.bench_lexicon --sizes 15 1000 10000 50000
+"""
+import argparse
+import random
+import string
+import time
+
+from modules.text.lexicon import Lexicon, get_default_lexicon
+
+
+def random_words(n, rng):
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+
+def make_texts(n, vocab, rng):
+    return [" ".join(rng.choice(vocab) for _ in range(rng.randint(5, 25))) for _ in range(n)]
+
+
+def per_keyword_scan(texts, keywords):
+    for t in texts:
+        t = t.lower()
+        [w for w in keywords if w in t]
+
+
+def compiled_scan(texts, lexicon):
+    for t in texts:
+        lexicon.score(t)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Lexicon scoring benchmark")
+    p.add_argument("--sizes", type=int, nargs="+", default=[15, 1000, 10000, 50000])
+    p.add_argument("--texts", type=int, default=2000)
+    args = p.parse_args()
+
+    rng = random.Random(0)
+    base = list(get_default_lexicon().entries)
+    pool = random_words(max(args.sizes), rng)
+    texts = make_texts(args.texts, base + pool[:2000], rng)
+
+    print(f"{args.texts} texts")
+    print(f"{'entries':>8} {'compile s':>10} {'per-keyword us/text':>20} {'compiled us/text':>17}")
+    for size in args.sizes:
+        words = (base + pool)[:size]
+        start = time.perf_counter()
+        lexicon = Lexicon((w, "positive", 1.0) for w in words)
+        compile_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        per_keyword_scan(texts, words)
+        naive = (time.perf_counter() - start) / len(texts) * 1e6
+
+        start = time.perf_counter()
+        compiled_scan(texts, lexicon)
+        fast = (time.perf_counter() - start) / len(texts) * 1e6
+        print(f"{size:>8} {compile_s:>10.2f} {naive:>20.1f} {fast:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
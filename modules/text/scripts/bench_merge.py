@@ -0,0 +1,111 @@
+"""
+Benchmark the streaming merge_all against the original in-memory merge.
+
+Writes a synthetic corpus (several unified CSVs with duplicate and short
+texts) and runs each merge in a fresh process. Reports wall time and peak
+RSS for each, and checks that both keep the same texts in the same order.
+
+Run: python -m modules.text.scripts.bench_merge --rows 2000000 --files 4
+"""
+import argparse
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.text.scripts.preprocess_datasets import MERGED_STEM, UNIFIED_COLUMNS, merge_all
+
+MERGED_NAME = MERGED_STEM + ".csv"
+
+WORDS = "i like this love it great nice not sure maybe worst bad hate size color price the fit".split()
+
+
+def write_corpus(root, rows, files, seed=0):
+    """Write rows spread over files in root/interim; about a third are repeats, some too short."""
+    rng = random.Random(seed)
+    interim = root / "interim"
+    interim.mkdir(parents=True, exist_ok=True)
+    (root / "processed").mkdir(parents=True, exist_ok=True)
+    pool = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 30))) for _ in range(rows * 2 // 3)]
+    per_file = rows // files
+    for k in range(files):
+        texts = [rng.choice(pool) for _ in range(per_file)]
+        pd.DataFrame({
+            "id": [f"s{k}_{i}" for i in range(per_file)],
+            "text": texts,
+            "source": f"synthetic_{k}",
+            "raw_label": np.random.default_rng(k).integers(0, 28, per_file),
+            "valence": "",
+            "arousal": "",
+            "annotation_source": f"synthetic_{k}",
+            "notes": "",
+        }, columns=UNIFIED_COLUMNS).to_csv(interim / f"part_{k}.csv", index=False)
+
+
+def legacy_merge(interim, processed):
+    files = sorted(interim.glob("*.csv")) + sorted(f for f in processed.glob("*.csv") if f.stem != MERGED_STEM)
+    dfs = [df for df in (pd.read_csv(f) for f in files) if len(df) > 0]
+    merged = pd.concat(dfs, ignore_index=True, sort=False)
+    merged = merged.drop_duplicates(subset=["text"], keep="first")
+    merged["word_count"] = merged["text"].str.split().str.len()
+    merged = merged[merged["word_count"] >= 3].drop(columns=["word_count"])
+    merged.to_csv(processed / MERGED_NAME, index=False)
+
+
+def run_child(mode, root):
+    root = Path(root)
+    start = time.perf_counter()
+    if mode == "legacy":
+        legacy_merge(root / "interim", root / "processed")
+    else:
+        merge_all(interim_dir=root / "interim", processed_dir=root / "processed")
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"RESULT {elapsed:.3f} {peak_mb:.1f}")
+
+
+def measure(mode, root):
+    out = subprocess.run(
+        [sys.executable, "-m", "modules.text.scripts.bench_merge", "--child", mode, str(root)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    _, elapsed, peak = out.strip().splitlines()[-1].split()
+    merged = root / "processed" / MERGED_NAME
+    texts = pd.read_csv(merged, usecols=["text"])["text"].tolist()
+    # Move the result out of processed/ so the next run does not read it as a source
+    merged.rename(root / f"{mode}_{MERGED_NAME}")
+    return float(elapsed), float(peak), texts
+
+
+def main():
+    p = argparse.ArgumentParser(description="Streaming merge benchmark")
+    p.add_argument("--rows", type=int, default=2_000_000)
+    p.add_argument("--files", type=int, default=4)
+    p.add_argument("--child", nargs=2, metavar=("MODE", "ROOT"), help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_corpus(root, args.rows, args.files)
+        size_mb = sum(f.stat().st_size for f in (root / "interim").glob("*.csv")) / 1e6
+        print(f"{args.rows} rows in {args.files} files ({size_mb:.0f} MB)")
+        legacy_s, legacy_mb, legacy_texts = measure("legacy", root)
+        stream_s, stream_mb, stream_texts = measure("stream", root)
+        print(f"{'merge':>10} {'seconds':>8} {'peak RSS MB':>12}")
+        print(f"{'in-memory':>10} {legacy_s:>8.2f} {legacy_mb:>12.0f}")
+        print(f"{'streaming':>10} {stream_s:>8.2f} {stream_mb:>12.0f}")
+        print(f"{len(stream_texts)} rows kept; same texts and order: {legacy_texts == stream_texts}")
+
+
+if __name__ == "__main__":
+    main()
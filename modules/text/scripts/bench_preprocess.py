@@ -0,0 +1,189 @@
+"""
+Benchmark preprocess_datasets ingest against the original iterrows code.
+
+Writes synthetic GoEmotions (three parts), EmoBank and ISEAR files to a
+temporary raw directory. Each dataset is then processed with the original
+row-by-row implementation (kept below as legacy_*) and with the current
+column-wise one. The script checks that both outputs are byte-identical and
+reports the time each takes.
+
+Run: python -m modules.text.scripts.bench_preprocess --rows 300000
+"""
+import argparse
+import contextlib
+import io
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.text.scripts import preprocess_datasets as pre
+
+WORDS = "i like this love it great nice not sure maybe worst bad hate size color price the fit".split()
+
+
+def write_synthetic(raw_dir, rows, seed=0):
+    """Write goemotions_{1,2,3}.csv, emobank.csv and isear.csv with some gaps and odd values."""
+    rng = np.random.default_rng(seed)
+    pyrng = random.Random(seed)
+
+    def texts(n):
+        out = [" ".join(pyrng.choice(WORDS) for _ in range(pyrng.randint(1, 20))) for _ in range(n)]
+        for i in rng.choice(n, size=max(1, n // 100), replace=False):
+            out[i] = None
+        return out
+
+    per_part = rows // 3
+    for k in (1, 2, 3):
+        pd.DataFrame({
+            "text": texts(per_part),
+            "id": [f"e{k}_{i}" for i in range(per_part)],
+            "labels": np.where(rng.random(per_part) < 0.05, np.nan, rng.integers(0, 28, per_part)),
+        }).to_csv(raw_dir / f"goemotions_{k}.csv", index=False)
+
+    n = max(1, rows // 20)
+    valence = np.round(rng.uniform(1, 5, n), 2)
+    valence[rng.random(n) < 0.05] = np.nan
+    valence[rng.random(n) < 0.01] = 0.0
+    pd.DataFrame({
+        "id": np.arange(n),
+        "split": "train",
+        "V": valence,
+        "A": np.round(rng.uniform(1, 5, n), 2),
+        "D": np.round(rng.uniform(1, 5, n), 2),
+        "text": texts(n),
+    }).to_csv(raw_dir / "emobank.csv", index=False)
+
+    isear_text = texts(n)
+    for i in rng.choice(n, size=max(1, n // 100), replace=False):
+        isear_text[i] = "   "
+    pd.DataFrame({
+        "EMOT": np.where(rng.random(n) < 0.05, None, rng.choice(["joy", "fear", "anger"], n)),
+        "TEXT": isear_text,
+    }).to_csv(raw_dir / "isear.csv", index=False)
+
+
+def legacy_goemotions(raw_dir, out_dir):
+    parts = [raw_dir / f"goemotions_{i}.csv" for i in [1, 2, 3]]
+    rows = []
+    for p in parts:
+        df = pd.read_csv(p)
+        if "text" in df.columns:
+            for i, r in df.iterrows():
+                rows.append({
+                    "id": f"go_{p.stem}_{i}",
+                    "text": str(r["text"]) if pd.notna(r["text"]) else "",
+                    "source": "goemotions",
+                    "raw_label": str(r.get("labels", "")) if pd.notna(r.get("labels", "")) else "",
+                    "valence": "",
+                    "arousal": "",
+                    "annotation_source": "goemotions",
+                    "notes": "",
+                })
+    if rows:
+        pd.DataFrame(rows).to_csv(out_dir / "goemotions_unified.csv", index=False)
+
+
+def legacy_emobank(raw_dir, out_dir):
+    df = pd.read_csv(raw_dir / "emobank.csv")
+    out_rows = []
+    for i, r in df.iterrows():
+        text = (
+            r.get("text")
+            or r.get("sentence")
+            or r.get("Sentence")
+            or r.get("Text")
+            or r.get("text_tokenized")
+            or r.get("sentence_text")
+        )
+        if pd.isna(text):
+            continue
+        v = r.get("V") or r.get("valence") or r.get("Valence") or r.get("v")
+        a = r.get("A") or r.get("arousal") or r.get("Arousal") or r.get("a")
+        out_rows.append({
+            "id": f"emobank_{i}",
+            "text": str(text),
+            "source": "emobank",
+            "raw_label": "",
+            "valence": float(v) if pd.notna(v) else "",
+            "arousal": float(a) if pd.notna(a) else "",
+            "annotation_source": "emobank",
+            "notes": "",
+        })
+    if out_rows:
+        pd.DataFrame(out_rows).to_csv(out_dir / "emobank_va.csv", index=False)
+
+
+def legacy_isear(raw_dir, out_dir, text_col="TEXT", label_col="EMOT"):
+    df = pd.read_csv(raw_dir / "isear.csv")
+    out_rows = []
+    for i, r in df.iterrows():
+        text = r.get(text_col)
+        if pd.isna(text) or str(text).strip() == "":
+            continue
+        label = ""
+        if label_col:
+            label = str(r.get(label_col, "")) if pd.notna(r.get(label_col)) else ""
+        out_rows.append({
+            "id": f"isear_{i}",
+            "text": str(text),
+            "source": "isear",
+            "raw_label": label,
+            "valence": "",
+            "arousal": "",
+            "annotation_source": "isear",
+            "notes": "",
+        })
+    if out_rows:
+        pd.DataFrame(out_rows).to_csv(out_dir / "isear_unified.csv", index=False)
+
+
+CASES = [
+    ("goemotions", legacy_goemotions, pre.process_goemotions, "goemotions_unified.csv"),
+    ("emobank", legacy_emobank, pre.process_emobank, "emobank_va.csv"),
+    ("isear", legacy_isear, pre.process_isear, "isear_unified.csv"),
+]
+
+
+def compare(raw_dir, work_dir):
+    """Run every case both ways; returns [(name, legacy_s, new_s, identical)]."""
+    results = []
+    for name, legacy, current, filename in CASES:
+        old_dir, new_dir = work_dir / "legacy" / name, work_dir / "new" / name
+        old_dir.mkdir(parents=True, exist_ok=True)
+        new_dir.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        legacy(raw_dir, old_dir)
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            current(raw_dir=raw_dir, out_dir=new_dir)
+        new_s = time.perf_counter() - start
+
+        identical = (old_dir / filename).read_bytes() == (new_dir / filename).read_bytes()
+        results.append((name, legacy_s, new_s, identical))
+    return results
+
+
+def main():
+    p = argparse.ArgumentParser(description="preprocess_datasets ingest benchmark")
+    p.add_argument("--rows", type=int, default=300000, help="GoEmotions rows (EmoBank/ISEAR get rows/20)")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir, work_dir = Path(tmp) / "raw", Path(tmp) / "work"
+        raw_dir.mkdir()
+        write_synthetic(raw_dir, args.rows)
+        print(f"{args.rows} GoEmotions rows, {args.rows // 20} EmoBank/ISEAR rows")
+        print(f"{'dataset':>10} {'iterrows s':>10} {'columnar s':>10} {'speedup':>8} {'identical':>9}")
+        for name, legacy_s, new_s, identical in compare(raw_dir, work_dir):
+            print(f"{name:>10} {legacy_s:>10.2f} {new_s:>10.2f} {legacy_s / new_s:>7.1f}x {str(identical):>9}")
+
+
+if __name__ == "__main__":
+    main()
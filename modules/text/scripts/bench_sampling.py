@@ -0,0 +1,84 @@
+"""
+Benchmark the streaming annotation sampler against loading the whole corpus.
+
+Writes a synthetic merged corpus and draws a sample in a fresh process with
+the original approach (read everything, then df.sample) and with the
+one-pass reservoir sampler, plain and stratified by source and raw_label.
+Reports wall time and peak RSS for each.
+
+Run: python -m modules.text.scripts.bench_sampling --rows 2000000
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from modules.text.sampling import ReservoirSampler
+from modules.text.scripts.bench_table_io import synthetic_corpus
+from modules.text.table_io import iter_table_chunks, read_table, table_path, write_table
+
+MODES = ["load all", "reservoir", "stratified"]
+
+
+def run_child(mode, path, n):
+    if mode == "write":
+        write_table(synthetic_corpus(n), path)
+        return
+    start = time.perf_counter()
+    if mode == "load all":
+        df = read_table(path, columns=["id", "text", "source"])
+        df = df.dropna(subset=["text"])
+        df = df[df["text"].str.strip() != ""]
+        drawn = len(df.sample(n=min(n, len(df)), random_state=42))
+    else:
+        stratify = ["source", "raw_label"] if mode == "stratified" else None
+        columns = ["id", "text", "source"] + (["raw_label"] if stratify else [])
+        sampler = ReservoirSampler(n, seed=42, stratify=stratify)
+        for chunk in iter_table_chunks(path, columns=columns):
+            text = chunk["text"]
+            sampler.add(chunk[text.notna() & (text.astype(str).str.strip() != "")])
+        drawn = len(sampler.result())
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"RESULT {elapsed:.3f} {peak_mb:.1f} {drawn}")
+
+
+def measure(mode, path, n):
+    out = subprocess.run(
+        [sys.executable, "-m", "modules.text.scripts.bench_sampling", "--child", mode, str(path), "--n", str(n)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    _, elapsed, peak, drawn = out.strip().splitlines()[-1].split()
+    return float(elapsed), float(peak), int(drawn)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Annotation sampler benchmark")
+    p.add_argument("--rows", type=int, default=2_000_000)
+    p.add_argument("--n", type=int, default=300)
+    p.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv")
+    p.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.n)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Written by a child too: peak RSS carries over from parent to child on Linux
+        path = table_path(tmp, "corpus", args.format)
+        subprocess.run(
+            [sys.executable, "-m", "modules.text.scripts.bench_sampling", "--child", "write", str(path), "--n", str(args.rows)],
+            check=True,
+        )
+        print(f"{args.rows} rows ({path.stat().st_size / 1e6:.0f} MB {args.format}), n={args.n}")
+        print(f"{'sampler':>10} {'seconds':>8} {'peak RSS MB':>12} {'drawn':>6}")
+        for mode in MODES:
+            elapsed, peak, drawn = measure(mode, path, args.n)
+            print(f"{mode:>10} {elapsed:>8.2f} {peak:>12.0f} {drawn:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark text table formats: CSV vs Parquet vs Feather (Arrow IPC).
+
+Writes a synthetic merged corpus in each format and reports the file size,
+the time to load every column, and the time to load only the columns the
+annotation sampler needs (id, text, source) and only valence/arousal.
+
+Run: python -m modules.text.scripts.bench_table_io --rows 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.text.scripts.preprocess_datasets import UNIFIED_COLUMNS
+from modules.text.table_io import read_table, table_path, write_table
+
+WORDS = "i like this love it great nice not sure maybe worst bad hate size color price the fit".split()
+SOURCES = ["goemotions", "emobank", "isear"]
+
+
+def synthetic_corpus(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    pyrng = random.Random(seed)
+    source = rng.choice(SOURCES, rows)
+    valence = np.round(rng.uniform(0, 1, rows), 3).astype(object)
+    valence[source != "emobank"] = ""
+    return pd.DataFrame({
+        "id": [f"row_{i}" for i in range(rows)],
+        "text": [" ".join(pyrng.choice(WORDS) for _ in range(pyrng.randint(3, 30))) for _ in range(rows)],
+        "source": source,
+        "raw_label": rng.integers(0, 28, rows).astype(str),
+        "valence": valence,
+        "arousal": valence,
+        "annotation_source": source,
+        "notes": "",
+    }, columns=UNIFIED_COLUMNS)
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    p = argparse.ArgumentParser(description="Text table format benchmark")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    args = p.parse_args()
+
+    df = synthetic_corpus(args.rows)
+    print(f"{args.rows} rows")
+    print(f"{'format':>8} {'size MB':>8} {'write s':>8} {'load all s':>10} {'id,text,source s':>17} {'valence,arousal s':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("csv", "parquet", "feather"):
+            path = table_path(tmp, "corpus", fmt)
+            start = time.perf_counter()
+            write_table(df, path)
+            write_s = time.perf_counter() - start
+            size_mb = path.stat().st_size / 1e6
+            load_all = timed(lambda: read_table(path))
+            load_text = timed(lambda: read_table(path, columns=["id", "text", "source"]))
+            load_va = timed(lambda: read_table(path, columns=["valence", "arousal"]))
+            print(f"{fmt:>8} {size_mb:>8.1f} {write_s:>8.2f} {load_all:>10.2f} {load_text:>17.2f} {load_va:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
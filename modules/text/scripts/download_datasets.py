@@ -1,40 +1,41 @@
-import os
-import subprocess
+import argparse
+import sys
 from pathlib import Path
 
+# Allow running as a file (python modules/text/scripts/...) as well as with -m
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from modules.text.downloader import download_all
+
 ROOT = Path(__file__).resolve().parents[1]
 RAW = ROOT / "data" / "raw"
 RAW.mkdir(parents=True, exist_ok=True)
+# name -> {url, bytes, sha256} of every file downloaded so far; later runs verify against it
+MANIFEST = RAW / "download_manifest.json"
+
+# official storage root (Google): downloads as CSV
+GOEMOTIONS_URL = "https://storage.googleapis.com/gresearch/goemotions/data/full_dataset"
+GOEMOTIONS_PARTS = ["goemotions_1.csv", "goemotions_2.csv", "goemotions_3.csv"]
 
 
-def run(cmd):
-    print("RUN:", cmd)
-    subprocess.check_call(cmd, shell=True)
-
-
-def download_goemotions():
-    # official storage root (Google): downloads as CSV
-    ROOT_URL = "https://storage.googleapis.com/gresearch/goemotions/data/full_dataset"
-    for part in ["goemotions_1.csv", "goemotions_2.csv", "goemotions_3.csv"]:
-        out = RAW / part
-        if not out.exists():
-            # Use curl on Windows/Mac, or urllib
-            try:
-                import urllib.request
-
-                url = f"{ROOT_URL}/{part}"
-                print(f"Downloading {url} to {out}")
-                urllib.request.urlretrieve(url, out)
-                print(f"Downloaded: {out}")
-            except Exception as e:
-                print(f"Error downloading {part}: {e}")
-                # Try wget/curl if available
-                try:
-                    run(f'curl -L -o "{out}" "{ROOT_URL}/{part}"')
-                except:
-                    print(f"Manual download needed: {ROOT_URL}/{part} -> {out}")
+def download_goemotions(base_url=GOEMOTIONS_URL, jobs=3, raw_dir=RAW, manifest_path=MANIFEST):
+    """
+    Fetch the GoEmotions parts concurrently, resuming partial downloads and
+    checking each file's SHA-256 against the manifest.
+
+    Returns:
+        Dict of part name -> result (see modules.text.downloader.download_all)
+    """
+    files = [{"name": part, "url": f"{base_url}/{part}"} for part in GOEMOTIONS_PARTS]
+    results = download_all(files, raw_dir, manifest_path=manifest_path, jobs=jobs)
+    for part, result in results.items():
+        if result["status"] == "failed":
+            print(f"Error downloading {part}: {result['error']}")
+            print(f"Manual download needed: {base_url}/{part} -> {result['path']}")
+        elif result["status"] == "exists":
+            print(f"Exists: {result['path']}")
         else:
-            print(f"Exists: {out}")
+            print(f"Downloaded ({result['status']}): {result['path']} ({result['bytes']} bytes, sha256 {result['sha256'][:12]}...)")
+    return results
 
 
 def download_emobank():
@@ -80,10 +81,19 @@ def download_isear():
     )
 
 
-if __name__ == "__main__":
+def main():
+    p = argparse.ArgumentParser(description="Download the text emotion datasets")
+    p.add_argument("--jobs", "-j", type=int, default=3, help="Concurrent downloads")
+    p.add_argument("--base-url", default=GOEMOTIONS_URL, help="GoEmotions location (e.g. a local mirror)")
+    args = p.parse_args()
+
     print("Starting dataset downloads...")
-    download_goemotions()
+    download_goemotions(base_url=args.base_url, jobs=args.jobs)
     download_emobank()
     download_semeval_2018()
     download_isear()
     print("\nDownload complete / instructions printed. Check modules/text/data/raw for files.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,22 @@
-import pandas as pd
 from pathlib import Path
-import numpy as np
+import sys
+
+# Allow running as a file (python modules/text/scripts/...) as well as with -m
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from modules.text.agreement import agreement_report, annotation_matrix, mean_ratings
+from modules.text.table_io import find_table, read_table, table_path, write_table
 
 ROOT = Path(__file__).resolve().parents[1]
 ANNOT = ROOT / "data" / "annotations"
 PROCESSED = ROOT / "data" / "processed"
 PROCESSED.mkdir(parents=True, exist_ok=True)
 
-input_file = ANNOT / "sample_for_annotation.csv"
-if not input_file.exists():
-    print(f"Error: {input_file} not found.")
+input_file = find_table(ANNOT, "sample_for_annotation")
+if input_file is None:
+    print(f"Error: {table_path(ANNOT, 'sample_for_annotation')} not found.")
     exit(1)
 
-df = pd.read_csv(input_file)
+df = read_table(input_file)
 
 # compute averages across annotator columns that exist
 v_cols = [c for c in df.columns if "annotator" in c and "valence" in c]
@@ -21,43 +25,22 @@ a_cols = [c for c in df.columns if "annotator" in c and "arousal" in c]
 print(f"Found valence columns: {v_cols}")
 print(f"Found arousal columns: {a_cols}")
 
-
-def safe_mean(row, cols):
-    vals = []
-    for c in cols:
-        try:
-            v = float(row[c])
-            if not pd.isna(v):
-                vals.append(v)
-        except (ValueError, TypeError):
-            pass
-    return np.mean(vals) if vals else np.nan
-
-
-df["avg_valence"] = df.apply(lambda r: safe_mean(r, v_cols), axis=1)
-df["avg_arousal"] = df.apply(lambda r: safe_mean(r, a_cols), axis=1)
+# Entries that are not numbers count as missing
+v_matrix = annotation_matrix(df, v_cols)
+a_matrix = annotation_matrix(df, a_cols)
+df["avg_valence"] = mean_ratings(v_matrix)
+df["avg_arousal"] = mean_ratings(a_matrix)
 
 # Compute inter-annotator agreement (if multiple annotators)
-if len(v_cols) > 1:
-    print("\nComputing inter-annotator agreement...")
-    from scipy.stats import pearsonr
-
-    for i, col1 in enumerate(v_cols):
-        for col2 in v_cols[i + 1 :]:
-            vals1 = []
-            vals2 = []
-            for _, row in df.iterrows():
-                try:
-                    v1 = float(row[col1])
-                    v2 = float(row[col2])
-                    if not (pd.isna(v1) or pd.isna(v2)):
-                        vals1.append(v1)
-                        vals2.append(v2)
-                except:
-                    pass
-            if len(vals1) > 5:
-                corr, pval = pearsonr(vals1, vals2)
-                print(f"Correlation {col1} vs {col2}: {corr:.3f} (p={pval:.3f})")
-
-df.to_csv(PROCESSED / "annotation_final.csv", index=False)
-print(f"\nWrote: {PROCESSED / 'annotation_final.csv'} ({len(df)} rows)")
+for label, matrix, cols in (("valence", v_matrix, v_cols), ("arousal", a_matrix, a_cols)):
+    if len(cols) < 2:
+        continue
+    print(f"\nComputing inter-annotator agreement ({label})...")
+    report = agreement_report(matrix, cols)
+    for pair in report["pairwise"]:
+        print(f"Correlation {pair['a']} vs {pair['b']}: {pair['r']:.3f} (p={pair['p']:.3f})")
+    print(f"Krippendorff's alpha (interval): {report['alpha']:.3f}")
+    print(f"ICC(2,1): {report['icc2_1']:.3f}, ICC(2,k): {report['icc2_k']:.3f} over {report['n_items']} fully rated items")
+
+out = write_table(df, table_path(PROCESSED, "annotation_final"))
+print(f"\nWrote: {out} ({len(df)} rows)")
@@ -1,6 +1,18 @@
+import argparse
 import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# Allow running as a file (python modules/text/scripts/...) as well as with -m
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from modules.text.table_io import FORMAT_ENV, TableWriter, is_table, iter_table_chunks, table_path, write_table
 
 ROOT = Path(__file__).resolve().parents[1]
 RAW = ROOT / "data" / "raw"
@@ -9,11 +21,67 @@ PROCESSED = ROOT / "data" / "processed"
 for d in (INTERIM, PROCESSED):
     d.mkdir(parents=True, exist_ok=True)
 
+UNIFIED_COLUMNS = ["id", "text", "source", "raw_label", "valence", "arousal", "annotation_source", "notes"]
+
+
+# The ingest functions work a column at a time but reproduce the output of
+# the original row-by-row (iterrows) code byte for byte.
+
+def row_view(df):
+    """
+    The frame as iterrows() sees it. Rows are cut from df.values, so an
+    all-numeric frame is upcast to one common dtype (ints become floats
+    next to a float column); any other frame yields the original objects.
+    """
+    if len(df.columns) and all(is_numeric_dtype(t) for t in df.dtypes):
+        return pd.DataFrame(df.values, index=df.index, columns=df.columns)
+    return df
+
+
+def column_values(df, name):
+    """Object array of a column (what r.get(name) returns per row), or None if missing."""
+    if name not in df.columns:
+        return None
+    return df[name].to_numpy(dtype=object)
+
+
+def first_truthy(df, names):
+    """Vectorized r.get(a) or r.get(b) or ...: first truthy value, else the last operand."""
+    n = len(df)
+    last = column_values(df, names[-1])
+    result = np.full(n, None, dtype=object) if last is None else last.copy()
+    for name in reversed(names[:-1]):
+        values = column_values(df, name)
+        if values is not None:
+            truthy = values.astype(bool)
+            result[truthy] = values[truthy]
+    return result
+
 
-def process_goemotions():
+def to_str(values):
+    return [str(v) for v in values]
+
+
+def unified_frame(ids, text, source, raw_label="", valence="", arousal=""):
+    """Build rows in the unified column layout; scalars are broadcast."""
+    n = len(ids)
+    columns = {
+        "id": ids,
+        "text": text,
+        "source": source,
+        "raw_label": raw_label,
+        "valence": valence,
+        "arousal": arousal,
+        "annotation_source": source,
+        "notes": "",
+    }
+    return pd.DataFrame({k: [v] * n if isinstance(v, str) else v for k, v in columns.items()}, columns=UNIFIED_COLUMNS)
+
+
+def process_goemotions(raw_dir=RAW, out_dir=INTERIM):
     # merge parts and convert: GoEmotions has categorical labels; valence/arousal empty (we'll fill later or map)
-    parts = [RAW / f"goemotions_{i}.csv" for i in [1, 2, 3]]
-    rows = []
+    parts = [raw_dir / f"goemotions_{i}.csv" for i in [1, 2, 3]]
+    frames = []
     for p in parts:
         if not p.exists():
             print("Missing:", p)
@@ -22,41 +90,41 @@ def process_goemotions():
             df = pd.read_csv(p)
             # expected columns: text, labels (or multi-hot), etc. This code may need adjustment based on file layout.
             if "text" in df.columns:
-                for i, r in df.iterrows():
-                    rows.append(
-                        {
-                            "id": f"go_{p.stem}_{i}",
-                            "text": str(r["text"]) if pd.notna(r["text"]) else "",
-                            "source": "goemotions",
-                            "raw_label": (
-                                str(r.get("labels", ""))
-                                if pd.notna(r.get("labels", ""))
-                                else ""
-                            ),
-                            "valence": "",
-                            "arousal": "",
-                            "annotation_source": "goemotions",
-                            "notes": "",
-                        }
+                rows = row_view(df)
+                text = column_values(rows, "text")
+                text_ok = pd.notna(text)
+                labels = column_values(rows, "labels")
+                if labels is None:
+                    raw_label = [""] * len(rows)
+                else:
+                    label_ok = pd.notna(labels)
+                    raw_label = [str(v) if ok else "" for v, ok in zip(labels, label_ok)]
+                frames.append(
+                    unified_frame(
+                        ids=(f"go_{p.stem}_" + rows.index.astype(str)).tolist(),
+                        text=[str(v) if ok else "" for v, ok in zip(text, text_ok)],
+                        source="goemotions",
+                        raw_label=raw_label,
                     )
+                )
         except Exception as e:
             print(f"Error processing {p}: {e}")
             continue
-    if rows:
-        out = INTERIM / "goemotions_unified.csv"
-        pd.DataFrame(rows).to_csv(out, index=False)
-        print(f"Wrote: {out} ({len(rows)} rows)")
+    n_rows = sum(len(f) for f in frames)
+    if n_rows:
+        out = write_table(pd.concat(frames, ignore_index=True), table_path(out_dir, "goemotions_unified"))
+        print(f"Wrote: {out} ({n_rows} rows)")
     else:
         print("No GoEmotions data processed.")
 
 
-def process_emobank():
+def process_emobank(raw_dir=RAW, out_dir=PROCESSED):
     # Try multiple possible file names and formats
     possible_files = [
-        RAW / "emobank.csv",
-        RAW / "emobank.tsv",
-        RAW / "emobank.txt",
-        RAW / "emobank.json",
+        raw_dir / "emobank.csv",
+        raw_dir / "emobank.tsv",
+        raw_dir / "emobank.txt",
+        raw_dir / "emobank.json",
     ]
     src = None
     for f in possible_files:
@@ -91,43 +159,30 @@ def process_emobank():
         print(f"Columns found: {list(df.columns)}")
         
         # EmoBank has columns: ID, Text, V, A, D etc — adapt to actual columns
-        out_rows = []
-        for i, r in df.iterrows():
-            text = (
-                r.get("text")
-                or r.get("sentence")
-                or r.get("Sentence")
-                or r.get("Text")
-                or r.get("text_tokenized")
-                or r.get("sentence_text")
-            )
-            if pd.isna(text):
-                continue
-            v = r.get("V") or r.get("valence") or r.get("Valence") or r.get("v")
-            a = r.get("A") or r.get("arousal") or r.get("Arousal") or r.get("a")
-            out_rows.append(
-                {
-                    "id": f"emobank_{i}",
-                    "text": str(text),
-                    "source": "emobank",
-                    "raw_label": "",
-                    "valence": float(v) if pd.notna(v) else "",
-                    "arousal": float(a) if pd.notna(a) else "",
-                    "annotation_source": "emobank",
-                    "notes": "",
-                }
-            )
-        if out_rows:
-            pd.DataFrame(out_rows).to_csv(PROCESSED / "emobank_va.csv", index=False)
-            print(f"Wrote: {PROCESSED / 'emobank_va.csv'} ({len(out_rows)} rows)")
+        rows = row_view(df)
+        text = first_truthy(rows, ["text", "sentence", "Sentence", "Text", "text_tokenized", "sentence_text"])
+        keep = ~pd.isna(text)
+        v = first_truthy(rows, ["V", "valence", "Valence", "v"])[keep]
+        a = first_truthy(rows, ["A", "arousal", "Arousal", "a"])[keep]
+        v_ok, a_ok = pd.notna(v), pd.notna(a)
+        out_rows = unified_frame(
+            ids=("emobank_" + rows.index[keep].astype(str)).tolist(),
+            text=to_str(text[keep]),
+            source="emobank",
+            valence=[float(x) if ok else "" for x, ok in zip(v, v_ok)],
+            arousal=[float(x) if ok else "" for x, ok in zip(a, a_ok)],
+        )
+        if len(out_rows):
+            out = write_table(out_rows, table_path(out_dir, "emobank_va"))
+            print(f"Wrote: {out} ({len(out_rows)} rows)")
     except Exception as e:
         print(f"Error processing EmoBank: {e}")
         print(f"File: {src}")
         print(f"Columns: {list(df.columns) if 'df' in locals() else 'N/A'}")
 
 
-def process_semeval():
-    src = RAW / "semeval2018_task1.zip"
+def process_semeval(raw_dir=RAW, out_dir=INTERIM):
+    src = raw_dir / "semeval2018_task1.zip"
     if not src.exists():
         print("SemEval dataset missing; skip")
         return
@@ -136,11 +191,11 @@ def process_semeval():
     )
 
 
-def process_isear():
+def process_isear(raw_dir=RAW, out_dir=INTERIM):
     # Try multiple possible file names for ISEAR
     possible_files = [
-        RAW / "isear.csv",
-        RAW / "eng_dataset.csv",  # Alternative name
+        raw_dir / "isear.csv",
+        raw_dir / "eng_dataset.csv",  # Alternative name
     ]
     src = None
     for f in possible_files:
@@ -158,7 +213,6 @@ def process_isear():
         print(f"Loading ISEAR from {src.name}")
         print(f"Columns found: {list(df.columns)}")
         
-        out_rows = []
         # ISEAR typically has columns like 'SIT', 'EMOT', 'TEXT' or 'content', 'sentiment'
         # Try multiple possible column names
         text_col = None
@@ -185,30 +239,26 @@ def process_isear():
                 label_col = col_name
                 break
         
-        for i, r in df.iterrows():
-            text = r.get(text_col)
-            if pd.isna(text) or str(text).strip() == "":
-                continue
-            
-            label = ""
-            if label_col:
-                label = str(r.get(label_col, "")) if pd.notna(r.get(label_col)) else ""
-            
-            out_rows.append(
-                {
-                    "id": f"isear_{i}",
-                    "text": str(text),
-                    "source": "isear",
-                    "raw_label": label,
-                    "valence": "",
-                    "arousal": "",
-                    "annotation_source": "isear",
-                    "notes": "",
-                }
-            )
-        if out_rows:
-            pd.DataFrame(out_rows).to_csv(INTERIM / "isear_unified.csv", index=False)
-            print(f"Wrote: {INTERIM / 'isear_unified.csv'} ({len(out_rows)} rows)")
+        rows = row_view(df)
+        text = column_values(rows, text_col)
+        text_str = np.array(to_str(text), dtype=object)
+        keep = ~pd.isna(text) & (pd.Series(text_str).str.strip() != "").to_numpy()
+
+        if label_col:
+            labels = column_values(rows, label_col)[keep]
+            raw_label = [str(v) if ok else "" for v, ok in zip(labels, pd.notna(labels))]
+        else:
+            raw_label = ""
+
+        out_rows = unified_frame(
+            ids=("isear_" + rows.index[keep].astype(str)).tolist(),
+            text=text_str[keep].tolist(),
+            source="isear",
+            raw_label=raw_label,
+        )
+        if len(out_rows):
+            out = write_table(out_rows, table_path(out_dir, "isear_unified"))
+            print(f"Wrote: {out} ({len(out_rows)} rows)")
     except Exception as e:
         print(f"Error processing ISEAR: {e}")
         print(f"File: {src}")
@@ -216,39 +266,245 @@ def process_isear():
             print(f"Columns: {list(df.columns)}")
 
 
-def merge_all():
-    # Merge interim & processed CSVs into a single processed/unified csv
-    files = list(INTERIM.glob("*.csv")) + list(PROCESSED.glob("*.csv"))
-    dfs = []
+MERGED_STEM = "all_text_emotion_dataset"
+
+# Every character str.split() splits on. Used as an explicit class because
+# pyarrow-backed string columns run regexes with RE2, where \s is ASCII only.
+WHITESPACE = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+)
+TOKEN_PATTERN = "[^" + WHITESPACE + "]+"
+
+
+class HashSet64:
+    """
+    Set of 64-bit hashes kept as sorted uint64 runs (8 bytes per entry).
+
+    New hashes are added as a sorted run; runs of similar size are merged,
+    so there are O(log n) runs and a lookup is one binary search per run.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(r) for r in self.runs)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            idx = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[idx] == hashes
+        return found
+
+    def add(self, hashes):
+        """Add hashes that are unique and not in the set yet."""
+        if len(hashes) == 0:
+            return
+        self.runs.append(np.sort(hashes))
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            last = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], last]))
+
+
+def merge_inputs(interim_dir=INTERIM, processed_dir=PROCESSED):
+    """Source tables for merge_all, excluding its own output."""
+    return sorted(f for f in interim_dir.iterdir() if is_table(f)) + sorted(
+        f for f in processed_dir.iterdir() if is_table(f) and f.stem != MERGED_STEM
+    )
+
+
+def merge_all(chunksize=100_000, interim_dir=INTERIM, processed_dir=PROCESSED):
+    # Merge interim & processed tables into a single processed/unified table.
+    # Sources are streamed in chunks: texts already seen (by 64-bit hash) and
+    # rows with fewer than 3 words are dropped, and the rest is appended
+    # to a temporary file that replaces the output at the end. Memory stays at
+    # one chunk plus 8 bytes per unique text, whatever the corpus size.
+    out = table_path(processed_dir, MERGED_STEM)
+    files = merge_inputs(interim_dir, processed_dir)
+
+    # Output columns: union of all non-empty sources, in order of appearance
+    columns, sources = [], []
     for f in files:
         try:
-            df = pd.read_csv(f)
-            if len(df) > 0:
-                dfs.append(df)
+            head = next(iter_table_chunks(f, chunksize=1), None)
         except Exception as e:
             print(f"Error reading {f}: {e}")
             continue
-    if not dfs:
+        if head is not None and len(head) > 0:
+            sources.append(f)
+            columns.extend(c for c in head.columns if c not in columns)
+    if not sources:
         print("Nothing to merge.")
         return
-    merged = pd.concat(dfs, ignore_index=True, sort=False)
-    # Remove duplicates based on text
-    merged = merged.drop_duplicates(subset=["text"], keep="first")
-    # Filter very short texts (< 3 words)
-    merged["word_count"] = merged["text"].str.split().str.len()
-    merged = merged[merged["word_count"] >= 3].drop(columns=["word_count"])
-    merged.to_csv(PROCESSED / "all_text_emotion_dataset.csv", index=False)
-    print(
-        f"Wrote merged dataset: {PROCESSED / 'all_text_emotion_dataset.csv'} ({len(merged)} rows)"
-    )
 
+    seen = HashSet64()
+    writer = TableWriter(out, columns)
+    for f in sources:
+        try:
+            # CSV values pass through exactly as written in the source
+            for chunk in iter_table_chunks(f, chunksize=chunksize):
+                if "text" not in chunk.columns:
+                    break
+                chunk = chunk[chunk["text"].notna()]
+                # Remove duplicates based on text
+                hashes = pd.util.hash_pandas_object(chunk["text"], index=False).to_numpy()
+                new = ~pd.Series(hashes).duplicated().to_numpy() & ~seen.contains(hashes)
+                seen.add(hashes[new])
+                chunk = chunk[new]
+                # Filter very short texts (< 3 words)
+                chunk = chunk[chunk["text"].str.count(TOKEN_PATTERN).to_numpy() >= 3]
+                writer.write(chunk)
+        except Exception as e:
+            print(f"Error reading {f}: {e}")
+            continue
+    writer.close()
+    print(f"Wrote merged dataset: {out} ({writer.rows} rows)")
 
-if __name__ == "__main__":
-    print("Processing datasets...")
-    process_goemotions()
-    process_emobank()
-    process_semeval()
-    process_isear()
-    print("\nMerging all datasets...")
-    merge_all()
+
+MANIFEST_NAME = "preprocess_manifest.json"
+MANIFEST_VERSION = 1
+
+# name -> (processor, candidate input files, output directory key, output table stem)
+DATASETS = {
+    "goemotions": (process_goemotions, ["goemotions_1.csv", "goemotions_2.csv", "goemotions_3.csv"], "interim", "goemotions_unified"),
+    "emobank": (process_emobank, ["emobank.csv", "emobank.tsv", "emobank.txt", "emobank.json"], "processed", "emobank_va"),
+    "semeval": (process_semeval, ["semeval2018_task1.zip"], "interim", None),
+    "isear": (process_isear, ["isear.csv", "eng_dataset.csv"], "interim", "isear_unified"),
+}
+
+
+def sha256_file(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(paths, previous=None):
+    """
+    Size, mtime and SHA-256 of each existing file. The hash is reused from
+    the previous fingerprint when size and mtime are unchanged.
+    """
+    previous = previous or {}
+    out = {}
+    for path in paths:
+        if not path.exists():
+            continue
+        st = path.stat()
+        old = previous.get(path.name)
+        if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+            digest = old["sha256"]
+        else:
+            digest = sha256_file(path)
+        out[path.name] = {"size": st.st_size, "mtime": st.st_mtime_ns, "sha256": digest}
+    return out
+
+
+def same_content(a, b):
+    """Fingerprints match on names, sizes and hashes (mtime alone may change)."""
+    return {k: (v["size"], v["sha256"]) for k, v in a.items()} == {k: (v["size"], v["sha256"]) for k, v in b.items()}
+
+
+def load_manifest(path):
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def save_manifest(path, manifest):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def run_all(raw_dir=RAW, interim_dir=INTERIM, processed_dir=PROCESSED, jobs=None, force=False, manifest_path=None):
+    """
+    Rebuild the datasets whose inputs changed (in parallel), then the merge.
+
+    A dataset is skipped when its input files have the same content as in
+    the manifest and its output still exists. The merge reruns when any of
+    its input tables changed or the merged table is missing.
+
+    Returns:
+        Dict with the built, skipped (unchanged) and missing dataset names, and whether the merge ran
+    """
+    dirs = {"interim": interim_dir, "processed": processed_dir}
+    manifest_path = manifest_path or interim_dir.parent / MANIFEST_NAME
+    manifest = {} if force else load_manifest(manifest_path)
+    previous = manifest.get("datasets", {})
+
+    todo, skipped, missing, inputs, datasets = [], [], [], {}, {}
+    for name, (_, candidates, out_key, out_file) in DATASETS.items():
+        prints = fingerprint([raw_dir / c for c in candidates], previous.get(name, {}).get("inputs"))
+        inputs[name] = prints
+        output_ok = out_file is None or table_path(dirs[out_key], out_file).exists()
+        if not prints:
+            missing.append(name)
+        elif name in previous and output_ok and same_content(prints, previous[name]["inputs"]):
+            skipped.append(name)
+            datasets[name] = {"inputs": prints}
+        else:
+            todo.append(name)
+
+    print(f"Processing datasets... {len(todo)} to build, {len(skipped)} unchanged, {len(missing)} missing")
+    for name in missing:
+        # Prints which files the processor looks for
+        DATASETS[name][0](raw_dir=raw_dir, out_dir=dirs[DATASETS[name][2]])
+
+    def output_mtime(name):
+        _, _, out_key, out_file = DATASETS[name]
+        path = table_path(dirs[out_key], out_file) if out_file else None
+        return path.stat().st_mtime_ns if path is not None and path.exists() else None
+
+    before = {name: output_mtime(name) for name in todo}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        for name in todo:
+            func, _, out_key, _ = DATASETS[name]
+            futures[name] = pool.submit(func, raw_dir=raw_dir, out_dir=dirs[out_key])
+        for name, fut in futures.items():
+            fut.result()
+            # Processors report their own errors; only record a dataset whose
+            # output was (re)written, so a failed build is retried next run
+            after = output_mtime(name)
+            if DATASETS[name][3] is None or (after is not None and after != before[name]):
+                datasets[name] = {"inputs": inputs[name]}
+
+    merged_path = table_path(processed_dir, MERGED_STEM)
+    merge_prints = fingerprint(merge_inputs(interim_dir, processed_dir), manifest.get("merge", {}).get("inputs"))
+    merged = False
+    if not merged_path.exists() or not same_content(merge_prints, manifest.get("merge", {}).get("inputs", {})):
+        print("\nMerging all datasets...")
+        merge_all(interim_dir=interim_dir, processed_dir=processed_dir)
+        merged = True
+    else:
+        print("\nMerged dataset up to date.")
+
+    save_manifest(manifest_path, {
+        "version": MANIFEST_VERSION,
+        "datasets": datasets,
+        "merge": {"inputs": merge_prints} if merged_path.exists() else {},
+    })
+    return {"built": todo, "skipped": skipped, "missing": missing, "merged": merged}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Preprocess raw text emotion datasets")
+    p.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument("--force", action="store_true", help="Ignore the manifest and rebuild everything")
+    p.add_argument("--format", choices=["csv", "parquet", "feather"], help=f"Output table format (default: ${FORMAT_ENV} or csv)")
+    args = p.parse_args()
+    if args.format:
+        os.environ[FORMAT_ENV] = args.format
+    run_all(jobs=args.jobs, force=args.force)
     print("Preprocessing complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,23 @@ import pandas as pd
 from pathlib import Path
 import sys
 
+# Allow running as a file (python modules/text/scripts/...) as well as with -m
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from modules.text.annotation_store import AnnotationStore, journal_path
+from modules.text.table_io import find_table, read_table, table_path
+
 ROOT = Path(__file__).resolve().parents[1]
 ANNOT = ROOT / "data" / "annotations"
-CSV_FILE = ANNOT / "sample_for_annotation.csv"
+
+
+def sample_file():
+    """The annotation sample in whichever format it was written."""
+    return find_table(ANNOT, "sample_for_annotation") or table_path(ANNOT, "sample_for_annotation")
+
+
+def open_store(path):
+    """The label journal for a sheet. Labels are written there as they are entered."""
+    return AnnotationStore(journal_path(path))
 
 
 def annotate_interactive(start_idx=0, annotator_num=1):
@@ -23,7 +37,13 @@ def annotate_interactive(start_idx=0, annotator_num=1):
         start_idx: Row index to start from (0-based)
         annotator_num: Which annotator (1, 2, or 3)
     """
-    df = pd.read_csv(CSV_FILE)
+    path = sample_file()
+    with open_store(path) as store:
+        _annotate(path, store, start_idx, annotator_num)
+
+
+def _annotate(path, store, start_idx, annotator_num):
+    df = store.overlay(read_table(path))
     
     v_col = f"annotator_{annotator_num}_valence"
     a_col = f"annotator_{annotator_num}_arousal"
@@ -41,8 +61,9 @@ def annotate_interactive(start_idx=0, annotator_num=1):
     print("- Enter valence (0.0-1.0): negative=low, positive=high")
     print("- Enter arousal (0.0-1.0): calm=low, excited=high")
     print("- Press Enter to skip a row")
-    print("- Type 'quit' or 'q' to save and exit")
-    print("- Type 'save' to save progress and continue")
+    print("- Each label is saved as soon as you enter it")
+    print("- Type 'quit' or 'q' to update the sheet and exit")
+    print("- Type 'save' to update the sheet and continue")
     print(f"\nStarting from row {start_idx + 1} of {len(df)}\n")
     
     for idx in range(start_idx, len(df)):
@@ -70,11 +91,11 @@ def annotate_interactive(start_idx=0, annotator_num=1):
         while True:
             v_input = input(f"Valence (0.0-1.0): ").strip()
             if v_input.lower() in ['quit', 'q']:
-                df.to_csv(CSV_FILE, index=False)
+                store.compact(path)
                 print(f"\nProgress saved. Exiting at row {idx+1}.")
                 return
             if v_input.lower() == 'save':
-                df.to_csv(CSV_FILE, index=False)
+                store.compact(path)
                 print(f"\nProgress saved. Continuing...")
                 continue
             if v_input == '':
@@ -96,7 +117,7 @@ def annotate_interactive(start_idx=0, annotator_num=1):
         while True:
             a_input = input(f"Arousal (0.0-1.0): ").strip()
             if a_input.lower() in ['quit', 'q']:
-                df.to_csv(CSV_FILE, index=False)
+                store.compact(path)
                 print(f"\nProgress saved. Exiting at row {idx+1}.")
                 return
             if a_input == '':
@@ -114,14 +135,15 @@ def annotate_interactive(start_idx=0, annotator_num=1):
         if a_input == '':
             continue
         
-        # Save to dataframe
+        # Save to the journal (committed immediately) and the in-memory sheet
+        store.record(row['id'], annotator_num, v, a)
         df.at[idx, v_col] = v
         df.at[idx, a_col] = a
         
         print(f"Saved: V={v}, A={a}")
     
     # Save final results
-    df.to_csv(CSV_FILE, index=False)
+    store.compact(path)
     print(f"\n{'='*60}")
     print("Annotation complete! All annotations saved.")
     print(f"{'='*60}")
@@ -129,7 +151,9 @@ def annotate_interactive(start_idx=0, annotator_num=1):
 
 def show_statistics():
     """Show current annotation statistics."""
-    df = pd.read_csv(CSV_FILE)
+    path = sample_file()
+    with open_store(path) as store:
+        df = store.overlay(read_table(path))
     
     print("\nCurrent Annotation Status:")
     print("=" * 60)
@@ -160,6 +184,9 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         if sys.argv[1] == "stats":
             show_statistics()
+        elif sys.argv[1] == "compact":
+            with open_store(sample_file()) as store:
+                print(f"Wrote all journal labels into {store.compact(sample_file())}")
         elif sys.argv[1] == "interactive":
             annotator = int(sys.argv[2]) if len(sys.argv) > 2 else 1
             start = int(sys.argv[3]) if len(sys.argv) > 3 else 0
@@ -168,6 +195,7 @@ if __name__ == "__main__":
             print("Usage:")
             print("  python -m modules.text.scripts.quick_annotate stats                    # Show statistics")
             print("  python -m modules.text.scripts.quick_annotate interactive [1|2|3] [start_idx]  # Start annotation")
+            print("  python -m modules.text.scripts.quick_annotate compact                  # Write journal labels into the sheet")
     else:
         # Default: show stats and offer to start
         show_statistics()
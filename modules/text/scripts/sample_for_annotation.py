@@ -1,59 +1,129 @@
-import random
+import argparse
+import sys
 from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+import numpy as np
 import pandas as pd
 
+# Allow running as a file (python modules/text/scripts/...) as well as with -m
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from modules.text.sampling import ALLOCATIONS, ReservoirSampler
+from modules.text.table_io import find_table, is_table, iter_table_chunks, read_table, table_columns, table_path, write_table
+
 ROOT = Path(__file__).resolve().parents[1]
 PROCESSED = ROOT / "data" / "processed"
 ANNOT = ROOT / "data" / "annotations"
 ANNOT.mkdir(parents=True, exist_ok=True)
 
+# create columns for 3 annotators (they will fill)
+SAMPLE_COLUMNS = [
+    "id",
+    "text",
+    "source",
+    "annotator_1_valence",
+    "annotator_1_arousal",
+    "annotator_2_valence",
+    "annotator_2_arousal",
+    "annotator_3_valence",
+    "annotator_3_arousal",
+    "avg_valence",
+    "avg_arousal",
+    "notes",
+]
+
+
+def annotated_tables() -> List[Path]:
+    """Existing annotation tables: the current sample and the finalized annotations."""
+    found = [find_table(ANNOT, "sample_for_annotation"), find_table(PROCESSED, "annotation_final")]
+    return [p for p in found if p is not None]
+
+
+def annotated_ids(paths: Iterable) -> Set[str]:
+    """IDs (as strings) in the given tables; files that do not exist are skipped."""
+    ids = set()
+    for path in paths:
+        path = Path(path)
+        if path.exists() and is_table(path) and "id" in table_columns(path):
+            ids.update(read_table(path, columns=["id"])["id"].dropna().astype(str))
+    return ids
+
+def sample(n=300, seed=42, stratify: Optional[List[str]] = None, allocation="proportional",
+           exclude: Optional[Iterable] = None, chunksize=100_000, stem="sample_for_annotation"):
+    """
+    Draw texts for annotation in one streaming pass over the merged corpus.
 
-def sample(n=300, seed=42):
-    input_file = PROCESSED / "all_text_emotion_dataset.csv"
-    if not input_file.exists():
-        print(f"Error: {input_file} not found. Run preprocess_datasets.py first.")
-        return
+    Args:
+        n: Sample size
+        seed: Random seed
+        stratify: Columns to stratify by (e.g. ["source", "raw_label"])
+        allocation: How n is split over strata: "proportional" or "equal"
+        exclude: IDs that must not be drawn (e.g. already annotated ones)
+        chunksize: Rows read per chunk
+        stem: Output table name in data/annotations
 
-    df = pd.read_csv(input_file)
-    df = df.dropna(subset=["text"])
-    # Filter out empty texts
-    df = df[df["text"].str.strip() != ""]
+    Returns:
+        Path of the written table, or None if there was nothing to sample
+    """
+    input_file = find_table(PROCESSED, "all_text_emotion_dataset")
+    if input_file is None:
+        print(f"Error: {table_path(PROCESSED, 'all_text_emotion_dataset')} not found. Run preprocess_datasets.py first.")
+        return None
 
-    if len(df) == 0:
+    # Only the columns copied into the sample (or used as strata) are loaded
+    available = table_columns(input_file)
+    missing = [c for c in stratify or [] if c not in available]
+    if missing:
+        print(f"Error: cannot stratify by {', '.join(missing)}; {input_file.name} has no such column.")
+        return None
+    columns = list(dict.fromkeys(c for c in ["id", "text", "source", *(stratify or [])] if c in available))
+
+    sampler = ReservoirSampler(n, seed=seed, stratify=stratify, exclude=exclude)
+    offset = 0
+    for chunk in iter_table_chunks(input_file, chunksize=chunksize, columns=columns):
+        if "id" not in chunk.columns:
+            chunk = chunk.assign(id=np.arange(offset, offset + len(chunk)))
+        offset += len(chunk)
+        # Filter out empty texts
+        text = chunk["text"]
+        sampler.add(chunk[text.notna() & (text.astype(str).str.strip() != "")])
+
+    df_sample = sampler.result(allocation)
+    if len(df_sample) == 0:
         print("No data to sample from.")
-        return
-
-    sample_size = min(n, len(df))
-    df_sample = df.sample(n=sample_size, random_state=seed)
-
-    out = ANNOT / "sample_for_annotation.csv"
-    # create columns for 3 annotators (they will fill)
-    cols = [
-        "id",
-        "text",
-        "source",
-        "annotator_1_valence",
-        "annotator_1_arousal",
-        "annotator_2_valence",
-        "annotator_2_arousal",
-        "annotator_3_valence",
-        "annotator_3_arousal",
-        "avg_valence",
-        "avg_arousal",
-        "notes",
-    ]
-    df_out = pd.DataFrame(columns=cols)
-    df_out["id"] = (
-        df_sample["id"].values if "id" in df_sample.columns else range(len(df_sample))
-    )
+        return None
+
+    out = table_path(ANNOT, stem)
+    df_out = pd.DataFrame(columns=SAMPLE_COLUMNS)
+    df_out["id"] = df_sample["id"].values
     df_out["text"] = df_sample["text"].values
-    df_out["source"] = (
-        df_sample.get("source", "").values if "source" in df_sample.columns else ""
-    )
-    df_out.to_csv(out, index=False)
-    print(f"Wrote sample for annotation: {out} ({len(df_out)} rows)")
-    print(f"Columns ready for annotators: {', '.join(cols[3:9])}")
+    df_out["source"] = df_sample["source"].values if "source" in df_sample.columns else ""
+    write_table(df_out, out)
+    print(f"Wrote sample for annotation: {out} ({len(df_out)} of {sampler.seen} rows, {sampler.excluded} excluded)")
+    if stratify:
+        drawn = sampler.strata(df_sample).value_counts()
+        for stratum, count in drawn.sort_index().items():
+            print(f"  {stratum or '(none)'}: {count} of {sampler.counts[stratum]}")
+    print(f"Columns ready for annotators: {', '.join(SAMPLE_COLUMNS[3:9])}")
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Draw a batch of texts for annotation")
+    p.add_argument("--n", type=int, default=300, help="Sample size")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--stratify", nargs="+", metavar="COLUMN", help="Stratify by these columns, e.g. source raw_label")
+    p.add_argument("--allocation", choices=ALLOCATIONS, default="proportional", help="How the sample is split over strata")
+    p.add_argument("--exclude", nargs="+", default=[], metavar="TABLE", help="Skip IDs found in these tables")
+    p.add_argument("--exclude-annotated", action="store_true", help="Skip IDs in the current sample and the finalized annotations")
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.add_argument("--stem", default="sample_for_annotation", help="Output table name in data/annotations")
+    args = p.parse_args()
+
+    tables = list(args.exclude) + (annotated_tables() if args.exclude_annotated else [])
+    sample(args.n, seed=args.seed, stratify=args.stratify, allocation=args.allocation,
+           exclude=annotated_ids(tables), chunksize=args.chunksize, stem=args.stem)
 
 
 if __name__ == "__main__":
-    sample(300)
+    main()
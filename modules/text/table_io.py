@@ -0,0 +1,265 @@
+"""
+Table storage for the text corpus scripts.
+
+Tables are CSV by default. Set SOYL_TEXT_FORMAT=parquet (or feather, i.e.
+Arrow IPC) to store them in a columnar format instead. Columnar tables are
+typed on write:
+- valence/arousal columns (including annotator_*_valence, avg_arousal, ...)
+  are stored as float64
+- source and annotation_source are dictionary-encoded (pandas category)
+
+Reads can project columns and memory-map the file. Feather files are
+written uncompressed so a memory-mapped read does not copy the data.
+pyarrow is only needed for the columnar formats.
+
+Scripts refer to tables by directory and stem ("all_text_emotion_dataset").
+find_table picks whichever format exists, preferring the configured one.
+"""
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+FORMAT_ENV = "SOYL_TEXT_FORMAT"
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+CATEGORY_COLUMNS = ("source", "annotation_source")
+
+
+def default_format() -> str:
+    fmt = os.environ.get(FORMAT_ENV, "csv").lower()
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"{FORMAT_ENV} must be one of {', '.join(EXTENSIONS)}, got {fmt!r}")
+    return fmt
+
+
+def format_of(path) -> str:
+    suffix = Path(path).suffix.lower()
+    for fmt, ext in EXTENSIONS.items():
+        if ext == suffix:
+            return fmt
+    raise ValueError(f"Unsupported table file: {path}")
+
+
+def is_table(path) -> bool:
+    return Path(path).suffix.lower() in EXTENSIONS.values()
+
+
+def table_path(directory, stem: str, fmt: Optional[str] = None) -> Path:
+    """Path of a table in the given (or configured) format."""
+    return Path(directory) / (stem + EXTENSIONS[fmt or default_format()])
+
+
+def find_table(directory, stem: str) -> Optional[Path]:
+    """Existing table for a stem, trying the configured format first."""
+    first = default_format()
+    for fmt in [first] + [f for f in EXTENSIONS if f != first]:
+        path = table_path(directory, stem, fmt)
+        if path.exists():
+            return path
+    return None
+
+
+def is_float_column(name: str) -> bool:
+    return name in ("valence", "arousal") or name.endswith(("_valence", "_arousal"))
+
+
+def typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Float valence/arousal columns and categorical source columns."""
+    df = df.copy()
+    for col in df.columns:
+        if is_float_column(col):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        elif col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"{fmt} tables need pyarrow (pip install pyarrow)") from None
+
+
+def read_table(path, columns: Optional[List[str]] = None, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Read a table.
+
+    Args:
+        path: .csv, .parquet or .feather file
+        columns: Columns to load (all if None), returned in this order
+        memory_map: Memory-map columnar files instead of reading them into buffers
+
+    Returns:
+        DataFrame
+    """
+    fmt = format_of(path)
+    if fmt == "csv":
+        df = pd.read_csv(path, usecols=columns)
+        return df[columns] if columns is not None else df
+    _require_pyarrow(fmt)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, columns=columns, memory_map=memory_map)
+    else:
+        import pyarrow.feather as feather
+        table = feather.read_table(path, columns=columns, memory_map=memory_map)
+    return table.to_pandas()
+
+
+def write_table(df: pd.DataFrame, path) -> Path:
+    """Write a table atomically (temporary file, then rename)."""
+    path = Path(path)
+    fmt = format_of(path)
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "csv":
+        df.to_csv(tmp, index=False)
+    else:
+        _require_pyarrow(fmt)
+        df = typed(df)
+        if fmt == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.reset_index(drop=True).to_feather(tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return path
+
+
+def table_columns(path) -> List[str]:
+    """Column names without loading the data."""
+    fmt = format_of(path)
+    if fmt == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    _require_pyarrow(fmt)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    import pyarrow.feather as feather
+    return list(feather.read_table(path, memory_map=True).schema.names)
+
+
+def iter_table_chunks(path, chunksize: int = 100_000, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a table in chunks, optionally only some columns (in that order).
+    CSV values come back as strings (dtype=str); columnar tables keep their
+    stored types.
+    """
+    fmt = format_of(path)
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize, usecols=columns):
+            yield chunk[columns] if columns is not None else chunk
+        return
+    _require_pyarrow(fmt)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunksize, columns=columns)
+    else:
+        import pyarrow.feather as feather
+        batches = feather.read_table(path, columns=columns, memory_map=True).to_batches(max_chunksize=chunksize)
+    for batch in batches:
+        chunk = batch.to_pandas()
+        yield chunk[columns] if columns is not None else chunk
+
+
+class TableWriter:
+    """
+    Append chunks with a fixed column list to one table, written to a
+    temporary file and moved into place by close().
+
+    For columnar formats, category columns share one growing dictionary, so
+    every chunk has the same schema and Arrow IPC only ever needs dictionary
+    deltas.
+    """
+
+    def __init__(self, path, columns: List[str]):
+        self.path = Path(path)
+        self.fmt = format_of(self.path)
+        self.columns = list(columns)
+        self.rows = 0
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._writer = None
+        self._dictionaries: Dict[str, Dict[str, int]] = {c: {} for c in self.columns if c in CATEGORY_COLUMNS}
+        if self.fmt == "csv":
+            self._fh = open(self._tmp, "w", newline="", encoding="utf-8")
+            pd.DataFrame(columns=self.columns).to_csv(self._fh, index=False)
+        else:
+            _require_pyarrow(self.fmt)
+            import pyarrow as pa
+            fields = []
+            for c in self.columns:
+                if is_float_column(c):
+                    fields.append(pa.field(c, pa.float64()))
+                elif c in self._dictionaries:
+                    fields.append(pa.field(c, pa.dictionary(pa.int32(), pa.string())))
+                else:
+                    fields.append(pa.field(c, pa.string()))
+            self.schema = pa.schema(fields)
+
+    def _batch(self, chunk: pd.DataFrame):
+        import pyarrow as pa
+        arrays = []
+        for field in self.schema:
+            col = chunk[field.name]
+            if pa.types.is_floating(field.type):
+                arrays.append(pa.array(pd.to_numeric(col, errors="coerce").to_numpy(dtype="float64"), type=pa.float64(), from_pandas=True))
+                continue
+            values = col.astype("string")
+            if field.name in self._dictionaries:
+                mapping = self._dictionaries[field.name]
+                for v in values.dropna().unique():
+                    mapping.setdefault(v, len(mapping))
+                codes = pd.Categorical(values, categories=list(mapping)).codes.astype(np.int32)
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(codes, mask=codes < 0, type=pa.int32()), pa.array(list(mapping), type=pa.string())
+                ))
+            else:
+                arrays.append(pa.array(values, type=pa.string(), from_pandas=True))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def write(self, chunk: pd.DataFrame):
+        if list(chunk.columns) != self.columns:
+            chunk = chunk.reindex(columns=self.columns)
+        self.rows += len(chunk)
+        if self.fmt == "csv":
+            chunk.to_csv(self._fh, header=False, index=False)
+            return
+        if len(chunk) == 0:
+            return
+        batch = self._batch(chunk)
+        if self._writer is None:
+            self._open()
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def _open(self):
+        import pyarrow as pa
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self._tmp, self.schema)
+        else:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(self._tmp, self.schema, options=options)
+
+    def close(self) -> Path:
+        if self.fmt == "csv":
+            self._fh.close()
+        else:
+            if self._writer is None:
+                self._open()
+            self._writer.close()
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def abort(self):
+        """Drop the temporary file without touching the target."""
+        if self.fmt == "csv":
+            self._fh.close()
+        elif self._writer is not None:
+            self._writer.close()
+        if self._tmp.exists():
+            self._tmp.unlink()
@@ -5,7 +5,43 @@ Uses a simple rule-based sentiment for the stub.
 
 Replace with DistilBERT / fine-tuned transformer for production.
 """
-from typing import Dict
+from typing import Dict, List
+
+from modules.text.cache import CachedScorer, ResultCache
+from modules.text.lexicon import get_default_lexicon
+
+# Output for the winning lexicon category
+CATEGORY_OUTPUTS = {
+    "positive": {"valence": 0.9, "arousal": 0.6, "confidence": 0.8, "source": "text"},
+    "negative": {"valence": 0.1, "arousal": 0.6, "confidence": 0.8, "source": "text"},
+    "uncertain": {"valence": 0.5, "arousal": 0.3, "confidence": 0.6, "source": "text"},
+}
+NEUTRAL_OUTPUT = {"valence": 0.5, "arousal": 0.35, "confidence": 0.5, "source": "text"}
+
+def score_text(text: str) -> Dict:
+    """
+    Score one text with the keyword lexicon (uncached).
+    
+    Keywords are matched as whole words in one pass over the text; the
+    category with the highest total keyword weight wins (ties go to
+    positive, then negative, then uncertain).
+    """
+    category = get_default_lexicon().classify(text)
+    return dict(CATEGORY_OUTPUTS.get(category, NEUTRAL_OUTPUT))
+
+# Results are memoized on normalized text; a model-backed scorer can reuse this cache
+text_cache = ResultCache(maxsize=4096, ttl=600.0)
+text_scorer = CachedScorer(score_text, cache=text_cache)
+
+def set_backend(backend) -> None:
+    """
+    Route text scoring through a backend from modules.text.backends.
+    
+    Cached results from the previous backend are dropped.
+    """
+    text_scorer.score = backend.score
+    text_scorer.score_many = backend.score_batch
+    text_cache.clear()
 
 def infer_from_text(text: str) -> Dict:
     """
@@ -17,22 +53,22 @@ def infer_from_text(text: str) -> Dict:
     Returns:
         Dict with valence, arousal, confidence, source
     """
-    text_lower = text.lower()
-    
-    # Positive keywords
-    if any(w in text_lower for w in ["love", "great", "like", "awesome", "perfect", "nice"]):
-        return {"valence": 0.9, "arousal": 0.6, "confidence": 0.8, "source": "text"}
+    return text_scorer(text)
+
+def infer_from_texts(texts: List[str]) -> List[Dict]:
+    """
+    Infer emotion for a batch of texts.
     
-    # Negative keywords
-    if any(w in text_lower for w in ["hate", "bad", "worst", "terrible", "nope"]):
-        return {"valence": 0.1, "arousal": 0.6, "confidence": 0.8, "source": "text"}
+    Identical texts (after normalization) are scored once; results come
+    back in input order.
     
-    # Uncertain keywords
-    if any(w in text_lower for w in ["maybe", "not sure", "unsure", "could be"]):
-        return {"valence": 0.5, "arousal": 0.3, "confidence": 0.6, "source": "text"}
+    Args:
+        texts: List of input text strings
     
-    # Default neutral
-    return {"valence": 0.5, "arousal": 0.35, "confidence": 0.5, "source": "text"}
+    Returns:
+        List of dicts with valence, arousal, confidence, source
+    """
+    return text_scorer.many(texts)
 
 if __name__ == "__main__":
     print(infer_from_text("I like this product a lot!"))
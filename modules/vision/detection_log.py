@@ -0,0 +1,196 @@
+"""
+Append-only detection log for long face-emotion sessions.
+
+Records are written as NDJSON (one JSON object per line) into numbered
+segment files: emotion_log-00000.ndjson, emotion_log-00001.ndjson, ...
+The writer flushes every `flush_records` records, and a background timer
+flushes pending records every `flush_every` seconds even when detections
+stop arriving. It starts a new segment once the current one passes
+`max_bytes`, so memory stays constant and a crash loses at most one flush
+interval.
+
+The readers stream records back one at a time, optionally through mmap, or
+gather selected fields into NumPy columns for analytics.
+"""
+import json
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+DEFAULT_PREFIX = "emotion_log"
+
+
+class DetectionLogWriter:
+    """
+    Rotating NDJSON writer.
+
+    Args:
+        directory: Folder for the segment files (created if missing)
+        prefix: Segment file name prefix
+        flush_every: Most seconds a record stays unflushed (0 disables the timer)
+        flush_records: Records between flushes
+        max_bytes: Segment size that triggers rotation
+        fsync: Also fsync on flush, for durability across power loss
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        prefix: str = DEFAULT_PREFIX,
+        flush_every: float = 1.0,
+        flush_records: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        fsync: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.flush_every = flush_every
+        self.flush_records = flush_records
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+
+        self.records_written = 0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._segment = self._next_segment_index()
+        self._file = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._open()
+        self._timer = None
+        if flush_every > 0:
+            self._timer = threading.Thread(target=self._flush_periodically, name="detection-log-flush", daemon=True)
+            self._timer.start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_every):
+            with self._lock:
+                if self._pending and time.monotonic() - self._last_flush >= self.flush_every:
+                    self.flush()
+
+    def _next_segment_index(self) -> int:
+        existing = segment_files(self.directory, self.prefix)
+        if not existing:
+            return 0
+        return int(existing[-1].stem.rsplit("-", 1)[1]) + 1
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{self.prefix}-{self._segment:05d}.ndjson"
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        self._bytes = self._file.tell()
+
+    def write(self, record: Dict):
+        """Append one record."""
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self._bytes += len(line)
+            self._pending += 1
+            self.records_written += 1
+
+            if self._bytes >= self.max_bytes:
+                self.rotate()
+            elif self._pending >= self.flush_records or time.monotonic() - self._last_flush >= self.flush_every:
+                self.flush()
+
+    def write_many(self, records: Iterable[Dict]):
+        for r in records:
+            self.write(r)
+
+    def flush(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def rotate(self):
+        """Close the current segment and start the next one."""
+        self.flush()
+        self._file.close()
+        self._segment += 1
+        self._open()
+
+    def close(self):
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self.flush()
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def segment_files(path: Union[str, Path], prefix: str = DEFAULT_PREFIX) -> List[Path]:
+    """List a log's segment files in write order (a single file is returned as-is)."""
+    path = Path(path)
+    if path.is_file():
+        return [path]
+    return sorted(path.glob(f"{prefix}-*.ndjson"))
+
+
+def _iter_lines(path: Path, use_mmap: bool) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        if use_mmap:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from iter(mm.readline, b"")
+        else:
+            yield from f
+
+
+def iter_detection_logs(
+    path: Union[str, Path],
+    prefix: str = DEFAULT_PREFIX,
+    use_mmap: bool = False,
+) -> Iterator[Dict]:
+    """
+    Stream records from a log directory (or one segment file).
+
+    A truncated last line, e.g. after a crash mid-write, is skipped.
+    """
+    for seg in segment_files(path, prefix):
+        for line in _iter_lines(seg, use_mmap):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def load_detection_columns(
+    path: Union[str, Path],
+    fields: Optional[List[str]] = None,
+    prefix: str = DEFAULT_PREFIX,
+) -> Dict[str, np.ndarray]:
+    """
+    Read selected fields of every record into NumPy columns (via mmap).
+
+    Args:
+        path: Log directory or segment file
+        fields: Record keys to keep (default: timestamp, emotion, confidence_percent)
+    """
+    fields = fields or ["timestamp", "emotion", "confidence_percent"]
+    cols = {f: [] for f in fields}
+    for rec in iter_detection_logs(path, prefix, use_mmap=True):
+        for f in fields:
+            cols[f].append(rec.get(f))
+    return {f: np.asarray(v) for f, v in cols.items()}
@@ -64,97 +64,271 @@ if __name__ == "__main__":
     webcam_demo()'''
 
 import cv2
-import tensorflow as tf
-from tensorflow.keras.models import load_model
 import numpy as np
-import json
 import time
+from typing import Dict, List, Optional, Sequence
 
 MODEL_FILE='multi_emotion_model_stable.h5'
 HAAR_CASCADE_FILE = 'haarcascade_frontalface_default.xml'
 EMOTION_LABELS = ['Angry', 'Happy', 'Sad']
 MODEL_INPUT_SIZE = (48, 48)
-OUTPUT_JSON_FILE = 'emotion_log.json'
+OUTPUT_LOG_DIR = 'emotion_logs'
 
-try:
-    model = load_model(MODEL_FILE)
-    print(f"[INFO] Successfully loaded model: {MODEL_FILE}")
-except Exception as e:
-    print(f"[ERROR] Could not load model. Ensure '{MODEL_FILE}' is in the directory.")
-    exit()
+# Valence/arousal anchor for each label (circumplex model of affect).
+# Fusion-ready outputs are the probability-weighted mix of these anchors.
+EMOTION_VA = {
+    'Angry': (0.15, 0.85),
+    'Happy': (0.9, 0.7),
+    'Sad': (0.2, 0.25),
+}
 
-try:
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + HAAR_CASCADE_FILE)
+
+def load_emotion_model(model_file: str = MODEL_FILE):
+    """Load the Keras emotion model. TensorFlow is imported here, not at module import."""
+    from tensorflow.keras.models import load_model
+    return load_model(model_file)
+
+
+def load_face_cascade(cascade_file: str = HAAR_CASCADE_FILE):
+    """
+    Load the Haar cascade from OpenCV's bundled data, falling back to a local file.
+
+    Raises:
+        FileNotFoundError: if neither location has a usable cascade
+    """
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + cascade_file)
     if face_cascade.empty():
-        face_cascade = cv2.CascadeClassifier(HAAR_CASCADE_FILE)
+        face_cascade = cv2.CascadeClassifier(cascade_file)
         if face_cascade.empty():
-             raise FileNotFoundError
-    print(f"[INFO] Successfully loaded cascade: {HAAR_CASCADE_FILE}")
-except FileNotFoundError:
-    print(f"[ERROR] Could not load Haar Cascade file. Ensure '{HAAR_CASCADE_FILE}' is available.")
-    exit()
-
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("[FATAL] Error: Could not open video stream.")
-    exit()
-
-detection_log = []
-
-print("\length[START] Real-time detection started. Press 'q' to exit and save results.")
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(
-        gray_frame,
-        scaleFactor=1.1,
-        minNeighbors=5,
-        minSize=(30, 30),
-        flags=cv2.CASCADE_SCALE_IMAGE
-    )
-
-    current_timestamp = time.time()
-
-    for (item, output, w, h) in faces:
-        cv2.rectangle(frame, (item, output), (item + w, output + h), (0, 255, 0), 2)
-        face_roi = gray_frame[output:output + h, item:item + w]
-
-        resized_face = cv2.resize(face_roi, MODEL_INPUT_SIZE, interpolation=cv2.INTER_AREA)
-        normalized_face = resized_face.astype('float32') / 255.0
-        cnn_input = np.expand_dims(normalized_face, axis=0)
-        cnn_input = np.expand_dims(cnn_input, axis=-1)
-
-        predictions = model.predict(cnn_input, verbose=0)[0]
-        emotion_index = np.argmax(predictions)
-        emotion_label = EMOTION_LABELS[emotion_index]
-        confidence = float(predictions[emotion_index]) * 100
-
-        detection_log.append({
-            "timestamp": current_timestamp,
-            "time_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(current_timestamp)),
-            "emotion": emotion_label,
-            "confidence_percent": round(confidence, 2),
-            "location_x_y_w_h": [int(item), int(output), int(w), int(h)]
-        })
-
-        text = f"{emotion_label} ({confidence:.1f}%)"
-        text_color = (0, 255, 0) if confidence > 60 else (0, 165, 255)
-        cv2.putText(frame, text, (item, output - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, text_color, 2, cv2.LINE_AA)
-
-    cv2.imshow('Live Emotion Detector', frame)
-
-    if cv2.waitKey(1) & 0xFF  == ord('q'):
-        break
-
-cap.release()
-cv2.destroyAllWindows()
-
-with open(OUTPUT_JSON_FILE, 'w') as f:
-    json.dump(detection_log, f, indent=4)
-
-print(f"\length[END] Detection stopped.")
-print(f"Results saved to: {OUTPUT_JSON_FILE}")
\ No newline at end of file
+            raise FileNotFoundError(cascade_file)
+    return face_cascade
+
+
+class FaceEmotionEngine:
+    """
+    Batched face emotion inference with the model loaded once.
+
+    Every face ROI of a frame (or of a list of frames) is resized, normalized
+    and stacked into one (N, 48, 48, 1) tensor, so a crowded frame costs one
+    model dispatch instead of one per face.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        face_cascade=None,
+        model_file: str = MODEL_FILE,
+        cascade_file: str = HAAR_CASCADE_FILE,
+        labels: Sequence[str] = EMOTION_LABELS,
+        input_size=MODEL_INPUT_SIZE,
+    ):
+        """
+        Args:
+            model: Object with a Keras-style predict(batch, verbose=0); loaded from model_file if None
+            face_cascade: cv2.CascadeClassifier; loaded from cascade_file if None
+            model_file: Path to the .h5 model
+            cascade_file: Haar cascade file name
+            labels: Emotion label per model output
+            input_size: Model input (width, height)
+        """
+        self.model = model if model is not None else load_emotion_model(model_file)
+        self.face_cascade = face_cascade if face_cascade is not None else load_face_cascade(cascade_file)
+        self.labels = list(labels)
+        self.input_size = tuple(input_size)
+        self._va = np.array([EMOTION_VA.get(l, (0.5, 0.5)) for l in self.labels], dtype=np.float32)
+
+    def detect(self, gray_frame: np.ndarray) -> np.ndarray:
+        """Detect faces in a grayscale frame. Returns an (N, 4) int array of x, y, w, h."""
+        faces = self.face_cascade.detectMultiScale(
+            gray_frame,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(30, 30),
+            flags=cv2.CASCADE_SCALE_IMAGE
+        )
+        return np.asarray(faces, dtype=np.int32).reshape(-1, 4)
+
+    def preprocess(self, gray_frame: np.ndarray, boxes: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Crop, resize and normalize face ROIs into an (N, H, W, 1) float32 batch."""
+        w_in, h_in = self.input_size
+        if out is None:
+            out = np.empty((len(boxes), h_in, w_in, 1), dtype=np.float32)
+        for i, (x, y, w, h) in enumerate(boxes):
+            roi = gray_frame[y:y + h, x:x + w]
+            resized = cv2.resize(roi, self.input_size, interpolation=cv2.INTER_AREA)
+            np.divide(resized, np.float32(255.0), out=out[i, :, :, 0], casting='unsafe')
+        return out
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Run the model once over a batch of preprocessed ROIs."""
+        if len(batch) == 0:
+            return np.empty((0, len(self.labels)), dtype=np.float32)
+        return np.asarray(self.model.predict(batch, verbose=0))
+
+    def to_outputs(self, probs: np.ndarray, boxes: np.ndarray) -> List[Dict]:
+        """Turn class probabilities into fusion-ready dicts."""
+        if len(probs) == 0:
+            return []
+        idx = probs.argmax(axis=1)
+        conf = probs[np.arange(len(probs)), idx]
+        va = (probs / np.maximum(probs.sum(axis=1, keepdims=True), 1e-9)) @ self._va
+        return [
+            {
+                "valence": round(float(va[i, 0]), 4),
+                "arousal": round(float(va[i, 1]), 4),
+                "confidence": round(float(conf[i]), 4),
+                "source": "face",
+                "emotion": self.labels[int(idx[i])],
+                "box": [int(v) for v in boxes[i]],
+            }
+            for i in range(len(probs))
+        ]
+
+    def infer_gray(self, gray_frames: Sequence[np.ndarray], boxes: Sequence[np.ndarray]) -> List[List[Dict]]:
+        """Classify known face boxes on grayscale frames with a single model call."""
+        counts = [len(b) for b in boxes]
+        w_in, h_in = self.input_size
+        batch = np.empty((sum(counts), h_in, w_in, 1), dtype=np.float32)
+        start = 0
+        for gray, b, n in zip(gray_frames, boxes, counts):
+            self.preprocess(gray, b, out=batch[start:start + n])
+            start += n
+        probs = self.predict(batch)
+
+        results, start = [], 0
+        for b, n in zip(boxes, counts):
+            results.append(self.to_outputs(probs[start:start + n], b))
+            start += n
+        return results
+
+    def infer(self, frames) -> List[List[Dict]]:
+        """
+        Detect and classify every face in one BGR frame or a list of frames.
+
+        Args:
+            frames: BGR frame (numpy array) or a list of frames
+
+        Returns:
+            One list per frame of dicts with valence, arousal, confidence,
+            source, emotion and box
+        """
+        if isinstance(frames, np.ndarray) and frames.ndim == 3:
+            frames = [frames]
+        grays = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) if f.ndim == 3 else f for f in frames]
+        boxes = [self.detect(g) for g in grays]
+        return self.infer_gray(grays, boxes)
+
+
+def infer_from_frame(frame: np.ndarray, engine: Optional[FaceEmotionEngine] = None) -> Optional[Dict]:
+    """
+    Infer emotion from a video frame.
+
+    Args:
+        frame: OpenCV BGR frame (numpy array)
+        engine: Face engine; without one the brightness heuristic of the
+            original stub is used
+
+    Returns:
+        Dict with valence, arousal, confidence, source (plus emotion, box and
+        faces for the engine, which reports the largest face), or None when
+        the engine finds no face
+    """
+    if engine is None:
+        brightness = float(np.mean(frame)) / 255.0
+        valence = min(1.0, 0.5 + (brightness - 0.5))
+        arousal = min(1.0, 0.5 + abs(brightness - 0.5))
+        confidence = 0.6 + (brightness - 0.5) * 0.4
+        return {
+            "valence": round(valence, 4),
+            "arousal": round(arousal, 4),
+            "confidence": round(min(1.0, max(0.0, confidence)), 4),
+            "source": "face",
+        }
+    faces = engine.infer(frame)[0]
+    if not faces:
+        return None
+    largest = max(faces, key=lambda f: f["box"][2] * f["box"][3])
+    return {**largest, "faces": len(faces)}
+
+
+def detection_record(face: Dict, timestamp: float) -> Dict:
+    """Build the detection log record for one face."""
+    return {
+        "timestamp": timestamp,
+        "time_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+        "emotion": face["emotion"],
+        "confidence_percent": round(face["confidence"] * 100, 2),
+        "location_x_y_w_h": face["box"]
+    }
+
+
+def webcam_demo(engine: FaceEmotionEngine, camera_index: int = 0, log_dir: str = OUTPUT_LOG_DIR):
+    """Run the live webcam detector, streaming detections to an NDJSON log."""
+    from modules.vision.detection_log import DetectionLogWriter
+
+    cap = cv2.VideoCapture(camera_index)
+    if not cap.isOpened():
+        print("[FATAL] Error: Could not open video stream.")
+        return
+
+    detection_log = DetectionLogWriter(log_dir)
+
+    print("\n[START] Real-time detection started. Press 'q' to exit and save results.")
+
+    # Close the log however the loop ends, so a crash keeps every detection so far
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            current_timestamp = time.time()
+            faces = engine.infer(frame)[0]
+
+            for face in faces:
+                item, output, w, h = face["box"]
+                emotion_label = face["emotion"]
+                confidence = face["confidence"] * 100
+                cv2.rectangle(frame, (item, output), (item + w, output + h), (0, 255, 0), 2)
+
+                detection_log.write(detection_record(face, current_timestamp))
+
+                text = f"{emotion_label} ({confidence:.1f}%)"
+                text_color = (0, 255, 0) if confidence > 60 else (0, 165, 255)
+                cv2.putText(frame, text, (item, output - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, text_color, 2, cv2.LINE_AA)
+
+            cv2.imshow('Live Emotion Detector', frame)
+
+            if cv2.waitKey(1) & 0xFF  == ord('q'):
+                break
+    finally:
+        cap.release()
+        cv2.destroyAllWindows()
+        detection_log.close()
+
+    print(f"\n[END] Detection stopped.")
+    print(f"Results saved to: {log_dir}")
+
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    # Allow running as a file (python modules/vision/face_emotion.py) as well as with -m
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+    try:
+        model = load_emotion_model(MODEL_FILE)
+        print(f"[INFO] Successfully loaded model: {MODEL_FILE}")
+    except Exception as e:
+        print(f"[ERROR] Could not load model. Ensure '{MODEL_FILE}' is in the directory.")
+        raise SystemExit(1)
+
+    try:
+        face_cascade = load_face_cascade(HAAR_CASCADE_FILE)
+        print(f"[INFO] Successfully loaded cascade: {HAAR_CASCADE_FILE}")
+    except FileNotFoundError:
+        print(f"[ERROR] Could not load Haar Cascade file. Ensure '{HAAR_CASCADE_FILE}' is available.")
+        raise SystemExit(1)
+
+    webcam_demo(FaceEmotionEngine(model=model, face_cascade=face_cascade))
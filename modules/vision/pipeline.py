@@ -0,0 +1,439 @@
+"""
+Pipelined face emotion processing.
+
+capture -> detect -> batch infer -> sink, each stage in its own thread and
+connected by small bounded queues. When a downstream stage falls behind, the
+oldest queued frame is dropped so the pipeline always works on fresh frames.
+Per-stage latency, queue depth and drop counts are available from stats().
+
+Frames can come from a camera, a video file or a synthetic generator, and
+the sink can run headless, so the pipeline can be benchmarked without a camera.
+
+Run: python -m modules.vision.pipeline --synthetic 300 --headless --stand-in
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+_STOP = object()
+
+
+@dataclass
+class FramePacket:
+    frame_id: int
+    captured_at: float
+    frame: np.ndarray
+    gray: Optional[np.ndarray] = None
+    boxes: Optional[np.ndarray] = None
+    results: List[Dict] = field(default_factory=list)
+    tracked: Optional[Any] = None
+
+
+class DropOldestQueue:
+    """Bounded queue that evicts the oldest item instead of blocking the producer."""
+
+    def __init__(self, maxsize: int):
+        self._q = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._q.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def put_stop(self):
+        # The stop marker must get through even when the queue is full
+        while True:
+            try:
+                self._q.put_nowait(_STOP)
+                return
+            except queue.Full:
+                try:
+                    self._q.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None):
+        return self._q.get(timeout=timeout)
+
+    def get_nowait(self):
+        return self._q.get_nowait()
+
+    def qsize(self) -> int:
+        return self._q.qsize()
+
+
+class StageStats:
+    """Thread-safe counters for one pipeline stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, seconds: float, items: int = 1):
+        with self._lock:
+            self.items += items
+            self.total_s += seconds
+            self.max_s = max(self.max_s, seconds)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "items": self.items,
+                "mean_ms": round(1000 * self.total_s / self.items, 3) if self.items else 0.0,
+                "max_ms": round(1000 * self.max_s, 3),
+            }
+
+
+def camera_source(index: int = 0) -> Iterator[np.ndarray]:
+    """Yield frames from a webcam until it stops returning frames."""
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        raise RuntimeError("Could not open video stream.")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame
+    finally:
+        cap.release()
+
+
+def video_file_source(path: str) -> Iterator[np.ndarray]:
+    """Yield frames from a video file."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise FileNotFoundError(path)
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame
+    finally:
+        cap.release()
+
+
+def synthetic_source(n_frames: int, width: int = 640, height: int = 480, fps: float = 0.0, seed: int = 0) -> Iterator[np.ndarray]:
+    """
+    Yield random BGR frames, optionally paced to a frame rate.
+
+    Args:
+        n_frames: Number of frames to produce
+        width, height: Frame size
+        fps: Target rate; 0 produces frames as fast as they are consumed
+        seed: RNG seed
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    interval = 1.0 / fps if fps > 0 else 0.0
+    next_at = time.perf_counter()
+    for i in range(n_frames):
+        if interval:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+        yield np.roll(base, i, axis=1)
+
+
+class FacePipeline:
+    """
+    Four-stage threaded pipeline around a FaceEmotionEngine.
+
+    Args:
+        engine: FaceEmotionEngine (or anything with detect() and infer_gray())
+        source: Iterable of BGR frames
+        sink: Called in the caller's thread with each finished FramePacket
+        detector: Optional override for engine.detect(gray) -> boxes
+        queue_size: Capacity of each inter-stage queue
+        max_batch: Most frames the infer stage combines into one model call
+        tracker: Optional FaceTracker; the detect stage then tracks faces
+            (no model calls) and the infer stage batches only the faces
+            whose cached prediction is stale, then attaches the results
+    """
+
+    def __init__(
+        self,
+        engine,
+        source: Iterable[np.ndarray],
+        sink: Optional[Callable[[FramePacket], None]] = None,
+        detector: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        queue_size: int = 2,
+        max_batch: int = 4,
+        tracker=None,
+    ):
+        self.engine = engine
+        self.tracker = tracker
+        self.source = source
+        self.sink = sink
+        self.detector = detector or engine.detect
+        self.max_batch = max(1, int(max_batch))
+
+        self._to_detect = DropOldestQueue(queue_size)
+        self._to_infer = DropOldestQueue(queue_size)
+        self._to_sink = DropOldestQueue(queue_size)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._stats = {name: StageStats() for name in ("capture", "detect", "infer", "sink", "end_to_end")}
+        self._started_at = None
+        self._finished_at = None
+        self._error: Optional[BaseException] = None
+
+    def _fail(self, exc: BaseException):
+        # Keep the first error for run() to re-raise and stop the capture stage
+        if self._error is None:
+            self._error = exc
+        self._stop.set()
+
+    def _capture(self):
+        frame_id = 0
+        it = iter(self.source)
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                try:
+                    frame = next(it)
+                except StopIteration:
+                    break
+                self._stats["capture"].record(time.perf_counter() - t0)
+                self._to_detect.put(FramePacket(frame_id, t0, frame))
+                frame_id += 1
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._to_detect.put_stop()
+
+    def _detect(self):
+        # A failing stage still passes the stop marker on, so run() never waits forever
+        try:
+            while True:
+                packet = self._to_detect.get()
+                if packet is _STOP:
+                    return
+                t0 = time.perf_counter()
+                frame = packet.frame
+                packet.gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+                if self.tracker is not None:
+                    packet.tracked = self.tracker.track(packet.gray)
+                    packet.boxes = packet.tracked.infer_boxes
+                else:
+                    packet.boxes = self.detector(packet.gray)
+                self._stats["detect"].record(time.perf_counter() - t0)
+                self._to_infer.put(packet)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._to_infer.put_stop()
+
+    def _infer(self):
+        try:
+            while True:
+                packet = self._to_infer.get()
+                if packet is _STOP:
+                    return
+                batch = [packet]
+                stopping = False
+                # Opportunistically batch whatever else is already waiting
+                while len(batch) < self.max_batch:
+                    try:
+                        nxt = self._to_infer.get_nowait()
+                    except queue.Empty:
+                        break
+                    if nxt is _STOP:
+                        stopping = True
+                        break
+                    batch.append(nxt)
+
+                todo = [p for p in batch if p.boxes is not None and len(p.boxes)]
+                if todo:
+                    t0 = time.perf_counter()
+                    results = self.engine.infer_gray([p.gray for p in todo], [p.boxes for p in todo])
+                    self._stats["infer"].record(time.perf_counter() - t0, len(todo))
+                    for p, r in zip(todo, results):
+                        p.results = r
+                for p in batch:
+                    if p.tracked is not None:
+                        p.results = self.tracker.finish(p.tracked, p.results)
+                for p in batch:
+                    self._to_sink.put(p)
+                if stopping:
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._to_sink.put_stop()
+
+    def _start(self):
+        self._started_at = time.perf_counter()
+        for target in (self._capture, self._detect, self._infer):
+            t = threading.Thread(target=target, name=f"face-{target.__name__.strip('_')}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def run(self):
+        """
+        Run until the source is exhausted or stop() is called. The sink runs in this thread.
+
+        Raises:
+            Exception: the first error raised by the source or a stage thread
+        """
+        self._start()
+        try:
+            while True:
+                packet = self._to_sink.get()
+                if packet is _STOP:
+                    break
+                t0 = time.perf_counter()
+                if self.sink is not None:
+                    self.sink(packet)
+                now = time.perf_counter()
+                self._stats["sink"].record(now - t0)
+                self._stats["end_to_end"].record(now - packet.captured_at)
+        finally:
+            self._stop.set()
+            for t in self._threads:
+                t.join(timeout=5)
+            self._finished_at = time.perf_counter()
+        if self._error is not None:
+            raise self._error
+
+    def stop(self):
+        """Ask the capture stage to stop; queued frames drain through the pipeline."""
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        """Per-stage latency, queue depth, drop counts and overall throughput."""
+        end = self._finished_at or time.perf_counter()
+        elapsed = end - self._started_at if self._started_at else 0.0
+        delivered = self._stats["sink"].items
+        out = {
+            "stages": {name: s.snapshot() for name, s in self._stats.items()},
+            "queue_depth": {
+                "detect": self._to_detect.qsize(),
+                "infer": self._to_infer.qsize(),
+                "sink": self._to_sink.qsize(),
+            },
+            "dropped": {
+                "detect": self._to_detect.dropped,
+                "infer": self._to_infer.dropped,
+                "sink": self._to_sink.dropped,
+            },
+            "frames_out": delivered,
+            "fps": round(delivered / elapsed, 2) if elapsed else 0.0,
+        }
+        if self.tracker is not None:
+            out["tracking"] = self.tracker.stats()
+        return out
+
+
+def display_sink(packet: FramePacket) -> int:
+    """Draw boxes and labels, show the frame and return the pressed key."""
+    frame = packet.frame
+    for face in packet.results:
+        x, y, w, h = face["box"]
+        confidence = face["confidence"] * 100
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        text_color = (0, 255, 0) if confidence > 60 else (0, 165, 255)
+        cv2.putText(frame, f"{face['emotion']} ({confidence:.1f}%)", (x, y - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, text_color, 2, cv2.LINE_AA)
+    cv2.imshow('Live Emotion Detector', frame)
+    return cv2.waitKey(1) & 0xFF
+
+
+def main():
+    from modules.vision.face_emotion import FaceEmotionEngine
+
+    p = argparse.ArgumentParser(description="Pipelined face emotion detection")
+    src = p.add_mutually_exclusive_group()
+    src.add_argument("--camera", type=int, default=0, help="Camera index (default 0)")
+    src.add_argument("--video", help="Read frames from a video file")
+    src.add_argument("--synthetic", type=int, help="Generate this many random frames")
+    p.add_argument("--fps", type=float, default=0.0, help="Pace synthetic frames (0 = unpaced)")
+    p.add_argument("--headless", action="store_true", help="Do not open a window")
+    p.add_argument("--stand-in", action="store_true", help="Use a tiny random model instead of the .h5 file")
+    p.add_argument("--fake-faces", type=int, default=0, help="Skip Haar detection and use N fixed boxes per frame")
+    p.add_argument("--queue-size", type=int, default=2)
+    p.add_argument("--max-batch", type=int, default=4)
+    p.add_argument("--log-dir", help="Stream detections to NDJSON segments in this folder")
+    p.add_argument("--track-every", type=int, default=0,
+                   help="Track faces and run full detection only every K frames (0 = detect every frame)")
+    args = p.parse_args()
+
+    model = None
+    if args.stand_in:
+        from modules.vision.scripts.bench_face_engine import NumpyStandInModel
+        model = NumpyStandInModel()
+    engine = FaceEmotionEngine(model=model)
+
+    if args.video:
+        source = video_file_source(args.video)
+    elif args.synthetic:
+        source = synthetic_source(args.synthetic, fps=args.fps)
+    else:
+        source = camera_source(args.camera)
+
+    detector = None
+    if args.fake_faces:
+        boxes = np.array([[20 + 70 * i, 40, 64, 64] for i in range(args.fake_faces)], dtype=np.int32)
+        detector = lambda gray: boxes
+
+    tracker = None
+    if args.track_every:
+        from modules.vision.tracking import FaceTracker
+        tracker = FaceTracker(engine, detect_every=args.track_every, detector=detector)
+
+    log = None
+    if args.log_dir:
+        from modules.vision.detection_log import DetectionLogWriter
+        from modules.vision.face_emotion import detection_record
+        log = DetectionLogWriter(args.log_dir)
+
+    def sink(packet):
+        if log is not None:
+            ts = time.time()
+            log.write_many(detection_record(face, ts) for face in packet.results)
+        if not args.headless and display_sink(packet) == ord('q'):
+            pipeline.stop()
+
+    pipeline = FacePipeline(
+        engine,
+        source,
+        sink=sink,
+        detector=detector,
+        queue_size=args.queue_size,
+        max_batch=args.max_batch,
+        tracker=tracker,
+    )
+    try:
+        pipeline.run()
+    except KeyboardInterrupt:
+        pipeline.stop()
+    finally:
+        if log is not None:
+            log.close()
+    if not args.headless:
+        cv2.destroyAllWindows()
+    print(json.dumps(pipeline.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
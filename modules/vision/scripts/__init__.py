@@ -0,0 +1 @@
+# Vision module scripts package
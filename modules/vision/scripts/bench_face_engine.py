@@ -0,0 +1,107 @@
+"""
+Benchmark faces/sec: per-face predict (old webcam loop) vs FaceEmotionEngine batching.
+
+Uses a tiny CPU stand-in model so no trained .h5 file is needed: a small
+Keras CNN when TensorFlow is installed, otherwise a NumPy softmax layer
+(which has almost no per-call overhead, so it understates the gain).
+
+Run: python -m modules.vision.scripts.bench_face_engine --faces 1 4 16
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from modules.vision.face_emotion import EMOTION_LABELS, MODEL_INPUT_SIZE, FaceEmotionEngine
+
+
+class NumpyStandInModel:
+    """Random softmax layer with a Keras-style predict()."""
+
+    def __init__(self, n_classes=len(EMOTION_LABELS), seed=0):
+        rng = np.random.default_rng(seed)
+        w, h = MODEL_INPUT_SIZE
+        self.weights = rng.normal(0, 0.05, (w * h, n_classes)).astype(np.float32)
+
+    def predict(self, batch, verbose=0):
+        logits = batch.reshape(len(batch), -1) @ self.weights
+        logits -= logits.max(axis=1, keepdims=True)
+        e = np.exp(logits)
+        return e / e.sum(axis=1, keepdims=True)
+
+
+def keras_stand_in_model(n_classes=len(EMOTION_LABELS)):
+    import tensorflow as tf
+
+    w, h = MODEL_INPUT_SIZE
+    return tf.keras.Sequential([
+        tf.keras.layers.Input((h, w, 1)),
+        tf.keras.layers.Conv2D(8, 3, activation="relu"),
+        tf.keras.layers.MaxPooling2D(4),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(n_classes, activation="softmax"),
+    ])
+
+
+def per_face(model, gray, boxes):
+    """The original webcam loop: one predict call per face."""
+    out = []
+    for (x, y, w, h) in boxes:
+        face_roi = gray[y:y + h, x:x + w]
+        resized_face = cv2.resize(face_roi, MODEL_INPUT_SIZE, interpolation=cv2.INTER_AREA)
+        normalized_face = resized_face.astype('float32') / 255.0
+        cnn_input = np.expand_dims(normalized_face, axis=0)
+        cnn_input = np.expand_dims(cnn_input, axis=-1)
+        out.append(model.predict(cnn_input, verbose=0)[0])
+    return out
+
+
+def random_boxes(n, frame_shape, rng):
+    fh, fw = frame_shape
+    sizes = rng.integers(60, 160, n)
+    xs = rng.integers(0, fw - 160, n)
+    ys = rng.integers(0, fh - 160, n)
+    return np.stack([xs, ys, sizes, sizes], axis=1).astype(np.int32)
+
+
+def bench(fn, n_faces, seconds):
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        calls += 1
+    elapsed = time.perf_counter() - start
+    return calls * n_faces / elapsed
+
+
+def main():
+    p = argparse.ArgumentParser(description="Face inference batching benchmark")
+    p.add_argument("--faces", type=int, nargs="+", default=[1, 4, 16], help="Faces per frame")
+    p.add_argument("--seconds", type=float, default=2.0, help="Time per measurement")
+    p.add_argument("--numpy", action="store_true", help="Force the NumPy stand-in model")
+    args = p.parse_args()
+
+    model, kind = None, "numpy"
+    if not args.numpy:
+        try:
+            model, kind = keras_stand_in_model(), "keras"
+        except ImportError:
+            pass
+    if model is None:
+        model = NumpyStandInModel()
+
+    engine = FaceEmotionEngine(model=model, face_cascade=object())
+    rng = np.random.default_rng(0)
+    gray = rng.integers(0, 256, (720, 1280), dtype=np.uint8)
+
+    print(f"Stand-in model: {kind}")
+    print(f"{'faces/frame':>11} {'per-face f/s':>14} {'batched f/s':>13} {'speedup':>8}")
+    for n in args.faces:
+        boxes = random_boxes(n, gray.shape, rng)
+        single = bench(lambda: per_face(model, gray, boxes), n, args.seconds)
+        batched = bench(lambda: engine.infer_gray([gray], [boxes]), n, args.seconds)
+        print(f"{n:>11} {single:>14.0f} {batched:>13.0f} {batched / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
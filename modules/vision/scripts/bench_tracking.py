@@ -0,0 +1,62 @@
+"""
+Benchmark CPU per frame with and without FaceTracker on a steady shot.
+
+Synthetic frames are a fixed texture plus sensor-like noise. They contain no
+real faces, so the detector runs the real Haar pass over the full frame (to
+keep its cost) and then returns fixed boxes.
+
+Run: python -m modules.vision.scripts.bench_tracking --frames 300 --faces 4
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from modules.vision.face_emotion import FaceEmotionEngine
+from modules.vision.scripts.bench_face_engine import NumpyStandInModel
+from modules.vision.tracking import FaceTracker
+
+
+def steady_frames(n, width=640, height=480, noise=3.0, seed=0):
+    rng = np.random.default_rng(seed)
+    base = cv2.GaussianBlur(rng.integers(0, 256, (height, width), dtype=np.uint8), (5, 5), 0)
+    for _ in range(n):
+        jitter = rng.normal(0, noise, base.shape)
+        yield np.clip(base + jitter, 0, 255).astype(np.uint8)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Face tracking benchmark")
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--faces", type=int, default=4)
+    p.add_argument("--detect-every", type=int, default=10)
+    args = p.parse_args()
+
+    engine = FaceEmotionEngine(model=NumpyStandInModel())
+    boxes = np.array([[40 + 140 * i, 120, 96, 96] for i in range(args.faces)], dtype=np.int32)
+
+    def detector(gray):
+        engine.detect(gray)
+        return boxes
+
+    frames = list(steady_frames(args.frames))
+
+    start = time.perf_counter()
+    for gray in frames:
+        engine.infer_gray([gray], [detector(gray)])
+    baseline = (time.perf_counter() - start) / len(frames)
+
+    tracker = FaceTracker(engine, detect_every=args.detect_every, detector=detector)
+    start = time.perf_counter()
+    for gray in frames:
+        tracker.process(gray)
+    tracked = (time.perf_counter() - start) / len(frames)
+
+    print(f"detect + infer every frame: {1000 * baseline:7.2f} ms/frame")
+    print(f"tracked (K={args.detect_every}):          {1000 * tracked:7.2f} ms/frame  ({baseline / tracked:.1f}x less CPU)")
+    print(f"tracker stats: {tracker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
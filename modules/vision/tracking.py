@@ -0,0 +1,245 @@
+"""
+Face tracking between detections.
+
+Full Haar detection runs every `detect_every` frames, or sooner when a track
+loses confidence. In between, each face box is propagated with a template
+match in a small window around its last position, on a downscaled image.
+A track's emotion prediction is reused until its ROI changes by more than
+`roi_change_threshold` (mean absolute pixel difference of a small thumbnail),
+so steady shots skip most detection and inference work.
+
+Tracking and inference can run in different threads: track() returns a
+TrackedFrame with the boxes that need the model, and finish() attaches the
+model's results. process() does both in one call.
+"""
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+THUMB_SIZE = (16, 16)
+
+
+def iou(a, b) -> float:
+    """Intersection over union of two x, y, w, h boxes."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def _thumb(gray: np.ndarray, box) -> np.ndarray:
+    x, y, w, h = box
+    roi = gray[y:y + h, x:x + w]
+    return cv2.resize(roi, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+class Track:
+    """One tracked face: its box, template and cached prediction."""
+
+    def __init__(self, track_id: int, box, gray: np.ndarray):
+        self.track_id = track_id
+        self.box = [int(v) for v in box]
+        self.template = gray[self.box[1]:self.box[1] + self.box[3], self.box[0]:self.box[0] + self.box[2]].copy()
+        self.thumb = None
+        self.result: Optional[Dict] = None
+        self.score = 1.0
+
+
+class TrackedFrame:
+    """
+    Tracking outcome for one frame, waiting for inference on its stale faces.
+
+    Boxes and cached results are copied when the frame is tracked, so later
+    frames may be tracked before this one is finished.
+    """
+
+    def __init__(self, tracks: List[Track], boxes: List[List[int]], results: List[Optional[Dict]],
+                 stale: List[int], thumbs: Dict[int, np.ndarray]):
+        self.tracks = tracks
+        self.boxes = boxes
+        self.results = results
+        self.stale = stale
+        self.thumbs = thumbs
+
+    @property
+    def infer_boxes(self) -> np.ndarray:
+        """(N, 4) boxes of the faces that need the model."""
+        return np.array([self.boxes[i] for i in self.stale], dtype=np.int32).reshape(-1, 4)
+
+
+class FaceTracker:
+    """
+    Wraps a FaceEmotionEngine and skips redundant work on steady frames.
+
+    Args:
+        engine: FaceEmotionEngine (or anything with detect() and infer_gray())
+        detect_every: Run full detection at least every K frames
+        min_track_score: Template-match score below which detection is forced
+        roi_change_threshold: Mean abs thumbnail difference (0-255) that triggers re-inference
+        search_margin: Search window around a box, as a fraction of its size
+        scale: Downscale factor for template matching (used as an integer step, 0.25 -> 1/4)
+        detector: Optional override for engine.detect(gray) -> boxes
+    """
+
+    def __init__(
+        self,
+        engine,
+        detect_every: int = 10,
+        min_track_score: float = 0.6,
+        roi_change_threshold: float = 6.0,
+        search_margin: float = 0.25,
+        scale: float = 0.25,
+        detector: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ):
+        self.engine = engine
+        self.detect_every = max(1, int(detect_every))
+        self.min_track_score = min_track_score
+        self.roi_change_threshold = roi_change_threshold
+        self.search_margin = search_margin
+        self.scale = scale
+        self.detector = detector or engine.detect
+
+        self.tracks: List[Track] = []
+        self._next_id = 0
+        self._since_detect = None
+        self.frames = 0
+        self.detections = 0
+        self.observations = 0
+        self.inferences = 0
+
+    def _detect(self, gray: np.ndarray):
+        self.detections += 1
+        self._since_detect = 0
+        boxes = [list(map(int, b)) for b in self.detector(gray)]
+        kept = []
+        for box in boxes:
+            best, best_iou = None, 0.3
+            for t in self.tracks:
+                overlap = iou(t.box, box)
+                if overlap > best_iou and t not in kept:
+                    best, best_iou = t, overlap
+            if best is None:
+                best = Track(self._next_id, box, gray)
+                self._next_id += 1
+            else:
+                best.box = box
+                best.template = gray[box[1]:box[1] + box[3], box[0]:box[0] + box[2]].copy()
+            best.score = 1.0
+            kept.append(best)
+        self.tracks = kept
+
+    def _propagate(self, gray: np.ndarray) -> bool:
+        """Move every track by template matching. Returns False if any track was lost."""
+        fh, fw = gray.shape[:2]
+        # Integer downscale step; the search window is snapped to multiples of
+        # it so template and window are averaged over the same pixel blocks
+        step = max(1, int(round(1 / self.scale)))
+        for t in self.tracks:
+            x, y, w, h = t.box
+            tw, th = w // step, h // step
+            if tw < 4 or th < 4:
+                step_t = 1
+                tw, th = w, h
+            else:
+                step_t = step
+            mx = (int(w * self.search_margin) // step_t) * step_t
+            my = (int(h * self.search_margin) // step_t) * step_t
+            x0 = x - (min(mx, x) // step_t) * step_t
+            y0 = y - (min(my, y) // step_t) * step_t
+            ww = (min(fw, x + w + mx) - x0) // step_t
+            wh = (min(fh, y + h + my) - y0) // step_t
+            if ww < tw or wh < th:
+                return False
+            window = gray[y0:y0 + wh * step_t, x0:x0 + ww * step_t]
+            template = t.template[:th * step_t, :tw * step_t]
+            if step_t > 1:
+                window = cv2.resize(window, (ww, wh), interpolation=cv2.INTER_AREA)
+                template = cv2.resize(template, (tw, th), interpolation=cv2.INTER_AREA)
+            scores = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (px, py) = cv2.minMaxLoc(scores)
+            t.score = float(score)
+            if t.score < self.min_track_score:
+                return False
+            t.box = [x0 + px * step_t, y0 + py * step_t, w, h]
+        return True
+
+    def track(self, gray: np.ndarray) -> TrackedFrame:
+        """
+        Detect or propagate faces on one grayscale frame, without running the model.
+
+        Returns:
+            TrackedFrame; run the model on its infer_boxes and pass the
+            results to finish()
+        """
+        self.frames += 1
+        due = self._since_detect is None or self._since_detect + 1 >= self.detect_every
+        if due or not self._propagate(gray):
+            self._detect(gray)
+        else:
+            self._since_detect += 1
+
+        tracks = list(self.tracks)
+        results, stale, thumbs = [], [], {}
+        for i, t in enumerate(tracks):
+            thumb = _thumb(gray, t.box)
+            # A track whose first result is still being computed counts as stale
+            if t.result is None or float(np.mean(np.abs(thumb - t.thumb))) > self.roi_change_threshold:
+                stale.append(i)
+                thumbs[i] = thumb
+                results.append(None)
+            else:
+                results.append(t.result)
+        self.observations += len(tracks)
+        self.inferences += len(stale)
+        return TrackedFrame(tracks, [list(t.box) for t in tracks], results, stale, thumbs)
+
+    def finish(self, frame: TrackedFrame, results: List[Dict]) -> List[Dict]:
+        """
+        Cache the model's results for a tracked frame's stale faces and return its outputs.
+
+        Args:
+            frame: From track()
+            results: One engine output per box in frame.infer_boxes
+
+        Returns:
+            List of fusion-ready dicts (see FaceEmotionEngine.to_outputs) with track_id
+        """
+        for i, result in zip(frame.stale, results):
+            t = frame.tracks[i]
+            t.result, t.thumb = result, frame.thumbs[i]
+            frame.results[i] = result
+        out = []
+        for t, box, result in zip(frame.tracks, frame.boxes, frame.results):
+            result = dict(result)
+            result["box"] = box
+            result["track_id"] = t.track_id
+            out.append(result)
+        return out
+
+    def process(self, gray: np.ndarray) -> List[Dict]:
+        """
+        Track faces on one grayscale frame and return their emotion outputs.
+
+        Returns:
+            List of fusion-ready dicts (see FaceEmotionEngine.to_outputs) with track_id
+        """
+        frame = self.track(gray)
+        results = []
+        if frame.stale:
+            results = self.engine.infer_gray([gray], [frame.infer_boxes])[0]
+        return self.finish(frame, results)
+
+    def stats(self) -> Dict:
+        """Detection and inference skip rates since creation."""
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "detect_skip_rate": round(1 - self.detections / self.frames, 4) if self.frames else 0.0,
+            "face_observations": self.observations,
+            "inferences": self.inferences,
+            "infer_skip_rate": round(1 - self.inferences / self.observations, 4) if self.observations else 0.0,
+        }
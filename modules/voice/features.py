@@ -0,0 +1,200 @@
+"""
+Shared audio features for the voice heuristics.
+
+One-shot helpers (mean_abs, rms, spectral_centroid, heuristic_emotion) work on
+a whole clip. IncrementalFeatures keeps the same features up to date over a
+sliding window of a continuous stream, so each new hop costs O(hop) instead
+of O(window):
+
+- energy and RMS come from running sums of |x| and x^2, with the samples that
+  leave the window subtracted
+- the spectral centroid comes from a short-time FFT over the whole stream:
+  Hann frames of n_fft samples at n_fft / 2 stride, so every sample reaches
+  the spectrum. Running sums of |S| and f * |S| are kept over the frames
+  inside the window (new frames added, leaving ones subtracted), and
+  centroid = sum(f * |S|) / sum(|S|).
+"""
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.voice.ring_buffer import RingBuffer
+
+
+def mean_abs(y: np.ndarray) -> float:
+    """Mean absolute amplitude."""
+    return float(np.mean(np.abs(y)))
+
+
+def rms(y: np.ndarray) -> float:
+    """Root mean square amplitude."""
+    y = np.asarray(y, dtype="float32").flatten()
+    return float(np.sqrt(np.mean(np.square(y)) + 1e-12))
+
+
+def spectral_centroid(y: np.ndarray, sr_rate: int) -> float:
+    """Magnitude-weighted mean frequency of the whole clip (one full-length FFT)."""
+    y = np.asarray(y, dtype="float32").flatten()
+    try:
+        S = np.abs(np.fft.rfft(y))
+        freqs = np.fft.rfftfreq(len(y), 1.0 / sr_rate)
+        return float((S * freqs).sum() / (S.sum() + 1e-9))
+    except Exception:
+        return 2000.0
+
+
+def heuristic_from_features(rms_value: float, centroid: float, duration: float) -> Dict:
+    """Map RMS, spectral centroid and duration to valence/arousal/confidence."""
+    arousal = float(np.clip((np.tanh(rms_value * 50) + 1) / 2, 0.0, 1.0))
+    valence = float(1.0 / (1.0 + np.exp(-(centroid - 2000) / 2000)))
+    confidence = float(np.clip(0.3 + (rms_value * 100) + min(0.4, duration / 10.0), 0.0, 1.0))
+
+    return {
+        "valence": round(valence, 3),
+        "arousal": round(arousal, 3),
+        "confidence": round(confidence, 3),
+        "source": "voice",
+        "duration": round(duration, 3),
+    }
+
+
+def heuristic_emotion(y: np.ndarray, sr_rate: int) -> Dict:
+    """RMS -> arousal, spectral centroid -> valence, energy and duration -> confidence."""
+    y = np.asarray(y, dtype="float32").flatten()
+    return heuristic_from_features(rms(y), spectral_centroid(y, sr_rate), len(y) / sr_rate)
+
+
+class IncrementalFeatures:
+    """
+    Sliding-window energy, RMS and spectral centroid.
+
+    Args:
+        samplerate: Audio sample rate
+        window: Window length in seconds
+        hop: Seconds between feature updates
+        n_fft: STFT frame length in samples (frames overlap by half)
+        channels: Input channel count; the centroid uses the channel mean
+        refresh_every: Recompute the running sums from the buffer every this
+            many windows, to stop floating point drift
+    """
+
+    def __init__(
+        self,
+        samplerate: int = 16000,
+        window: float = 2.0,
+        hop: float = 0.25,
+        n_fft: int = 512,
+        channels: int = 1,
+        refresh_every: int = 4,
+    ):
+        self.samplerate = samplerate
+        self.window_samples = int(round(window * samplerate))
+        self.hop_samples = max(1, int(round(hop * samplerate)))
+        self.n_fft = n_fft
+        self.channels = channels
+        self.ring = RingBuffer(self.window_samples, channels)
+        self.frame_step = max(1, n_fft // 2)
+        # Mono mix; holds every sample a pending frame can still need
+        self._frame_ring = RingBuffer(self.hop_samples + n_fft, 1)
+
+        # (start sample, |S| sum, f * |S| sum) for each frame inside the window
+        self._window_frames: Deque[Tuple[int, float, float]] = deque()
+        self._frames_seen = 0
+        self._next_frame_end = n_fft
+        self._mag_sum = 0.0
+        self._weighted_sum = 0.0
+        self._hann = np.hanning(n_fft).astype(np.float32)
+        self._freqs = np.fft.rfftfreq(n_fft, 1.0 / samplerate)
+
+        self._sum_abs = 0.0
+        self._sum_sq = 0.0
+        self._since_refresh = 0
+        self._refresh_samples = refresh_every * self.window_samples
+
+    @property
+    def total_samples(self) -> int:
+        return self.ring.total_written
+
+    def _write(self, block: np.ndarray):
+        n = len(block)
+        overflow = min(n, self.ring.total_written + n - self.window_samples)
+        if overflow > 0:
+            leaving = self.ring.latest(self.window_samples)[:overflow]
+            self._sum_abs -= float(np.abs(leaving).sum(dtype=np.float64))
+            self._sum_sq -= float(np.square(leaving, dtype=np.float64).sum())
+        self._sum_abs += float(np.abs(block).sum(dtype=np.float64))
+        self._sum_sq += float(np.square(block, dtype=np.float64).sum())
+        self.ring.write(block)
+        self._frame_ring.write(block.mean(axis=1) if self.channels > 1 else block[:, 0])
+        self._frames()
+
+        self._since_refresh += n
+        if self._since_refresh >= self._refresh_samples:
+            current = self.ring.latest(self.window_samples)
+            self._sum_abs = float(np.abs(current).sum(dtype=np.float64))
+            self._sum_sq = float(np.square(current, dtype=np.float64).sum())
+            self._mag_sum = sum(f[1] for f in self._window_frames)
+            self._weighted_sum = sum(f[2] for f in self._window_frames)
+            self._since_refresh = 0
+
+    def _frames(self):
+        """STFT every frame completed by the samples written so far, in one batch."""
+        total = self.ring.total_written
+        if total >= self._next_frame_end:
+            count = (total - self._next_frame_end) // self.frame_step + 1
+            first_start = self._next_frame_end - self.n_fft
+            span = self._frame_ring.latest(total - first_start)[:, 0]
+            frames = np.lib.stride_tricks.sliding_window_view(span, self.n_fft)[::self.frame_step][:count]
+            S = np.abs(np.fft.rfft(frames * self._hann, axis=1))
+            mags = S.sum(axis=1)
+            weighted = S @ self._freqs
+            for i, (mag, w) in enumerate(zip(mags.tolist(), weighted.tolist())):
+                self._window_frames.append((first_start + i * self.frame_step, mag, w))
+                self._mag_sum += mag
+                self._weighted_sum += w
+            self._frames_seen += count
+            self._next_frame_end += count * self.frame_step
+
+        # Subtract the frames that have started to leave the window
+        while self._window_frames and self._window_frames[0][0] < total - self.window_samples:
+            _, mag, w = self._window_frames.popleft()
+            self._mag_sum -= mag
+            self._weighted_sum -= w
+
+    def update(self, samples: np.ndarray) -> List[Dict]:
+        """
+        Feed samples; return the features at every hop boundary crossed.
+        """
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1, self.channels)
+        out = []
+        start = 0
+        while start < len(samples):
+            to_boundary = self.hop_samples - self.ring.total_written % self.hop_samples
+            end = min(len(samples), start + to_boundary)
+            self._write(samples[start:end])
+            start = end
+            if self.ring.total_written % self.hop_samples == 0:
+                out.append(self.features())
+        return out
+
+    def features(self) -> Optional[Dict]:
+        """Current window features: mean_abs, rms, centroid and duration (seconds)."""
+        n = len(self.ring)
+        if n == 0:
+            return None
+        values = n * self.channels
+        centroid = self._weighted_sum / (max(0.0, self._mag_sum) + 1e-9)
+        return {
+            "mean_abs": max(0.0, self._sum_abs) / values,
+            "rms": float(np.sqrt(max(0.0, self._sum_sq) / values + 1e-12)),
+            "centroid": float(centroid) if self._frames_seen else 2000.0,
+            "duration": n / self.samplerate,
+        }
+
+    def emotion(self) -> Optional[Dict]:
+        """heuristic_emotion() on the current window, from running features."""
+        f = self.features()
+        if f is None:
+            return None
+        return heuristic_from_features(f["rms"], f["centroid"], f["duration"])
@@ -0,0 +1,57 @@
+"""
+Preallocated, mirrored audio ring buffer.
+
+Every sample is stored twice, `capacity` apart, so the most recent N samples
+are always one contiguous slice that can be handed out as a zero-copy view.
+"""
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-size audio ring with contiguous reads.
+
+    Args:
+        capacity: Samples kept (per channel)
+        channels: Channel count
+        dtype: Sample dtype
+    """
+
+    def __init__(self, capacity: int, channels: int = 1, dtype=np.float32):
+        self.capacity = int(capacity)
+        self.channels = channels
+        self._buf = np.zeros((2 * self.capacity, channels), dtype=dtype)
+        self._pos = 0
+        self.total_written = 0
+
+    def write(self, samples: np.ndarray):
+        """Append samples shaped (n,) or (n, channels)."""
+        samples = np.asarray(samples).reshape(-1, self.channels)
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            self._buf[:self.capacity] = samples
+            self._buf[self.capacity:] = samples
+            self._pos = 0
+            self.total_written += n
+            return
+
+        cap, pos = self.capacity, self._pos
+        first = min(n, cap - pos)
+        self._buf[pos:pos + first] = samples[:first]
+        self._buf[pos + cap:pos + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self._buf[:rest] = samples[first:]
+            self._buf[cap:cap + rest] = samples[first:]
+        self._pos = (pos + n) % cap
+        self.total_written += n
+
+    def latest(self, n: int) -> np.ndarray:
+        """Return a view of the most recent n samples, oldest first."""
+        n = min(int(n), self.capacity, self.total_written)
+        end = self._pos + self.capacity
+        return self._buf[end - n:end]
+
+    def __len__(self) -> int:
+        return min(self.total_written, self.capacity)
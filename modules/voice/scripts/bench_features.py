@@ -0,0 +1,55 @@
+"""
+Benchmark sliding-window voice features: recompute per hop vs IncrementalFeatures.
+
+Run: python -m modules.voice.scripts.bench_features --minutes 10 --window 2 --hop 0.25
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules.voice.features import IncrementalFeatures, heuristic_emotion, mean_abs
+
+
+def synthetic_signal(seconds, sr, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    tone = 0.1 * np.sin(2 * np.pi * (200 + 100 * np.sin(0.1 * t)) * t)
+    return (tone + rng.normal(0, 0.02, len(t))).astype(np.float32)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Incremental audio feature benchmark")
+    p.add_argument("--minutes", type=float, default=10.0)
+    p.add_argument("--sr", type=int, default=16000)
+    p.add_argument("--window", type=float, default=2.0)
+    p.add_argument("--hop", type=float, default=0.25)
+    args = p.parse_args()
+
+    y = synthetic_signal(args.minutes * 60, args.sr)
+    window, hop = int(args.window * args.sr), int(args.hop * args.sr)
+    ends = range(window, len(y) + 1, hop)
+
+    start = time.perf_counter()
+    for end in ends:
+        w = y[end - window:end]
+        heuristic_emotion(w, args.sr)
+        mean_abs(w)
+    naive = time.perf_counter() - start
+
+    feats = IncrementalFeatures(args.sr, args.window, args.hop)
+    start = time.perf_counter()
+    for s in range(0, len(y), hop):
+        feats.update(y[s:s + hop])
+        feats.emotion()
+    incremental = time.perf_counter() - start
+
+    audio_s = len(y) / args.sr
+    print(f"{audio_s:.0f}s of audio, {len(ends)} hops of {args.hop}s over a {args.window}s window")
+    print(f"recompute per hop:   {naive:7.3f}s  ({audio_s / naive:8.0f}x real time)")
+    print(f"IncrementalFeatures: {incremental:7.3f}s  ({audio_s / incremental:8.0f}x real time)")
+    print(f"speedup: {naive / incremental:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
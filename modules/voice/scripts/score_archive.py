@@ -0,0 +1,151 @@
+"""
+Score a directory of WAV files offline, segment by segment.
+
+Each file is read one fixed-length segment at a time with
+modules.voice.stream.wav_blocks, so PCM data is never read whole. Every segment is scored with both voice heuristics: the
+RMS/centroid heuristic_emotion (heuristic_* columns) and the energy-based
+infer_from_audio_chunk (energy_* columns). Files are spread over a process
+pool.
+
+Results go to one columnar part file per input under <out>/parts (Parquet
+when pyarrow is installed, CSV otherwise), written atomically. A rerun skips
+files whose part already exists, so an interrupted run resumes where it
+stopped. --merge concatenates the parts into <out>/voice_scores.<ext>.
+
+Run: python -m modules.voice.scripts.score_archive --input calls/ --out scores/ --workers 4
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from modules.voice.features import heuristic_from_features, rms, spectral_centroid
+from modules.voice.stream import wav_blocks
+from modules.voice.voice_emotion import infer_from_audio_chunk
+
+try:
+    import pyarrow  # noqa: F401
+    PART_EXT = ".parquet"
+except ImportError:
+    PART_EXT = ".csv"
+
+
+def score_file(path, segment_seconds=5.0, min_seconds=0.5):
+    """Score one file; returns (rows, audio_seconds)."""
+    with wave.open(str(path), "rb") as w:
+        sr = w.getframerate()
+    seg = max(1, int(segment_seconds * sr))
+    rows = []
+    frames = 0
+    for i, block in enumerate(wav_blocks(str(path), block_size=seg)):
+        start = frames
+        frames += len(block)
+        if len(block) < min_seconds * sr and i > 0:
+            break
+        mono = block.mean(axis=1)
+        # One pass over the features feeds both the columns and the heuristic
+        rms_value, centroid = rms(mono), spectral_centroid(mono, sr)
+        h = heuristic_from_features(rms_value, centroid, len(mono) / sr)
+        e = infer_from_audio_chunk(block)
+        rows.append({
+            "file": str(path),
+            "segment": i,
+            "start_s": round(start / sr, 3),
+            "end_s": round(frames / sr, 3),
+            "rms": rms_value,
+            "centroid": centroid,
+            "heuristic_valence": h["valence"],
+            "heuristic_arousal": h["arousal"],
+            "heuristic_confidence": h["confidence"],
+            "energy_valence": e["valence"],
+            "energy_arousal": e["arousal"],
+            "energy_confidence": e["confidence"],
+        })
+    return rows, frames / sr if sr else 0.0
+
+
+def part_path(out_dir, root, path):
+    rel = os.path.relpath(path, root)
+    digest = hashlib.sha1(rel.encode("utf-8")).hexdigest()[:16]
+    return Path(out_dir) / "parts" / f"{digest}{PART_EXT}"
+
+
+def write_table(df, path):
+    """Write a part atomically (tmp file + rename) so a crash never leaves a half part."""
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix == ".parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def read_table(path):
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+
+
+def process(path, part, segment_seconds):
+    """Worker entry point: score a file and write its part."""
+    rows, audio_s = score_file(path, segment_seconds)
+    write_table(pd.DataFrame(rows), part)
+    return len(rows), audio_s
+
+
+def main():
+    p = argparse.ArgumentParser(description="Score a WAV archive with the voice heuristics")
+    p.add_argument("--input", "-i", required=True, help="Directory to scan for .wav files")
+    p.add_argument("--out", "-o", required=True, help="Output directory")
+    p.add_argument("--segment", type=float, default=5.0, help="Segment length in seconds (default 5)")
+    p.add_argument("--workers", "-j", type=int, default=os.cpu_count(), help="Worker processes")
+    p.add_argument("--merge", action="store_true", help="Concatenate all parts when done")
+    args = p.parse_args()
+
+    root = Path(args.input)
+    (Path(args.out) / "parts").mkdir(parents=True, exist_ok=True)
+    files = sorted(f for f in root.rglob("*") if f.suffix.lower() == ".wav")
+    todo = [(f, part_path(args.out, root, f)) for f in files]
+    pending = [(f, part) for f, part in todo if not part.exists()]
+    print(f"{len(files)} files, {len(files) - len(pending)} already scored, {len(pending)} to go")
+
+    start = time.perf_counter()
+    done = segments = failed = 0
+    audio_total = 0.0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(process, str(f), part, args.segment): f for f, part in pending}
+        for fut in as_completed(futures):
+            try:
+                n_rows, audio_s = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"Error scoring {futures[fut]}: {e}", file=sys.stderr)
+                continue
+            done += 1
+            segments += n_rows
+            audio_total += audio_s
+            if done % 50 == 0 or done == len(pending):
+                elapsed = time.perf_counter() - start
+                print(f"[{done}/{len(pending)}] {done / elapsed:.1f} files/s, "
+                      f"{audio_total / elapsed:.0f} audio-s/s", flush=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"Scored {done} files ({segments} segments, {audio_total:.0f}s audio) in {elapsed:.1f}s; {failed} failed")
+    if elapsed > 0 and done:
+        print(f"Throughput: {done / elapsed:.2f} files/s, {audio_total / elapsed:.1f} audio-seconds/s")
+
+    if args.merge:
+        parts = [part for _, part in todo if part.exists()]
+        if parts:
+            merged = pd.concat([read_table(part) for part in parts], ignore_index=True)
+            out = Path(args.out) / f"voice_scores{PART_EXT}"
+            write_table(merged, out)
+            print(f"Wrote: {out} ({len(merged)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import argparse
 import json
 import sys
+from pathlib import Path
+
 import numpy as np
 
 try:
@@ -14,29 +16,9 @@ try:
 except Exception:
     sr = None  # transcription will be skipped if speech_recognition is not installed
 
-def heuristic_emotion(y: np.ndarray, sr_rate: int):
-    y = np.asarray(y, dtype="float32").flatten()
-    rms = float(np.sqrt(np.mean(np.square(y)) + 1e-12))
-    arousal = float(np.clip((np.tanh(rms * 50) + 1) / 2, 0.0, 1.0))
-
-    try:
-        S = np.abs(np.fft.rfft(y))
-        freqs = np.fft.rfftfreq(len(y), 1.0 / sr_rate)
-        centroid = float((S * freqs).sum() / (S.sum() + 1e-9))
-    except Exception:
-        centroid = 2000.0
-    valence = float(1.0 / (1.0 + np.exp(-(centroid - 2000) / 2000)))
-
-    duration = len(y) / sr_rate
-    confidence = float(np.clip(0.3 + (rms * 100) + min(0.4, duration / 10.0), 0.0, 1.0))
-
-    return {
-        "valence": round(valence, 3),
-        "arousal": round(arousal, 3),
-        "confidence": round(confidence, 3),
-        "source": "voice",
-        "duration": round(duration, 3),
-    }
+# Allow running as a file (python modules/voice/scripts/voice_mic_demo.py) as well as with -m
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from modules.voice.features import heuristic_emotion
 
 def record(duration: float = 4.0, sr_rate: int = 16000):
     print(f"🎙️  Listening... recording {duration:.1f}s @ {sr_rate}Hz", flush=True)
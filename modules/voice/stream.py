@@ -0,0 +1,178 @@
+"""
+Streaming voice inference over a sliding window.
+
+Audio is written into a preallocated, mirrored NumPy ring buffer: every
+sample is stored twice, `capacity` apart, so the most recent N samples are
+always one contiguous slice. Windows are handed to the scorer as zero-copy
+views and memory stays constant however long the stream runs.
+
+VoiceStream emits a result every `hop` seconds over the last `window`
+seconds. By default the energy heuristic is fed from running sums
+(IncrementalFeatures), so a hop costs O(hop); a custom scorer gets the
+window view instead. Sources can be a NumPy array, a WAV file or the microphone.
+"""
+import threading
+import wave
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from modules.voice.features import IncrementalFeatures
+from modules.voice.ring_buffer import RingBuffer
+from modules.voice.voice_emotion import emotion_from_energy
+
+try:
+    import sounddevice as sd
+    HAS_SOUNDDEVICE = True
+except ImportError:
+    HAS_SOUNDDEVICE = False
+
+
+class VoiceStream:
+    """
+    Sliding-window voice emotion stream.
+
+    Args:
+        samplerate: Audio sample rate
+        window: Seconds of audio each result covers
+        hop: Seconds between results
+        channels: Channel count
+        infer: Scorer called with a (samples, channels) window view; None uses
+            the energy heuristic on running features
+        on_result: Optional callback for each result
+        emit_partial: Emit results before the first full window is buffered
+    """
+
+    def __init__(
+        self,
+        samplerate: int = 16000,
+        window: float = 2.0,
+        hop: float = 0.25,
+        channels: int = 1,
+        infer: Optional[Callable[[np.ndarray], Dict]] = None,
+        on_result: Optional[Callable[[Dict], None]] = None,
+        emit_partial: bool = False,
+    ):
+        self.samplerate = samplerate
+        self.window_samples = int(round(window * samplerate))
+        self.hop_samples = max(1, int(round(hop * samplerate)))
+        self.infer = infer
+        self.on_result = on_result
+        self.emit_partial = emit_partial
+        if infer is None:
+            self.features = IncrementalFeatures(samplerate, window, hop, channels=channels)
+            self.ring = self.features.ring
+        else:
+            self.features = None
+            self.ring = RingBuffer(self.window_samples, channels)
+        self._lock = threading.Lock()
+        self._stream = None
+
+    def _emit(self) -> Optional[Dict]:
+        filled = self.ring.total_written
+        if filled < self.window_samples and not self.emit_partial:
+            return None
+        out = self._score()
+        out["t_end"] = round(filled / self.samplerate, 4)
+        if self.on_result is not None:
+            self.on_result(out)
+        return out
+
+    def _score(self) -> Dict:
+        if self.features is not None:
+            return emotion_from_energy(self.features.features()["mean_abs"])
+        return dict(self.infer(self.ring.latest(self.window_samples)))
+
+    def push(self, samples: np.ndarray) -> List[Dict]:
+        """
+        Feed samples and return the results for every hop boundary they cross.
+
+        Blocks are split at hop boundaries, so results do not depend on how
+        the input is chunked.
+        """
+        samples = np.asarray(samples, dtype=self.ring._buf.dtype).reshape(-1, self.ring.channels)
+        results = []
+        with self._lock:
+            start = 0
+            while start < len(samples):
+                to_boundary = self.hop_samples - self.ring.total_written % self.hop_samples
+                end = min(len(samples), start + to_boundary)
+                if self.features is not None:
+                    self.features.update(samples[start:end])
+                else:
+                    self.ring.write(samples[start:end])
+                start = end
+                if self.ring.total_written % self.hop_samples == 0:
+                    out = self._emit()
+                    if out is not None:
+                        results.append(out)
+        return results
+
+    def run(self, blocks: Iterable[np.ndarray]) -> Iterator[Dict]:
+        """Feed blocks from a source and yield results as they become available."""
+        for block in blocks:
+            yield from self.push(block)
+
+    def current(self) -> Optional[Dict]:
+        """Score the latest window now, regardless of hop alignment."""
+        with self._lock:
+            if self.ring.total_written == 0:
+                return None
+            return self._score()
+
+    def start_microphone(self, device=None, blocksize: int = 0):
+        """Start feeding from the microphone; results go to on_result."""
+        if not HAS_SOUNDDEVICE:
+            raise RuntimeError("sounddevice is not installed")
+
+        def callback(indata, frames, time_info, status):
+            # indata is only valid inside the callback; push() copies it into the ring
+            self.push(indata)
+
+        self._stream = sd.InputStream(
+            samplerate=self.samplerate,
+            channels=self.ring.channels,
+            dtype="float32",
+            device=device,
+            blocksize=blocksize,
+            callback=callback,
+        )
+        self._stream.start()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+def array_blocks(audio: np.ndarray, block_size: int) -> Iterator[np.ndarray]:
+    """Yield consecutive views of an array."""
+    for start in range(0, len(audio), block_size):
+        yield audio[start:start + block_size]
+
+
+def wav_blocks(path: str, block_size: int = 4096) -> Iterator[np.ndarray]:
+    """Yield float32 blocks shaped (n, channels) from a PCM WAV file."""
+    with wave.open(path, "rb") as w:
+        channels = w.getnchannels()
+        width = w.getsampwidth()
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+        scale = float(2 ** (8 * width - 1))
+        while True:
+            raw = w.readframes(block_size)
+            if not raw:
+                return
+            x = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+            if width == 1:
+                x -= 128.0
+            yield (x / scale).reshape(-1, channels)
+
+
+if __name__ == "__main__":
+    sr = 16000
+    t = np.arange(sr * 5) / sr
+    audio = (0.05 * np.sin(2 * np.pi * 220 * t) * (t / t[-1])).astype(np.float32)
+    stream = VoiceStream(samplerate=sr, window=2.0, hop=0.5)
+    for out in stream.run(array_blocks(audio, 1024)):
+        print(out)
@@ -11,15 +11,9 @@ try:
     HAS_SOUNDDEVICE = True
 except ImportError:
     HAS_SOUNDDEVICE = False
-import queue
-import threading
 import time
 
-q = queue.Queue()
-
-def audio_callback(indata, frames, time_info, status):
-    """Callback for audio stream."""
-    q.put(indata.copy())
+from modules.voice.features import mean_abs
 
 def infer_from_audio_chunk(chunk):
     """
@@ -28,11 +22,58 @@ def infer_from_audio_chunk(chunk):
     Args:
         chunk: numpy array of audio samples
     
+    Returns:
+        Dict with valence, arousal, confidence, source
+    """
+    return emotion_from_energy(mean_abs(chunk))
+
+def decode_audio(data: bytes, sample_rate: int = 16000):
+    """
+    Decode a WAV file or raw 16-bit little-endian PCM into float samples.
+
+    Args:
+        data: WAV bytes (any PCM sample width, channels are averaged) or raw
+            mono int16 PCM
+        sample_rate: Rate of raw PCM (WAV files carry their own)
+
+    Returns:
+        (float32 samples in [-1, 1], sample rate)
+
+    Raises:
+        ValueError: if the data cannot be decoded
+    """
+    if data[:4] == b"RIFF":
+        import io
+        import wave
+        try:
+            with wave.open(io.BytesIO(data)) as wav:
+                width, channels, sample_rate = wav.getsampwidth(), wav.getnchannels(), wav.getframerate()
+                frames = wav.readframes(wav.getnframes())
+        except (wave.Error, EOFError) as e:
+            raise ValueError(f"Unreadable WAV data: {e}") from None
+        if width == 1:
+            samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif width in (2, 4):
+            dtype = np.dtype(f"<i{width}")
+            samples = np.frombuffer(frames, dtype=dtype).astype(np.float32) / float(2 ** (8 * width - 1))
+        else:
+            raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+        return samples.reshape(-1, channels).mean(axis=1), sample_rate
+    if len(data) % 2:
+        raise ValueError("Raw PCM must be 16-bit samples (even number of bytes)")
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0, sample_rate
+
+def emotion_from_energy(energy):
+    """
+    Map mean absolute energy to emotion.
+    
+    Args:
+        energy: Mean absolute amplitude of the audio
+    
     Returns:
         Dict with valence, arousal, confidence, source
     """
     # Simple heuristic: energy -> arousal
-    energy = float(np.mean(np.abs(chunk)))
     valence = 0.5
     arousal = min(1.0, energy * 10)
     confidence = min(1.0, 0.4 + energy * 5)
@@ -59,26 +100,21 @@ def record_and_infer(duration=3, samplerate=16000, channels=1):
     if not HAS_SOUNDDEVICE:
         return {"valence": 0.5, "arousal": 0.2, "confidence": 0.2, "source": "voice"}
     
-    frames = []
-    def _run():
-        with sd.InputStream(samplerate=samplerate, channels=channels, callback=audio_callback):
-            start = time.time()
-            while time.time() - start < duration:
-                try:
-                    data = q.get(timeout=1)
-                    frames.append(data)
-                except queue.Empty:
-                    pass
-    
-    t = threading.Thread(target=_run)
-    t.start()
-    t.join()
+    from modules.voice.ring_buffer import RingBuffer
+
+    # The callback copies each block straight into a preallocated buffer
+    ring = RingBuffer(int(duration * samplerate), channels)
+
+    def callback(indata, frames, time_info, status):
+        ring.write(indata)
+
+    with sd.InputStream(samplerate=samplerate, channels=channels, dtype="float32", callback=callback):
+        time.sleep(duration)
     
-    if not frames:
+    if ring.total_written == 0:
         return {"valence": 0.5, "arousal": 0.2, "confidence": 0.2, "source": "voice"}
     
-    audio = np.concatenate(frames, axis=0)
-    return infer_from_audio_chunk(audio)
+    return infer_from_audio_chunk(ring.latest(ring.total_written))
 
 if __name__ == "__main__":
     print("Recording 3 seconds of audio...")
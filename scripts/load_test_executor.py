@@ -0,0 +1,122 @@
+"""
+Load test: /infer throughput vs executor kind and worker count.
+
+Starts one uvicorn worker per configuration (SOYL_EXECUTOR / SOYL_EXECUTOR_WORKERS
+/ SOYL_EXECUTOR_QUEUE) and has concurrent clients post a raw frame, audio
+chunk and text to /infer. Reports requests/sec, latency percentiles and how
+many requests were shed with 503. Throughput should grow with workers up to
+the core count; the process pool also scales work that holds the GIL.
+
+Run: python scripts/load_test_executor.py --requests 200 --clients 16 --workers 1 4
+"""
+import argparse
+import io
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+import cv2
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, env):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", "1", "--log-level", "warning"],
+        cwd=ROOT, env={**os.environ, **env},
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def make_payload(width, height, seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    samples = (0.3 * rng.standard_normal(int(16000 * seconds))).clip(-1, 1)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+    return {
+        "image": ("frame.png", cv2.imencode(".png", frame)[1].tobytes(), "image/png"),
+        "audio": ("chunk.wav", buf.getvalue(), "audio/wav"),
+    }
+
+
+def client(port, files, n, latencies, statuses):
+    with httpx.Client(timeout=60.0) as c:
+        for i in range(n):
+            start = time.perf_counter()
+            r = c.post(f"http://127.0.0.1:{port}/infer", files=files, data={"text": f"I like this one {i}"})
+            latencies.append(time.perf_counter() - start)
+            statuses.append(r.status_code)
+
+
+def run_config(kind, workers, queue, files, clients, n):
+    port = free_port()
+    proc = start_server(port, {"SOYL_EXECUTOR": kind, "SOYL_EXECUTOR_WORKERS": str(workers), "SOYL_EXECUTOR_QUEUE": str(queue)})
+    try:
+        # Warm-up: start pool workers (processes are spawned on first use)
+        warm = threading.Thread(target=client, args=(port, files, workers, [], []))
+        warm.start()
+        warm.join()
+        latencies, statuses = [], []
+        threads = [threading.Thread(target=client, args=(port, files, n, latencies, statuses)) for _ in range(clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait()
+    ok = statuses.count(200)
+    p50, p95 = np.percentile(np.array(latencies) * 1000, [50, 95])
+    print(f"{kind:>8} {workers:>7} {queue:>6} {ok / elapsed:>8.1f} {p50:>8.1f} {p95:>8.1f} {statuses.count(503):>5}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="/infer throughput per executor configuration")
+    p.add_argument("--requests", "-n", type=int, default=100, help="Requests per client")
+    p.add_argument("--clients", "-c", type=int, default=16, help="Concurrent clients")
+    p.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    p.add_argument("--kinds", nargs="+", default=["thread", "process"], choices=["thread", "process"])
+    p.add_argument("--queue", type=int, default=64, help="SOYL_EXECUTOR_QUEUE (lower it to see 503s)")
+    p.add_argument("--size", type=int, nargs=2, default=[1280, 720], metavar=("W", "H"), help="Frame size")
+    p.add_argument("--seconds", type=float, default=2.0, help="Audio chunk length")
+    args = p.parse_args()
+
+    files = make_payload(*args.size, args.seconds)
+    print(f"{os.cpu_count()} cores, {args.clients} clients x {args.requests} requests, "
+          f"{args.size[0]}x{args.size[1]} frame + {args.seconds:g}s audio + text\n")
+    print(f"{'executor':>8} {'workers':>7} {'queue':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'503s':>5}")
+    for kind in args.kinds:
+        for workers in args.workers:
+            run_config(kind, workers, args.queue, files, args.clients, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Load test: messages/sec per worker for the /stream WebSocket vs the POST path.
+
+Starts one uvicorn worker, then pushes the same readings through
+POST /updateEmotionState (keep-alive HTTP) and through /stream, both
+request/reply and pipelined.
+
+Run: python scripts/load_test_stream.py --messages 5000 --clients 4
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+from websockets.sync.client import connect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READING = {"valence": 0.7, "arousal": 0.5, "confidence": 0.8, "source": "face"}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", "1", "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def post_client(port, client_id, n):
+    url = f"http://127.0.0.1:{port}/updateEmotionState"
+    with httpx.Client() as c:
+        for _ in range(n):
+            r = c.post(url, json={"session_id": f"post-{client_id}", "module": READING})
+            r.raise_for_status()
+
+
+def ws_client(port, client_id, n, pipelined):
+    url = f"ws://127.0.0.1:{port}/stream?session_id=ws-{client_id}"
+    message = json.dumps(READING)
+    with connect(url) as ws:
+        if not pipelined:
+            for _ in range(n):
+                ws.send(message)
+                ws.recv()
+            return
+
+        # Sender and receiver run independently; replies are coalesced,
+        # so wait until the server reports every reading folded.
+        def send_all():
+            for _ in range(n):
+                ws.send(message)
+
+        sender = threading.Thread(target=send_all)
+        sender.start()
+        seq = 0
+        while seq < n:
+            seq = json.loads(ws.recv()).get("seq", seq)
+        sender.join()
+
+
+def measure(label, fn, clients, n):
+    threads = [threading.Thread(target=fn, args=(i, n)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    total = clients * n
+    print(f"{label:<28} {total:>8} msgs  {elapsed:7.2f}s  {total / elapsed:10.0f} msgs/s")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare /stream and POST throughput on one worker")
+    p.add_argument("--messages", "-n", type=int, default=2000, help="Messages per client")
+    p.add_argument("--clients", "-c", type=int, default=4, help="Concurrent clients")
+    args = p.parse_args()
+
+    port = free_port()
+    proc = start_server(port)
+    try:
+        print(f"1 worker, {args.clients} clients x {args.messages} messages\n")
+        measure("POST /updateEmotionState", lambda i, n: post_client(port, i, n), args.clients, args.messages)
+        measure("WS /stream (request/reply)", lambda i, n: ws_client(port, i, n, False), args.clients, args.messages)
+        measure("WS /stream (pipelined)", lambda i, n: ws_client(port, i, n, True), args.clients, args.messages)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
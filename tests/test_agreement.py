@@ -0,0 +1,55 @@
+"""
+Unit tests for the inter-annotator agreement module.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.text.agreement import annotation_matrix, icc, krippendorff_alpha, mean_ratings, pairwise_pearson
+
+def random_ratings(n=60, k=4, missing=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    truth = rng.uniform(0, 1, (n, 1))
+    m = np.clip(truth + rng.normal(0, 0.15, (n, k)), 0, 1)
+    m[rng.random((n, k)) < missing] = np.nan
+    return m
+
+def test_matrix_and_means_coerce_like_safe_mean():
+    """Test unparseable entries are missing and means skip them."""
+    df = pd.DataFrame({"a": ["0.5", "x", None, 0.2], "b": [0.7, 0.4, None, "bad"]})
+    m = annotation_matrix(df, ["a", "b"])
+    means = mean_ratings(m)
+    assert means[0] == pytest.approx(0.6) and means[1] == 0.4 and np.isnan(means[2]) and means[3] == 0.2
+    assert mean_ratings(annotation_matrix(df, [])).shape == (4,)
+
+def test_pairwise_pearson_matches_complete_pairs():
+    """Test masked Pearson equals np.corrcoef on the items both annotators rated."""
+    m = random_ratings()
+    pairs = pairwise_pearson(m, names=["a1", "a2", "a3", "a4"])
+    assert len(pairs) == 6
+    for pair in pairs:
+        i, j = int(pair["a"][1]) - 1, int(pair["b"][1]) - 1
+        ok = ~np.isnan(m[:, i]) & ~np.isnan(m[:, j])
+        assert pair["n"] == ok.sum()
+        assert pair["r"] == pytest.approx(np.corrcoef(m[ok, i], m[ok, j])[0, 1])
+    assert pairwise_pearson(m[:5], min_items=6) == []
+
+def test_krippendorff_alpha_matches_definition():
+    """Test alpha against a direct sum over value pairs."""
+    m = random_ratings(n=30)
+    units = [row[~np.isnan(row)] for row in m]
+    units = [u for u in units if len(u) >= 2]
+    values = np.concatenate(units)
+    n = len(values)
+    observed = sum(((u[:, None] - u[None, :]) ** 2).sum() / (len(u) - 1) for u in units) / n
+    expected = ((values[:, None] - values[None, :]) ** 2).sum() / (n * (n - 1))
+    assert krippendorff_alpha(m) == pytest.approx(1 - observed / expected)
+    assert krippendorff_alpha(np.array([[1.0, 1.0], [2.0, 2.0]])) == pytest.approx(1.0)
+
+def test_icc_shrout_fleiss_example():
+    """Test ICC(2,1) and ICC(2,k) on the Shrout & Fleiss (1979) table."""
+    ratings = np.array([[9, 2, 5, 8], [6, 1, 3, 2], [8, 4, 6, 8], [7, 1, 2, 6], [10, 5, 6, 9], [6, 2, 4, 7]], float)
+    result = icc(ratings)
+    assert result["icc2_1"] == pytest.approx(0.29, abs=0.005)
+    assert result["icc2_k"] == pytest.approx(0.62, abs=0.005)
+    assert np.isnan(icc(np.full((3, 2), np.nan))["icc2_1"])
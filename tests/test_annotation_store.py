@@ -0,0 +1,94 @@
+"""
+Unit tests for the annotation journal and the quick_annotate session.
+"""
+import builtins
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.text.annotation_store import AnnotationStore, journal_path
+from modules.text.scripts import quick_annotate
+from modules.text.table_io import read_table, table_path, write_table
+
+def sheet(rows=4):
+    return pd.DataFrame({
+        "id": [f"r{i}" for i in range(rows)],
+        "text": [f"text {i}" for i in range(rows)],
+        "source": "goemotions",
+        "annotator_1_valence": [0.9] + [np.nan] * (rows - 1),
+        "annotator_1_arousal": [0.8] + [np.nan] * (rows - 1),
+    })
+
+def test_labels_are_durable_and_latest_wins(tmp_path):
+    """Test each label is visible to a new connection right away and re-annotation wins."""
+    path = tmp_path / "labels.sqlite"
+    store = AnnotationStore(path)
+    store.record("r1", 1, 0.2, 0.3)
+    store.record("r1", 1, 0.4, 0.5)
+    with AnnotationStore(path) as other:
+        assert other._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        latest = other.latest()
+    assert latest[["item_id", "valence", "arousal"]].values.tolist() == [["r1", 0.4, 0.5]]
+    store.close()
+
+def test_concurrent_annotators(tmp_path):
+    """Test several writers on one journal lose no labels."""
+    path = tmp_path / "labels.sqlite"
+    AnnotationStore(path).close()
+
+    def annotate(annotator):
+        with AnnotationStore(path) as store:
+            for i in range(100):
+                store.record(f"r{i}", annotator, i / 100, 0.5)
+
+    threads = [threading.Thread(target=annotate, args=(k,)) for k in (1, 2, 3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with AnnotationStore(path) as store:
+        counts = store.latest().groupby("annotator").size().to_dict()
+    assert counts == {1: 100, 2: 100, 3: 100}
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_compact_writes_sheet_layout(tmp_path, fmt):
+    """Test compact folds labels into annotator columns and drops superseded rows."""
+    if fmt != "csv":
+        pytest.importorskip("pyarrow")
+    path = write_table(sheet(), table_path(tmp_path, "sample_for_annotation", fmt))
+    with AnnotationStore(journal_path(path)) as store:
+        store.record("r2", 1, 0.1, 0.1)
+        store.record("r2", 1, 0.3, 0.6)
+        store.record("r0", 2, 0.5, 0.7)
+        store.record("missing", 1, 0.5, 0.5)
+        store.compact(path)
+        assert store._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0] == 3
+    df = read_table(path)
+    assert list(df.columns[:5]) == list(sheet().columns)
+    assert np.allclose(df["annotator_1_valence"], [0.9, np.nan, 0.3, np.nan], equal_nan=True)
+    assert np.allclose(df["annotator_2_arousal"], [0.7, np.nan, np.nan, np.nan], equal_nan=True)
+
+def test_interactive_session_survives_crash(tmp_path, monkeypatch):
+    """Test labels entered before a crash are kept and the next session skips them."""
+    path = write_table(sheet(), table_path(tmp_path, "sample_for_annotation", "csv"))
+    monkeypatch.setattr(quick_annotate, "sample_file", lambda: path)
+    answers = iter(["", "0.25", "0.75"])
+
+    def crash_after_answers(prompt=""):
+        try:
+            return next(answers)
+        except StopIteration:
+            raise KeyboardInterrupt from None
+
+    monkeypatch.setattr(builtins, "input", crash_after_answers)
+    with pytest.raises(KeyboardInterrupt):
+        quick_annotate.annotate_interactive(annotator_num=1)
+    assert read_table(path)["annotator_1_valence"].isna().sum() == 3
+
+    answers = iter(["", "", "q"])
+    quick_annotate.annotate_interactive(annotator_num=1)
+    df = read_table(path)
+    assert df["annotator_1_valence"].tolist()[:2] == [0.9, 0.25]
+    assert df["annotator_1_arousal"].tolist()[1] == 0.75
@@ -0,0 +1,204 @@
+"""
+Tests for the FastAPI app.
+"""
+import io
+import json
+import wave
+
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app.main as api
+from app.main import app
+from modules.fusion.fusion import compute_emotion_state
+from modules.text.text_sentiment import infer_from_text
+from modules.vision.face_emotion import FaceEmotionEngine, infer_from_frame
+from modules.vision.scripts.bench_face_engine import NumpyStandInModel
+from modules.voice.voice_emotion import infer_from_audio_chunk
+
+client = TestClient(app)
+
+def test_get_emotion_state_batch():
+    """Test the batch endpoint matches the single-session endpoint."""
+    sessions = [
+        [(0.8, 0.6, 0.9), (0.6, 0.4, 0.7), (0.7, 0.5, 0.6)],
+        [(0.2, 0.9, 0.3), (0.4, 0.1, 0.8), (0.5, 0.5, 0.1)],
+    ]
+    sources = ["face", "voice", "text"]
+    payload = {
+        "sources": sources,
+        "valence": [[m[0] for m in s] for s in sessions],
+        "arousal": [[m[1] for m in s] for s in sessions],
+        "confidence": [[m[2] for m in s] for s in sessions],
+        "mask": [[True, True, True], [True, True, False]],
+    }
+    r = client.post("/getEmotionStateBatch", json=payload)
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert len(results) == 2
+
+    for i, session in enumerate(sessions):
+        modules = [
+            {"valence": v, "arousal": a, "confidence": c, "source": src}
+            for (v, a, c), src, keep in zip(session, sources, payload["mask"][i])
+            if keep
+        ]
+        single = client.post("/getEmotionState", json={"modules": modules}).json()
+        assert results[i] == single
+
+def test_get_emotion_state_batch_bad_shape():
+    """Test ragged batch input is rejected."""
+    payload = {
+        "sources": ["face", "voice"],
+        "valence": [[0.5, 0.5], [0.5]],
+        "arousal": [[0.5, 0.5], [0.5]],
+        "confidence": [[0.5, 0.5], [0.5]],
+    }
+    r = client.post("/getEmotionStateBatch", json=payload)
+    assert r.status_code == 422
+
+def test_update_emotion_state():
+    """Test streaming updates accumulate per session."""
+    first = {"session_id": "api-s1", "module": {"valence": 0.8, "arousal": 0.6, "confidence": 0.9, "source": "face"}}
+    r = client.post("/updateEmotionState", json=first)
+    assert r.status_code == 200
+    assert r.json()["dominant_signal"] == "face"
+
+    second = {"session_id": "api-s1", "module": {"valence": 0.2, "arousal": 0.4, "confidence": 0.7, "source": "voice"}}
+    out = client.post("/updateEmotionState", json=second).json()
+    assert 0.2 < out["valence"] < 0.8
+
+    assert client.delete("/session/api-s1").status_code == 200
+    assert client.delete("/session/api-s1").status_code == 404
+
+def test_stream_websocket():
+    """Test the WebSocket stream folds readings and reports errors."""
+    with client.websocket_connect("/stream?session_id=ws-s1") as ws:
+        ws.send_json({"valence": 0.8, "arousal": 0.6, "confidence": 0.9, "source": "face"})
+        out = ws.receive_json()
+        assert out["seq"] == 1
+        assert out["dominant_signal"] == "face"
+
+        ws.send_json([
+            {"valence": 0.2, "arousal": 0.4, "confidence": 0.7, "source": "voice"},
+            {"valence": 0.3, "arousal": 0.4, "confidence": 0.95, "source": "voice"},
+        ])
+        out = ws.receive_json()
+        assert out["seq"] == 3
+        assert out["dominant_signal"] == "voice"
+
+        ws.send_text('{"valence": "high"}')
+        assert "error" in ws.receive_json()
+
+def test_stream_websocket_rejects_bad_frames():
+    """Test non-finite readings, oversized and binary frames get errors and leave the session intact."""
+    from app.stream import MAX_MESSAGE_BYTES
+
+    reading = {"valence": 0.8, "arousal": 0.6, "confidence": 0.9, "source": "face"}
+    with client.websocket_connect("/stream?session_id=ws-bad") as ws:
+        ws.send_text('{"valence": NaN, "arousal": 0.5, "confidence": 0.9, "source": "face"}')
+        assert ws.receive_json() == {"error": "'valence' must be finite.", "status": 422}
+        ws.send_text('{"valence": 0.5, "arousal": 1e999, "confidence": 0.9, "source": "face"}')
+        assert ws.receive_json()["error"] == "'arousal' must be finite."
+        # Fewer characters than the limit, but more bytes
+        ws.send_text(json.dumps({**reading, "source": "é" * (MAX_MESSAGE_BYTES // 2 + 1)}, ensure_ascii=False))
+        assert "exceeds" in ws.receive_json()["error"]
+        ws.send_bytes(b"\x00\x01")
+        assert "Binary" in ws.receive_json()["error"]
+
+        ws.send_json(reading)
+        out = ws.receive_json()
+        assert out["seq"] == 1 and out["valence"] == 0.8
+
+def test_text_batch():
+    """Test batch text scoring keeps input order and matches single scoring."""
+    texts = ["I like it", "worst ever", "I like it", "maybe", "hello"]
+    r = client.post("/text/batch", json={"texts": texts})
+    assert r.status_code == 200
+    assert r.json()["results"] == [infer_from_text(t) for t in texts]
+
+def test_text_batch_ndjson():
+    """Test NDJSON streaming returns one line per input."""
+    texts = ["I like it", "worst ever"] * 3
+    r = client.post("/text/batch", json={"texts": texts}, headers={"Accept": "application/x-ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [line["valence"] for line in lines] == [0.9, 0.1] * 3
+
+def test_text_batch_format_ignores_size(monkeypatch):
+    """Test large batches stay JSON unless NDJSON is asked for, and oversized JSON batches get 413."""
+    monkeypatch.setattr(api, "TEXT_BATCH_JSON_LIMIT", 4)
+    texts = ["I like it"] * 4
+    r = client.post("/text/batch", json={"texts": texts})
+    assert r.headers["content-type"].startswith("application/json") and len(r.json()["results"]) == 4
+
+    r = client.post("/text/batch", json={"texts": texts + ["one more"]})
+    assert r.status_code == 413
+    r = client.post("/text/batch", json={"texts": texts + ["one more"]}, headers={"Accept": "application/x-ndjson"})
+    assert r.status_code == 200 and len(r.text.splitlines()) == 5
+
+def test_text_single():
+    """Test the micro-batched single text endpoint."""
+    r = client.post("/text", json={"text": "worst ever"})
+    assert r.status_code == 200
+    assert r.json() == infer_from_text("worst ever")
+
+def wav_bytes(samples, rate=16000):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+def test_infer_multimodal():
+    """Test /infer scores raw image, audio and text and fuses them like /getEmotionState."""
+    frame = np.full((120, 160, 3), 180, dtype=np.uint8)
+    samples = 0.3 * np.sin(np.linspace(0, 200, 8000)).astype(np.float32)
+    r = client.post(
+        "/infer",
+        files={"image": ("frame.png", cv2.imencode(".png", frame)[1].tobytes(), "image/png"),
+               "audio": ("chunk.wav", wav_bytes(samples), "audio/wav")},
+        data={"text": "I like it"},
+    )
+    assert r.status_code == 200
+    out = r.json()
+    expected = [infer_from_frame(frame), infer_from_audio_chunk(samples), infer_from_text("I like it")]
+    assert [m["source"] for m in out["modules"]] == ["face", "voice", "text"]
+    assert out["modules"][0] == expected[0] and out["modules"][2] == expected[2]
+    assert abs(out["modules"][1]["arousal"] - expected[1]["arousal"]) < 1e-3
+    assert {k: out[k] for k in ("valence", "arousal", "confidence", "dominant_signal")} == compute_emotion_state(out["modules"])
+    assert set(out["timings_ms"]) == {"face", "voice", "text", "fusion", "total"}
+
+def test_infer_partial_and_bad_inputs():
+    """Test /infer with one modality, raw PCM, and inputs it cannot use."""
+    pcm = (0.1 * np.ones(1600) * 32767).astype("<i2").tobytes()
+    r = client.post("/infer", files={"audio": ("chunk.pcm", pcm, "application/octet-stream")})
+    assert r.status_code == 200
+    assert [m["source"] for m in r.json()["modules"]] == ["voice"]
+
+    assert client.post("/infer", data={"sample_rate": "8000"}).status_code == 422
+    r = client.post("/infer", files={"image": ("x.png", b"not an image", "image/png")}, data={"text": "hi"})
+    assert r.status_code == 422 and r.json()["detail"].startswith("face:")
+
+def test_infer_with_face_engine(monkeypatch):
+    """Test /infer reports the largest face from the engine and skips frames without faces."""
+    class Cascade:
+        boxes = [(10, 10, 30, 30), (50, 20, 60, 60)]
+
+        def detectMultiScale(self, gray, **kwargs):
+            return np.array(self.boxes)
+
+    cascade = Cascade()
+    engine = FaceEmotionEngine(model=NumpyStandInModel(), face_cascade=cascade)
+    monkeypatch.setattr(api, "get_face_engine", lambda: engine)
+    image = ("f.png", cv2.imencode(".png", np.zeros((120, 160, 3), np.uint8))[1].tobytes(), "image/png")
+    out = client.post("/infer", files={"image": image}, data={"text": "worst ever"}).json()
+    assert out["modules"][0]["box"] == [50, 20, 60, 60] and out["modules"][0]["faces"] == 2
+
+    cascade.boxes = []
+    out = client.post("/infer", files={"image": image}, data={"text": "worst ever"}).json()
+    assert out["skipped"] == ["face"] and [m["source"] for m in out["modules"]] == ["text"]
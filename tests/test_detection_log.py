@@ -0,0 +1,57 @@
+"""
+Unit tests for the streaming detection log.
+"""
+from modules.vision.detection_log import (
+    DetectionLogWriter,
+    iter_detection_logs,
+    load_detection_columns,
+    segment_files,
+)
+
+def make_record(i):
+    return {"timestamp": 1000.0 + i, "emotion": "Happy" if i % 2 else "Sad",
+            "confidence_percent": 50.0 + i % 50, "location_x_y_w_h": [i, i, 40, 40]}
+
+def test_roundtrip_with_rotation(tmp_path):
+    """Test records survive rotation and read back in order."""
+    records = [make_record(i) for i in range(500)]
+    with DetectionLogWriter(tmp_path, max_bytes=4096) as log:
+        log.write_many(records)
+
+    assert len(segment_files(tmp_path)) > 1
+    assert list(iter_detection_logs(tmp_path)) == records
+    assert list(iter_detection_logs(tmp_path, use_mmap=True)) == records
+
+    cols = load_detection_columns(tmp_path)
+    assert cols["timestamp"].shape == (500,)
+    assert cols["emotion"][1] == "Happy"
+
+def test_reopen_appends_new_segment(tmp_path):
+    """Test a restarted writer does not overwrite earlier segments."""
+    with DetectionLogWriter(tmp_path) as log:
+        log.write(make_record(0))
+    with DetectionLogWriter(tmp_path) as log:
+        log.write(make_record(1))
+    assert len(segment_files(tmp_path)) == 2
+    assert [r["timestamp"] for r in iter_detection_logs(tmp_path)] == [1000.0, 1001.0]
+
+def test_truncated_tail_is_skipped(tmp_path):
+    """Test a partially written last line (crash) is ignored."""
+    with DetectionLogWriter(tmp_path) as log:
+        log.write(make_record(0))
+    seg = segment_files(tmp_path)[0]
+    with open(seg, "ab") as f:
+        f.write(b'{"timestamp": 10')
+    assert len(list(iter_detection_logs(tmp_path))) == 1
+
+def test_idle_records_are_flushed(tmp_path):
+    """Test buffered records reach the file after flush_every even when writes stop."""
+    import time
+
+    with DetectionLogWriter(tmp_path, flush_every=0.05) as log:
+        log.write(make_record(0))
+        for _ in range(100):
+            if segment_files(tmp_path)[0].stat().st_size:
+                break
+            time.sleep(0.01)
+        assert list(iter_detection_logs(tmp_path)) == [make_record(0)]
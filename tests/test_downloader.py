@@ -0,0 +1,138 @@
+"""
+Tests for the resumable downloader against a local HTTP server.
+"""
+import hashlib
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+from modules.text.downloader import ChecksumError, download_all, fetch
+from modules.text.scripts import download_datasets
+
+FILES = {f"goemotions_{i}.csv": os.urandom(300_000 + i) for i in (1, 2, 3)}
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serves FILES with Range support; can cut transfers short or ignore Range."""
+    files = FILES
+    drop_after = {}  # name -> bytes to send before closing the connection (once)
+    ignore_range = False
+    log = []
+
+    def do_GET(self):
+        name = self.path.rsplit("/", 1)[-1]
+        data = self.files.get(name)
+        if data is None:
+            self.send_error(404)
+            return
+        header = self.headers.get("Range")
+        self.log.append((name, header))
+        start = 0
+        if header and not self.ignore_range:
+            start = int(header.split("=")[1].split("-")[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        body = data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        cut = self.drop_after.pop(name, None)
+        self.wfile.write(body[:cut] if cut is not None else body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    RangeHandler.drop_after = {}
+    RangeHandler.ignore_range = False
+    RangeHandler.log = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/data"
+    httpd.shutdown()
+    httpd.server_close()
+
+def sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+def test_parallel_download_records_manifest(tmp_path, server):
+    """Test all parts are fetched, written intact and recorded with their hashes."""
+    manifest = tmp_path / "manifest.json"
+    results = download_datasets.download_goemotions(base_url=server, raw_dir=tmp_path, manifest_path=manifest)
+    assert {r["status"] for r in results.values()} == {"downloaded"}
+    for name, data in FILES.items():
+        assert (tmp_path / name).read_bytes() == data
+        assert not (tmp_path / (name + ".part")).exists()
+    recorded = json.loads(manifest.read_text())
+    assert {k: v["sha256"] for k, v in recorded.items()} == {k: sha(v) for k, v in FILES.items()}
+
+    again = download_datasets.download_goemotions(base_url=server, raw_dir=tmp_path, manifest_path=manifest)
+    assert {r["status"] for r in again.values()} == {"exists"}
+
+def test_resumes_partial_file_with_range(tmp_path, server):
+    """Test an existing .part file is continued, not restarted."""
+    data = FILES["goemotions_1.csv"]
+    (tmp_path / "goemotions_1.csv.part").write_bytes(data[:100_000])
+    result = fetch(f"{server}/goemotions_1.csv", tmp_path / "goemotions_1.csv", sha256=sha(data), chunk_size=4096)
+    assert result["status"] == "resumed"
+    assert RangeHandler.log == [("goemotions_1.csv", "bytes=100000-")]
+    assert (tmp_path / "goemotions_1.csv").read_bytes() == data
+
+def test_dropped_connection_is_retried_from_offset(tmp_path, server):
+    """Test a transfer cut short is resumed by the retry."""
+    data = FILES["goemotions_2.csv"]
+    RangeHandler.drop_after = {"goemotions_2.csv": 123_456}
+    result = fetch(f"{server}/goemotions_2.csv", tmp_path / "goemotions_2.csv", sha256=sha(data), backoff=0)
+    assert result["status"] == "resumed"
+    assert RangeHandler.log == [("goemotions_2.csv", None), ("goemotions_2.csv", "bytes=123456-")]
+    assert (tmp_path / "goemotions_2.csv").read_bytes() == data
+
+def test_server_ignoring_range_restarts(tmp_path, server):
+    """Test a 200 reply to a Range request overwrites the partial file."""
+    data = FILES["goemotions_3.csv"]
+    (tmp_path / "goemotions_3.csv.part").write_bytes(b"stale bytes")
+    RangeHandler.ignore_range = True
+    result = fetch(f"{server}/goemotions_3.csv", tmp_path / "goemotions_3.csv")
+    assert result["status"] == "downloaded" and result["sha256"] == sha(data)
+    assert (tmp_path / "goemotions_3.csv").read_bytes() == data
+
+def test_checksum_mismatch_fails_cleanly(tmp_path, server):
+    """Test a bad digest leaves neither the target nor a partial file, and other files still land."""
+    with pytest.raises(ChecksumError):
+        fetch(f"{server}/goemotions_1.csv", tmp_path / "goemotions_1.csv", sha256="0" * 64)
+    assert list(tmp_path.iterdir()) == []
+
+    files = [
+        {"name": "goemotions_1.csv", "url": f"{server}/goemotions_1.csv", "sha256": "0" * 64},
+        {"name": "goemotions_2.csv", "url": f"{server}/goemotions_2.csv"},
+        {"name": "missing.csv", "url": f"{server}/missing.csv"},
+    ]
+    results = download_all(files, tmp_path, manifest_path=tmp_path / "manifest.json", jobs=3, backoff=0)
+    assert [results[f["name"]]["status"] for f in files] == ["failed", "downloaded", "failed"]
+    assert list(json.loads((tmp_path / "manifest.json").read_text())) == ["goemotions_2.csv"]
+
+def test_failed_redownload_keeps_previous_copy(tmp_path, server):
+    """Test an outdated copy is put back when its replacement fails the checksum or the transfer."""
+    dest = tmp_path / "goemotions_1.csv"
+    dest.write_bytes(b"old copy")
+    with pytest.raises(ChecksumError):
+        fetch(f"{server}/goemotions_1.csv", dest, sha256="0" * 64)
+    assert dest.read_bytes() == b"old copy"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["goemotions_1.csv"]
+
+    missing = tmp_path / "missing.csv"
+    missing.write_bytes(b"old copy")
+    with pytest.raises(Exception):
+        fetch(f"{server}/missing.csv", missing, sha256="0" * 64, backoff=0)
+    assert missing.read_bytes() == b"old copy"
+    assert not (tmp_path / "missing.csv.bad").exists()
@@ -0,0 +1,99 @@
+"""
+Tests for the API inference executor and load shedding.
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as api
+from app.executor import InferenceExecutor, Overloaded
+from modules.fusion.fusion import compute_emotion_state
+
+READING = {"valence": 0.8, "arousal": 0.6, "confidence": 0.9, "source": "face"}
+
+def test_bounded_admission():
+    """Test calls beyond workers + max_queue are rejected while the pool is busy."""
+    executor = InferenceExecutor("thread", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert executor.stats()["in_flight"] == 2 and executor.stats()["queued"] == 1
+        with pytest.raises(Overloaded):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        return await executor.run(sum, [1, 2])
+
+    assert asyncio.run(scenario()) == 3
+    stats = executor.stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 3 and stats["in_flight"] == 0
+    executor.shutdown()
+
+def test_process_pool_and_local_calls():
+    """Test process workers run picklable calls and local calls stay in-process."""
+    executor = InferenceExecutor("process", workers=2)
+    state = []
+
+    async def scenario():
+        fused = await executor.run(compute_emotion_state, [READING])
+        await executor.run(state.append, "local", local=True)
+        return fused
+
+    assert asyncio.run(scenario()) == compute_emotion_state([READING])
+    assert state == ["local"]
+    executor.shutdown()
+    with pytest.raises(ValueError):
+        InferenceExecutor("fiber")
+
+def test_api_sheds_load_with_503(monkeypatch):
+    """Test inference routes answer 503 with Retry-After when the executor is full."""
+    client = TestClient(api.app)
+    monkeypatch.setattr(api.inference, "max_in_flight", 0)
+    r = client.post("/getEmotionState", json={"modules": [READING]})
+    assert r.status_code == 503 and r.headers["retry-after"] == "1"
+    assert client.post("/text", json={"text": "hi"}).status_code == 503
+    assert client.get("/executor").json()["rejected"] >= 2
+
+    monkeypatch.setattr(api.inference, "max_in_flight", 10)
+    assert client.post("/getEmotionState", json={"modules": [READING]}).json() == compute_emotion_state([READING])
+
+def test_slot_counts_concurrent_calls():
+    """Test a multi-call slot takes one slot per call, capped at max_in_flight."""
+    executor = InferenceExecutor("thread", workers=2, max_queue=1)
+
+    async def scenario():
+        async with executor.slot(2):
+            assert executor.stats()["in_flight"] == 2
+            with pytest.raises(Overloaded):
+                async with executor.slot(2):
+                    pass
+            async with executor.slot():
+                assert executor.stats()["in_flight"] == 3
+        async with executor.slot(10):
+            assert executor.stats()["in_flight"] == 3
+
+    asyncio.run(scenario())
+    assert executor.stats()["in_flight"] == 0 and executor.stats()["rejected"] == 1
+
+def test_text_batches_run_on_inference_workers():
+    """Test /text scoring runs on the inference thread pool, not a side pool."""
+    from modules.text.backends import LexiconBackend, TextBackend
+    from modules.text.text_sentiment import set_backend
+
+    threads = []
+
+    class ThreadRecorder(TextBackend):
+        def score_batch(self, texts):
+            threads.append(threading.current_thread().name)
+            return [dict(READING, source="text") for _ in texts]
+
+    try:
+        set_backend(ThreadRecorder())
+        assert TestClient(api.app).post("/text", json={"text": "which thread"}).status_code == 200
+    finally:
+        set_backend(LexiconBackend())
+    assert threads and all(name.startswith("inference") for name in threads)
@@ -0,0 +1,47 @@
+"""
+Unit tests for the batched face emotion engine.
+"""
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from modules.vision.face_emotion import FaceEmotionEngine
+from modules.vision.scripts.bench_face_engine import NumpyStandInModel, per_face
+
+class CountingModel(NumpyStandInModel):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def predict(self, batch, verbose=0):
+        self.calls += 1
+        return super().predict(batch, verbose)
+
+def test_batched_matches_per_face():
+    """Test one batched call gives the same probabilities as per-face calls."""
+    model = CountingModel()
+    engine = FaceEmotionEngine(model=model, face_cascade=object())
+    rng = np.random.default_rng(0)
+    grays = [rng.integers(0, 256, (240, 320), dtype=np.uint8) for _ in range(2)]
+    boxes = [np.array([[10, 10, 60, 60], [100, 50, 80, 80]]), np.array([[30, 40, 50, 50]])]
+
+    out = engine.infer_gray(grays, boxes)
+    assert model.calls == 1
+    assert [len(o) for o in out] == [2, 1]
+
+    expected = per_face(model, grays[0], boxes[0]) + per_face(model, grays[1], boxes[1])
+    got = [f for frame in out for f in frame]
+    for face, probs in zip(got, expected):
+        assert face["source"] == "face"
+        assert face["emotion"] == engine.labels[int(np.argmax(probs))]
+        assert face["confidence"] == round(float(np.max(probs)), 4)
+        assert 0.0 <= face["valence"] <= 1.0 and 0.0 <= face["arousal"] <= 1.0
+
+def test_no_faces():
+    """Test frames without faces skip the model."""
+    model = CountingModel()
+    engine = FaceEmotionEngine(model=model, face_cascade=object())
+    out = engine.infer_gray([np.zeros((10, 10), dtype=np.uint8)], [np.empty((0, 4), dtype=np.int32)])
+    assert out == [[]]
+    assert model.calls == 0
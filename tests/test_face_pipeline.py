@@ -0,0 +1,93 @@
+"""
+Unit tests for the pipelined face module.
+"""
+import time
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from modules.vision.face_emotion import FaceEmotionEngine
+from modules.vision.pipeline import FacePipeline, synthetic_source
+from modules.vision.scripts.bench_face_engine import NumpyStandInModel
+
+BOXES = np.array([[10, 10, 48, 48], [80, 20, 60, 60]], dtype=np.int32)
+
+def make_pipeline(n_frames, sink, **kwargs):
+    engine = FaceEmotionEngine(model=NumpyStandInModel(), face_cascade=object())
+    source = synthetic_source(n_frames, width=160, height=120)
+    return FacePipeline(engine, source, sink=sink, detector=lambda gray: BOXES, **kwargs)
+
+def test_pipeline_processes_frames_in_order():
+    """Test frames flow through every stage with results attached."""
+    seen = []
+    pipeline = make_pipeline(30, seen.append, queue_size=64)
+    pipeline.run()
+
+    stats = pipeline.stats()
+    assert stats["frames_out"] == len(seen) == 30
+    assert [p.frame_id for p in seen] == list(range(30))
+    assert all(len(p.results) == 2 for p in seen)
+    assert set(stats["stages"]) == {"capture", "detect", "infer", "sink", "end_to_end"}
+
+def test_pipeline_drops_stale_frames_under_load():
+    """Test a slow sink causes old frames to be dropped, not queued."""
+    seen = []
+
+    def slow_sink(packet):
+        seen.append(packet.frame_id)
+        time.sleep(0.01)
+
+    pipeline = make_pipeline(200, slow_sink, queue_size=1)
+    pipeline.run()
+
+    stats = pipeline.stats()
+    assert sum(stats["dropped"].values()) > 0
+    assert stats["frames_out"] < 200
+    assert seen == sorted(seen)
+
+def test_pipeline_stage_error_is_raised():
+    """Test an error in a stage thread stops the pipeline and is re-raised from run()."""
+    class BrokenEngine(FaceEmotionEngine):
+        def infer_gray(self, gray_frames, boxes):
+            raise RuntimeError("model crashed")
+
+    engine = BrokenEngine(model=NumpyStandInModel(), face_cascade=object())
+    pipeline = FacePipeline(engine, synthetic_source(1000, width=160, height=120), detector=lambda gray: BOXES)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        pipeline.run()
+    assert pipeline.stats()["frames_out"] == 0
+
+    def broken_detector(gray):
+        raise ValueError("bad frame")
+
+    pipeline = make_pipeline(1000, None)
+    pipeline.detector = broken_detector
+    with pytest.raises(ValueError, match="bad frame"):
+        pipeline.run()
+
+def test_pipeline_tracker_infers_in_infer_stage():
+    """Test with a tracker, model calls run in the infer thread and only for stale faces."""
+    import threading
+
+    from modules.vision.scripts.bench_tracking import steady_frames
+    from modules.vision.tracking import FaceTracker
+
+    threads = []
+
+    class RecordingEngine(FaceEmotionEngine):
+        def infer_gray(self, gray_frames, boxes):
+            threads.append(threading.current_thread().name)
+            return super().infer_gray(gray_frames, boxes)
+
+    engine = RecordingEngine(model=NumpyStandInModel(), face_cascade=object())
+    tracker = FaceTracker(engine, detect_every=5, detector=lambda gray: BOXES)
+    frames = [cv2.cvtColor(g, cv2.COLOR_GRAY2BGR) for g in steady_frames(20, width=320, height=240)]
+    seen = []
+    FacePipeline(engine, frames, sink=seen.append, tracker=tracker, queue_size=64).run()
+
+    assert len(seen) == 20 and all(len(p.results) == 2 for p in seen)
+    assert {f["track_id"] for p in seen for f in p.results} == {0, 1}
+    assert threads and set(threads) == {"face-infer"}
+    assert tracker.stats()["infer_skip_rate"] > 0.5
@@ -0,0 +1,61 @@
+"""
+Unit tests for face tracking between detections.
+"""
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from modules.vision.face_emotion import FaceEmotionEngine
+from modules.vision.scripts.bench_face_engine import NumpyStandInModel
+from modules.vision.scripts.bench_tracking import steady_frames
+from modules.vision.tracking import FaceTracker
+
+BOXES = np.array([[40, 60, 64, 64], [200, 80, 72, 72]], dtype=np.int32)
+
+def make_tracker(**kwargs):
+    engine = FaceEmotionEngine(model=NumpyStandInModel(), face_cascade=object())
+    calls = []
+
+    def detector(gray):
+        calls.append(1)
+        return BOXES
+
+    return FaceTracker(engine, detector=detector, **kwargs), calls
+
+def test_steady_shot_skips_work():
+    """Test steady frames detect every K frames and reuse predictions."""
+    tracker, calls = make_tracker(detect_every=5)
+    outputs = [tracker.process(g) for g in steady_frames(20, width=320, height=240)]
+
+    assert len(calls) == 4
+    assert all(len(o) == 2 for o in outputs)
+    assert {f["track_id"] for o in outputs for f in o} == {0, 1}
+    stats = tracker.stats()
+    assert stats["detect_skip_rate"] == 0.8
+    assert stats["inferences"] == 2
+    assert stats["infer_skip_rate"] > 0.9
+
+def test_roi_change_triggers_inference():
+    """Test a changed face region is classified again."""
+    tracker, _ = make_tracker(detect_every=100)
+    frames = list(steady_frames(3, width=320, height=240))
+    tracker.process(frames[0])
+    tracker.process(frames[1])
+    assert tracker.inferences == 2
+
+    changed = frames[2].copy()
+    x, y, w, h = BOXES[0]
+    changed[y + h // 2:y + h, x:x + w] = 255 - changed[y + h // 2:y + h, x:x + w]
+    tracker.process(changed)
+    assert tracker.inferences > 2
+
+def test_boxes_follow_motion():
+    """Test tracked boxes move with the image between detections."""
+    tracker, calls = make_tracker(detect_every=100)
+    first = next(steady_frames(1, width=320, height=240, noise=0.0))
+    tracker.process(first)
+    shifted = np.roll(first, (8, 12), axis=(0, 1))
+    out = tracker.process(shifted)
+    assert len(calls) == 1
+    assert out[0]["box"][:2] == [int(BOXES[0][0]) + 12, int(BOXES[0][1]) + 8]
@@ -1,7 +1,13 @@
 """
 Unit tests for fusion module.
 """
-from modules.fusion.fusion import compute_emotion_state
+import numpy as np
+
+from modules.fusion.fusion import (
+    batch_to_records,
+    compute_emotion_state,
+    compute_emotion_state_batch,
+)
 
 def test_fusion_basic():
     """Test basic fusion functionality."""
@@ -26,8 +32,38 @@ def test_fusion_single_module():
     assert out["arousal"] == 0.5
     assert out["dominant_signal"] == "text"
 
+def test_fusion_batch_matches_scalar():
+    """Test batch fusion gives the scalar result for every session."""
+    rng = np.random.default_rng(0)
+    n, m = 500, 3
+    v, a, c = rng.random((n, m)), rng.random((n, m)), rng.random((n, m))
+    c[0] = 0.0  # zero total weight
+    c[1, 1] = c[1, 0]  # confidence tie
+    mask = rng.random((n, m)) > 0.3
+    mask[:, 0] = True
+    sources = ["face", "voice", "text"]
+
+    out = batch_to_records(compute_emotion_state_batch(v, a, c, sources, mask))
+    for i in range(n):
+        modules = [
+            {"valence": v[i, j], "arousal": a[i, j], "confidence": c[i, j], "source": sources[j]}
+            for j in range(m)
+            if mask[i, j]
+        ]
+        assert out[i] == compute_emotion_state(modules)
+
+def test_fusion_batch_empty_session():
+    """Test batch fusion rejects sessions without modules."""
+    try:
+        compute_emotion_state_batch([[0.5]], [[0.5]], [[0.5]], ["face"], [[False]])
+    except ValueError:
+        return
+    assert False, "expected ValueError"
+
 if __name__ == "__main__":
     test_fusion_basic()
     test_fusion_single_module()
+    test_fusion_batch_matches_scalar()
+    test_fusion_batch_empty_session()
     print("All tests passed!")
 
@@ -0,0 +1,95 @@
+"""
+Tests for the dataset preprocessing script.
+"""
+import numpy as np
+import pandas as pd
+
+from modules.text.scripts.bench_preprocess import compare, write_synthetic
+from modules.text.scripts.preprocess_datasets import MERGED_STEM, HashSet64, merge_all, run_all
+
+MERGED_NAME = MERGED_STEM + ".csv"
+
+def test_synthetic_outputs_identical(tmp_path):
+    """Test every dataset's output is byte-identical to the legacy code."""
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    write_synthetic(raw, 3000)
+    assert [r[3] for r in compare(raw, tmp_path / "work")] == [True, True, True]
+
+def test_emobank_or_chain_fallbacks(tmp_path):
+    """Test falsy values (0, missing) fall through to the next column like `or` does."""
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    write_synthetic(raw, 600)
+    pd.DataFrame({
+        "text": [0, 5, 0, 7],
+        "Text": ["zero", "five", None, "seven"],
+        "V": [0.0, 2.5, None, 0.0],
+        "valence": [1.5, 3.0, 4.0, None],
+    }).to_csv(raw / "emobank.csv", index=False)
+    results = compare(raw, tmp_path / "work")
+    assert results[1][3]
+    out = pd.read_csv(tmp_path / "work" / "new" / "emobank" / "emobank_va.csv")
+    assert out["text"].tolist() == ["zero", "5", "7"]
+
+def test_merge_all_streams_and_dedupes(tmp_path):
+    """Test the chunked merge dedupes across chunks/files, drops short texts and skips its own output."""
+    interim, processed = tmp_path / "interim", tmp_path / "processed"
+    interim.mkdir()
+    processed.mkdir()
+    pd.DataFrame({
+        "id": ["a1", "a2", "a3", "a4", "a5"],
+        "text": ["one two three", "too short", "one two three", None, "wide　space　words"],
+    }).to_csv(interim / "a.csv", index=False)
+    pd.DataFrame({
+        "id": ["b1", "b2"],
+        "text": ["one two three", "four five six seven"],
+        "valence": ["3.50", ""],
+    }).to_csv(processed / "b.csv", index=False)
+    pd.DataFrame({"text": ["stale output row here"]}).to_csv(processed / MERGED_NAME, index=False)
+
+    merge_all(chunksize=2, interim_dir=interim, processed_dir=processed)
+    out = pd.read_csv(processed / MERGED_NAME, dtype=str)
+    assert list(out.columns) == ["id", "text", "valence"]
+    assert out["id"].tolist() == ["a1", "a5", "b2"]
+    assert (processed / MERGED_NAME).read_text().splitlines()[0] == "id,text,valence"
+
+def test_hash_set():
+    """Test the sorted-run hash set membership across merges."""
+    seen = HashSet64()
+    for start in range(0, 1000, 100):
+        seen.add(np.arange(start, start + 100, dtype=np.uint64) * 7)
+    assert len(seen) == 1000 and len(seen.runs) < 10
+    probe = np.arange(0, 7100, dtype=np.uint64)
+    assert np.array_equal(seen.contains(probe), (probe % 7 == 0) & (probe < 7000))
+
+def test_run_all_rebuilds_only_changed_sources(tmp_path):
+    """Test the manifest skips unchanged datasets and reruns the merge only when needed."""
+    raw, interim, processed = tmp_path / "raw", tmp_path / "interim", tmp_path / "processed"
+    for d in (raw, interim, processed):
+        d.mkdir()
+    write_synthetic(raw, 600)
+    for k in (2, 3):
+        (raw / f"goemotions_{k}.csv").unlink()
+
+    dirs = dict(raw_dir=raw, interim_dir=interim, processed_dir=processed, jobs=2)
+    first = run_all(**dirs)
+    assert sorted(first["built"]) == ["emobank", "goemotions", "isear"]
+    assert first["missing"] == ["semeval"] and first["merged"]
+
+    second = run_all(**dirs)
+    assert second["built"] == [] and not second["merged"]
+
+    # Same content with a new mtime is still unchanged
+    path = raw / "isear.csv"
+    path.write_bytes(path.read_bytes())
+    assert run_all(**dirs)["built"] == []
+
+    with open(path, "a") as f:
+        f.write("joy,this is a brand new isear row\n")
+    third = run_all(**dirs)
+    assert third["built"] == ["isear"] and third["merged"]
+    merged = pd.read_csv(processed / MERGED_NAME)
+    assert "this is a brand new isear row" in merged["text"].tolist()
+
+    assert sorted(run_all(force=True, **dirs)["built"]) == ["emobank", "goemotions", "isear"]
@@ -0,0 +1,102 @@
+"""
+Tests for the lazy model registry and the health probes.
+"""
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as api
+from app.registry import ModelRegistry
+
+def test_lazy_load_once():
+    """Test a component loads on first get, once across threads, with timings recorded."""
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "model"
+
+    registry = ModelRegistry()
+    registry.register("m", loader, imports=("json",))
+    assert calls == [] and registry.status()["components"]["m"]["state"] == "pending"
+
+    threads = [threading.Thread(target=registry.get, args=("m",)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [1] and registry.get("m") == "model"
+    status = registry.status()["components"]["m"]
+    assert status["state"] == "ready" and status["load_ms"] >= 50 and status["import_ms"] is not None
+
+def test_warm_readiness_and_failure():
+    """Test readiness waits for warmed components and reports a failed load."""
+    release = threading.Event()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("weights missing")
+        return "ok"
+
+    registry = ModelRegistry()
+    registry.register("slow", lambda: release.wait(5))
+    registry.register("flaky", flaky)
+    assert registry.ready()
+
+    thread = registry.warm()
+    assert not registry.ready()
+    release.set()
+    thread.join()
+    status = registry.status()
+    assert not status["ready"] and status["startup_ms"] is not None
+    assert status["components"]["slow"]["state"] == "ready"
+    flaky_status = status["components"]["flaky"]
+    assert flaky_status["state"] == "failed" and flaky_status["error"] == "OSError: weights missing"
+    assert flaky_status["load_ms"] is None
+
+    assert registry.get("flaky") == "ok" and registry.ready()
+
+def test_missing_import_fails_component():
+    """Test a component whose heavy module is not installed fails without raising from warm()."""
+    registry = ModelRegistry()
+    registry.register("m", lambda: "never", imports=("soyl_no_such_module",))
+    registry.warm(background=False)
+    assert registry.status()["components"]["m"]["error"].startswith("ModuleNotFoundError")
+    with pytest.raises(ModuleNotFoundError):
+        registry.get("m")
+
+def test_health_probes(monkeypatch):
+    """Test /healthz stays up while /readyz is 503 until the models have loaded."""
+    release = threading.Event()
+    registry = ModelRegistry()
+    registry.register("text", lambda: release.wait(5))
+    monkeypatch.setattr(api, "registry", registry)
+    monkeypatch.setattr(api, "WARM", "background")
+
+    with TestClient(api.app) as client:
+        assert client.get("/healthz").json() == {"status": "ok"}
+        r = client.get("/readyz")
+        assert r.status_code == 503 and r.json()["components"]["text"]["state"] == "loading"
+        release.set()
+        for _ in range(100):
+            if registry.ready():
+                break
+            time.sleep(0.01)
+        r = client.get("/readyz")
+        assert r.status_code == 200 and r.json()["warm"] == "background"
+
+def test_app_import_skips_heavy_modules():
+    """Test importing the app loads no model libraries."""
+    code = (
+        "import sys, app.main; "
+        "print(sorted(m for m in ('torch', 'transformers', 'tensorflow', 'mediapipe', 'librosa') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
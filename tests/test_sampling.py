@@ -0,0 +1,88 @@
+"""
+Unit tests for the streaming annotation sampler.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.text.sampling import ReservoirSampler, allocate
+from modules.text.scripts import sample_for_annotation as sfa
+from modules.text.table_io import read_table, table_path, write_table
+
+def corpus(rows=1000):
+    return pd.DataFrame({
+        "id": [f"r{i}" for i in range(rows)],
+        "text": [f"text number {i}" for i in range(rows)],
+        "source": np.where(np.arange(rows) % 10 == 0, "isear", "goemotions"),
+        "raw_label": np.where(np.arange(rows) % 2 == 0, "joy", None),
+    })
+
+def draw(df, chunksize, **kwargs):
+    sampler = ReservoirSampler(50, seed=7, **kwargs)
+    for start in range(0, len(df), chunksize):
+        sampler.add(df.iloc[start:start + chunksize])
+    return sampler
+
+def test_sample_does_not_depend_on_chunking():
+    """Test the same seed draws the same rows whatever the chunk size."""
+    df = corpus()
+    ids = draw(df, 1000).result()["id"].tolist()
+    assert len(ids) == 50 and len(set(ids)) == 50
+    assert draw(df, 37).result()["id"].tolist() == ids
+
+def test_sample_is_uniform():
+    """Test every row is drawn about n/N of the time."""
+    df = corpus(40)
+    hits = pd.Series(0, index=df["id"])
+    for seed in range(400):
+        sampler = ReservoirSampler(10, seed=seed)
+        sampler.add(df.iloc[:13])
+        sampler.add(df.iloc[13:])
+        hits[sampler.result()["id"]] += 1
+    assert hits.min() > 60 and hits.max() < 140
+
+def test_stratified_allocation():
+    """Test proportional and equal allocation over source x raw_label strata."""
+    sampler = draw(corpus(), 100, stratify=["source", "raw_label"])
+    assert sampler.counts == {"goemotions / joy": 400, "goemotions / ": 500, "isear / joy": 100}
+    counts = sampler.strata(sampler.result("proportional")).value_counts().to_dict()
+    assert counts == {"goemotions / joy": 20, "goemotions / ": 25, "isear / joy": 5}
+    counts = sampler.strata(sampler.result("equal")).value_counts().to_dict()
+    assert sorted(counts.values()) == [16, 17, 17]
+
+def test_exclusion_only_replaces_excluded_rows():
+    """Test excluded IDs are never drawn and the other picks are kept."""
+    df = corpus()
+    before = draw(df, 100).result()["id"].tolist()
+    sampler = draw(df, 100, exclude=before[:10])
+    after = sampler.result()["id"].tolist()
+    assert sampler.excluded == 10 and not set(after) & set(before[:10])
+    assert set(before[10:]) <= set(after)
+
+def test_allocate_caps_small_strata():
+    """Test slots a stratum cannot fill go to the others."""
+    assert allocate({"a": 2, "b": 100, "c": 100}, 30, "equal") == {"a": 2, "b": 14, "c": 14}
+    assert allocate({"a": 1, "b": 2}, 10) == {"a": 1, "b": 2}
+    assert sum(allocate({"a": 1, "b": 1, "c": 1, "d": 997}, 10).values()) == 10
+    with pytest.raises(ValueError):
+        allocate({"a": 5}, 1, "random")
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_sample_script_streams_and_excludes(tmp_path, monkeypatch, fmt):
+    """Test sample() writes the annotation sheet and skips already annotated IDs."""
+    if fmt != "csv":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setenv("SOYL_TEXT_FORMAT", fmt)
+    monkeypatch.setattr(sfa, "PROCESSED", tmp_path)
+    monkeypatch.setattr(sfa, "ANNOT", tmp_path)
+    df = corpus(500)
+    df.loc[3, "text"] = "   "
+    write_table(df, table_path(tmp_path, "all_text_emotion_dataset"))
+    write_table(df.iloc[:200][["id"]], table_path(tmp_path, "annotation_final"))
+
+    out = sfa.sample(60, stratify=["source"], exclude=sfa.annotated_ids(sfa.annotated_tables()), chunksize=64)
+    sheet = read_table(out)
+    assert list(sheet.columns) == sfa.SAMPLE_COLUMNS and len(sheet) == 60
+    ids = sheet["id"].astype(str)
+    assert not ids.isin(df["id"].iloc[:200]).any() and "r3" not in set(ids)
+    assert (sheet["source"].astype(str) == "isear").sum() == 6
@@ -0,0 +1,52 @@
+"""
+Unit tests for offline WAV archive scoring.
+"""
+import struct
+import wave
+
+import numpy as np
+
+from modules.voice.features import heuristic_emotion
+from modules.voice.scripts.score_archive import score_file
+
+SR = 8000
+
+def write_wav(path, samples, channels=1):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(SR)
+        w.writeframes(samples.astype(np.int16).tobytes())
+
+def test_extra_chunks_are_skipped(tmp_path):
+    """Test the data chunk is found after non-audio chunks."""
+    samples = np.arange(-500, 500, dtype=np.int16)
+    plain = tmp_path / "plain.wav"
+    write_wav(plain, samples)
+    raw = plain.read_bytes()
+    # Insert a LIST chunk between fmt and data
+    extra = b"LIST" + struct.pack("<I", 5) + b"abcde" + b"\0"
+    tagged = tmp_path / "tagged.wav"
+    riff_size = struct.pack("<I", len(raw) + len(extra) - 8)
+    tagged.write_bytes(raw[:4] + riff_size + raw[8:36] + extra + raw[36:])
+
+    rows, audio_s = score_file(str(tagged))
+    plain_rows, _ = score_file(str(plain))
+    assert audio_s == len(samples) / SR
+    assert [{k: v for k, v in r.items() if k != "file"} for r in rows] == \
+        [{k: v for k, v in r.items() if k != "file"} for r in plain_rows]
+
+def test_segments_match_heuristic(tmp_path):
+    """Test each segment is scored like heuristic_emotion on that slice."""
+    rng = np.random.default_rng(0)
+    samples = (rng.normal(0, 3000, SR * 12)).astype(np.int16)
+    path = tmp_path / "clip.wav"
+    write_wav(path, samples)
+
+    rows, audio_s = score_file(str(path), segment_seconds=5.0)
+    assert audio_s == 12.0
+    assert [r["start_s"] for r in rows] == [0.0, 5.0, 10.0]
+    second = samples[5 * SR:10 * SR].astype(np.float32) / 32768.0
+    expected = heuristic_emotion(second, SR)
+    assert rows[1]["heuristic_valence"] == expected["valence"]
+    assert rows[1]["heuristic_arousal"] == expected["arousal"]
@@ -0,0 +1,58 @@
+"""
+Unit tests for streaming fusion.
+"""
+from modules.fusion.fusion import compute_emotion_state
+from modules.fusion.streaming import StreamingFusion
+
+FACE = {"valence": 0.8, "arousal": 0.6, "confidence": 0.9, "source": "face"}
+VOICE = {"valence": 0.2, "arousal": 0.4, "confidence": 0.7, "source": "voice"}
+
+def test_single_reading_matches_fusion():
+    """Test a first reading returns the plain fused state."""
+    engine = StreamingFusion()
+    assert engine.update("s1", FACE, now=0.0) == compute_emotion_state([FACE])
+
+def test_no_decay_matches_fusion():
+    """Test simultaneous readings fuse like compute_emotion_state."""
+    engine = StreamingFusion(half_life=1.0)
+    engine.update("s1", FACE, now=0.0)
+    out = engine.update("s1", VOICE, now=0.0)
+    assert out == compute_emotion_state([FACE, VOICE])
+
+def test_decay_favours_recent_readings():
+    """Test older readings lose weight over time."""
+    engine = StreamingFusion(half_life=1.0)
+    engine.update("s1", FACE, now=0.0)
+    soon = engine.update("s1", VOICE, now=0.1)["valence"]
+    engine.reset("s1")
+    engine.update("s1", FACE, now=0.0)
+    later = engine.update("s1", VOICE, now=10.0)["valence"]
+    assert later < soon
+    assert abs(later - VOICE["valence"]) < 0.01
+
+def test_sessions_are_isolated_and_grow():
+    """Test many sessions grow the store without mixing state."""
+    engine = StreamingFusion(capacity=2)
+    for i in range(10):
+        engine.update(f"s{i}", FACE if i % 2 else VOICE, now=0.0)
+    assert len(engine) == 10
+    assert engine.get("s3", now=0.0)["dominant_signal"] == "face"
+    assert engine.get("s4", now=0.0)["dominant_signal"] == "voice"
+
+def test_ttl_eviction():
+    """Test idle sessions are evicted and their slots reused."""
+    engine = StreamingFusion(ttl=5.0, capacity=4)
+    engine.update("old", FACE, now=0.0)
+    engine.update("new", VOICE, now=4.0)
+    assert engine.evict_expired(now=6.0) == 1
+    assert "old" not in engine
+    assert engine.get("new", now=6.0) is not None
+    assert engine.get("new", now=20.0) is None
+
+def test_unseen_source_never_dominant_without_decay():
+    """Test decay 0 does not turn never-seen sources into candidates for dominant_signal."""
+    engine = StreamingFusion(half_life=0)
+    out = engine.update("s", {"valence": 0.5, "arousal": 0.5, "confidence": 0.0, "source": "voice"}, now=0.0)
+    assert out["dominant_signal"] == "voice"
+    out = engine.update("s", {"valence": 0.5, "arousal": 0.5, "confidence": 0.0, "source": "text"}, now=1.0)
+    assert out["dominant_signal"] in ("voice", "text")
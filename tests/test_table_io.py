@@ -0,0 +1,79 @@
+"""
+Unit tests for the text table storage layer.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.text.table_io import TableWriter, find_table, iter_table_chunks, read_table, table_path, write_table
+
+def sample_frame():
+    return pd.DataFrame({
+        "id": ["a", "b", "c"],
+        "text": ["i like it", "not sure", None],
+        "source": ["goemotions", "emobank", "goemotions"],
+        "valence": ["0.5", "", "0.25"],
+        "annotator_1_arousal": [0.1, None, 0.3],
+    })
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_columnar_round_trip_is_typed(tmp_path, fmt):
+    """Test columnar tables store float valence/arousal and categorical source."""
+    pytest.importorskip("pyarrow")
+    path = write_table(sample_frame(), table_path(tmp_path, "t", fmt))
+    df = read_table(path)
+    assert df["valence"].dtype == np.float64 and df["annotator_1_arousal"].dtype == np.float64
+    assert isinstance(df["source"].dtype, pd.CategoricalDtype)
+    assert df["valence"].isna().tolist() == [False, True, False]
+
+    projected = read_table(path, columns=["text", "id"], memory_map=True)
+    assert list(projected.columns) == ["text", "id"]
+    assert projected["id"].tolist() == ["a", "b", "c"]
+
+def test_find_table_prefers_configured_format(tmp_path, monkeypatch):
+    """Test find_table falls back to any existing format."""
+    pytest.importorskip("pyarrow")
+    write_table(sample_frame(), table_path(tmp_path, "t", "csv"))
+    monkeypatch.setenv("SOYL_TEXT_FORMAT", "parquet")
+    assert find_table(tmp_path, "t").suffix == ".csv"
+    write_table(sample_frame(), table_path(tmp_path, "t"))
+    assert find_table(tmp_path, "t").suffix == ".parquet"
+    assert find_table(tmp_path, "missing") is None
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_table_writer_appends_chunks(tmp_path, fmt):
+    """Test chunked writes with new categories per chunk read back in order."""
+    if fmt != "csv":
+        pytest.importorskip("pyarrow")
+    path = table_path(tmp_path, "merged", fmt)
+    writer = TableWriter(path, ["id", "text", "source", "valence"])
+    writer.write(pd.DataFrame({"id": ["1", "2"], "text": ["a b c", "d e f"], "source": ["go", "eb"], "valence": ["0.5", ""]}))
+    writer.write(pd.DataFrame({"id": ["3"], "text": ["g h i"], "source": ["isear"]}))
+    writer.write(pd.DataFrame({"id": ["4"], "text": ["j k l"], "source": ["go"], "valence": ["0.75"]}))
+    writer.close()
+    assert not path.with_name(path.name + ".tmp").exists()
+
+    df = read_table(path)
+    assert df["id"].astype(str).tolist() == ["1", "2", "3", "4"]
+    assert df["source"].astype(str).tolist() == ["go", "eb", "isear", "go"]
+    assert np.allclose(df["valence"].to_numpy(dtype=float), [0.5, np.nan, np.nan, 0.75], equal_nan=True)
+    assert sum(len(c) for c in iter_table_chunks(path, chunksize=3)) == 4
+
+def test_merge_all_writes_configured_format(tmp_path, monkeypatch):
+    """Test the merge reads mixed CSV/Parquet sources and writes Parquet."""
+    pytest.importorskip("pyarrow")
+    from modules.text.scripts.preprocess_datasets import MERGED_STEM, merge_all
+
+    interim, processed = tmp_path / "interim", tmp_path / "processed"
+    interim.mkdir()
+    processed.mkdir()
+    monkeypatch.setenv("SOYL_TEXT_FORMAT", "parquet")
+    write_table(pd.DataFrame({"text": ["one two three", "x y"], "source": ["a", "a"]}), table_path(interim, "a", "csv"))
+    write_table(pd.DataFrame({"text": ["one two three", "four five six"], "source": ["b", "b"], "valence": [0.2, 0.4]}),
+                table_path(processed, "b"))
+    merge_all(interim_dir=interim, processed_dir=processed)
+
+    out = read_table(table_path(processed, MERGED_STEM))
+    assert out["text"].tolist() == ["one two three", "four five six"]
+    assert out["source"].astype(str).tolist() == ["a", "b"]
+    assert out["valence"].dtype == np.float64
@@ -0,0 +1,100 @@
+"""
+Unit tests for text backends and the micro-batcher.
+"""
+import asyncio
+
+import pytest
+
+from modules.text.backends import LexiconBackend, TextBackend, label_valences
+from modules.text.batcher import MicroBatcher
+from modules.text.text_sentiment import infer_from_text, score_text, set_backend
+
+class RecordingBackend(TextBackend):
+    def __init__(self):
+        self.batches = []
+
+    def score_batch(self, texts):
+        self.batches.append(list(texts))
+        return [{"valence": len(t), "source": "text"} for t in texts]
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    """Test concurrent submits share batches and get their own results."""
+    backend = RecordingBackend()
+    batcher = MicroBatcher(backend.score_batch, max_batch_size=8, max_wait=0.05)
+    texts = ["x" * i for i in range(1, 21)]
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(t) for t in texts))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [r["valence"] for r in results] == list(range(1, 21))
+    assert [len(b) for b in backend.batches] == [8, 8, 4]
+    assert batcher.stats()["largest_batch"] == 8
+
+def test_micro_batcher_propagates_errors():
+    """Test a failing batch fails every request in it."""
+    def fail(texts):
+        raise RuntimeError("model down")
+
+    batcher = MicroBatcher(fail, max_wait=0.0)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await batcher.submit("hi")
+        await batcher.close()
+
+    asyncio.run(run())
+
+def test_micro_batcher_rejects_short_results():
+    """Test a backend returning too few results fails the batch instead of hanging it."""
+    batcher = MicroBatcher(lambda texts: [{"valence": 0.5}], max_batch_size=4, max_wait=0.05)
+
+    async def run():
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True), 5
+        )
+        await batcher.close()
+        return results
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(run()))
+
+def test_text_backend_is_abstract():
+    """Test a backend without score_batch cannot be created."""
+    class Incomplete(TextBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_label_valences():
+    """Test label names map to valence, with an even spread as fallback."""
+    assert label_valences({0: "NEGATIVE", 1: "POSITIVE"}) == [0.0, 1.0]
+    assert label_valences({0: "negative", 1: "neutral", 2: "positive"}) == [0.0, 0.5, 1.0]
+    assert label_valences({0: "1 star", 1: "3 stars", 2: "5 stars"}) == [0.0, 0.5, 1.0]
+
+def test_set_backend_routes_scoring():
+    """Test infer_from_text uses the configured backend."""
+    try:
+        set_backend(RecordingBackend())
+        assert infer_from_text("abc")["valence"] == 3
+    finally:
+        set_backend(LexiconBackend())
+    assert infer_from_text("I like it") == score_text("I like it")
+
+def test_transformer_backend_batched_matches_single():
+    """Test a tiny random DistilBERT gives the same scores batched (padded) and one by one."""
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from modules.text.scripts.bench_batcher import tiny_transformer_backend
+
+    backend = tiny_transformer_backend()
+    texts = ["i like this", "not sure about the size maybe", "worst", "nice blue shoes fit"]
+    batched = backend.score_batch(texts)
+    for text, result in zip(texts, batched):
+        single = backend.score(text)
+        assert set(result) == {"valence", "arousal", "confidence", "source"}
+        assert 0.0 <= result["valence"] <= 1.0 and 0.5 <= result["confidence"] <= 1.0
+        for key in ("valence", "arousal", "confidence"):
+            assert result[key] == pytest.approx(single[key], abs=2e-4)
@@ -0,0 +1,58 @@
+"""
+Unit tests for the text result cache.
+"""
+from modules.text.cache import CachedScorer, ResultCache, normalize_text
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_lru_eviction_and_counters():
+    """Test the least recently used entry is evicted and counters add up."""
+    cache = ResultCache(maxsize=2, ttl=0)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.put("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (3, 1, 1, 2)
+
+def test_ttl_expiry():
+    """Test entries expire after the TTL."""
+    clock = FakeClock()
+    cache = ResultCache(maxsize=10, ttl=5.0, clock=clock)
+    cache.put("a", {"v": 1})
+    clock.now = 4.9
+    assert cache.get("a") is not None
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1 and len(cache) == 0
+
+def test_cached_scorer_normalizes_and_batches():
+    """Test the scorer runs once per normalized text, with misses batched."""
+    calls = []
+
+    def score(text):
+        calls.append(text)
+        return {"valence": len(normalize_text(text))}
+
+    def score_many(texts):
+        calls.append(list(texts))
+        return [{"valence": len(normalize_text(t))} for t in texts]
+
+    scorer = CachedScorer(score, score_many, cache=ResultCache(maxsize=10, ttl=0))
+    assert scorer("Not  Sure") == {"valence": 8}
+    assert scorer("not sure") == {"valence": 8}
+    assert calls == ["Not  Sure"]
+
+    results = scorer.many(["nice", "NOT sure", "Nice ", "maybe"])
+    assert [r["valence"] for r in results] == [4, 8, 4, 5]
+    assert calls[1] == ["nice", "maybe"]
+
+    results[0]["valence"] = -1
+    assert scorer("nice") == {"valence": 4}
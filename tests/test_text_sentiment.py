@@ -0,0 +1,46 @@
+"""
+Unit tests for the text sentiment module.
+"""
+import random
+import re
+
+from modules.text.lexicon import Lexicon
+from modules.text.text_sentiment import infer_from_text, infer_from_texts
+
+def test_infer_from_text_categories():
+    """Test the shipped lexicon keeps the stub's outputs."""
+    assert infer_from_text("I like this product a lot!")["valence"] == 0.9
+    assert infer_from_text("This is the worst")["valence"] == 0.1
+    assert infer_from_text("Not sure about the size, maybe not.")["arousal"] == 0.3
+    assert infer_from_text("Show me the blue one")["confidence"] == 0.5
+
+def test_whole_word_matching():
+    """Test keywords no longer match inside other words."""
+    assert infer_from_text("unlike the others")["confidence"] == 0.5
+    assert infer_from_text("I'm NOT   sure")["arousal"] == 0.3
+
+def test_weights_decide_category():
+    """Test the highest total weight wins and ties follow category order."""
+    lex = Lexicon([("love", "positive", 1.0), ("awful", "negative", 2.0), ("meh", "uncertain", 1.0)])
+    assert lex.classify("love it but awful") == "negative"
+    assert lex.classify("love it, meh") == "positive"
+    assert lex.score("love love meh") == {"positive": 2.0, "uncertain": 1.0}
+    assert lex.classify("nothing here") is None
+
+def test_large_lexicon_matches_reference():
+    """Test the trie regex finds the same words as a plain alternation."""
+    rng = random.Random(0)
+    words = sorted({"".join(rng.choice("abcde") for _ in range(rng.randint(2, 6))) for _ in range(3000)})
+    lex = Lexicon((w, "positive", 1.0) for w in words)
+    reference = re.compile(r"(?<!\w)(?:" + "|".join(sorted(words, key=len, reverse=True)) + r")(?!\w)")
+    for _ in range(200):
+        text = " ".join("".join(rng.choice("abcde") for _ in range(rng.randint(2, 6))) for _ in range(10))
+        assert lex.matches(text) == reference.findall(text)
+
+def test_infer_from_texts_order_and_copies():
+    """Test batch scoring keeps order and returns independent dicts for duplicates."""
+    texts = ["love it", "awful", "love it", ""]
+    results = infer_from_texts(texts)
+    assert results == [infer_from_text(t) for t in texts]
+    assert results[0] is not results[2]
+    assert infer_from_texts([]) == []
@@ -0,0 +1,43 @@
+"""
+Unit tests for shared voice features.
+"""
+import numpy as np
+
+from modules.voice.features import IncrementalFeatures, mean_abs, rms
+
+SR = 8000
+
+def test_running_energy_matches_window():
+    """Test running sums equal recomputing each window."""
+    rng = np.random.default_rng(0)
+    y = rng.normal(0, 0.1, SR * 20).astype(np.float32)
+    feats = IncrementalFeatures(SR, window=1.0, hop=0.25, refresh_every=3)
+    hop = SR // 4
+    for i, f in enumerate(feats.update(y)):
+        end = (i + 1) * hop
+        w = y[max(0, end - SR):end]
+        assert abs(f["mean_abs"] - mean_abs(w)) < 1e-6
+        assert abs(f["rms"] - rms(w)) < 1e-6
+
+def test_centroid_tracks_pitch():
+    """Test the STFT centroid follows a tone's frequency."""
+    t = np.arange(SR * 4) / SR
+    y = np.concatenate([np.sin(2 * np.pi * 500 * t), np.sin(2 * np.pi * 2500 * t)]).astype(np.float32)
+    feats = IncrementalFeatures(SR, window=1.0, hop=0.25)
+    out = feats.update(y)
+    assert abs(out[len(out) // 2 - 1]["centroid"] - 500) < 100
+    assert abs(out[-1]["centroid"] - 2500) < 100
+
+def test_centroid_covers_every_sample():
+    """Test the running centroid equals a full half-overlap STFT over the window."""
+    rng = np.random.default_rng(1)
+    y = rng.normal(0, 0.1, SR * 6).astype(np.float32)
+    n_fft, step, hop = 256, 128, SR // 4
+    hann = np.hanning(n_fft)
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / SR)
+    feats = IncrementalFeatures(SR, window=1.0, hop=0.25, n_fft=n_fft)
+    for i, f in enumerate(feats.update(y)):
+        end = (i + 1) * hop
+        starts = [s for s in range(0, end - n_fft + 1, step) if s >= end - SR]
+        S = np.abs(np.fft.rfft(np.stack([y[s:s + n_fft] for s in starts]) * hann, axis=1))
+        assert abs(f["centroid"] - (S @ freqs).sum() / S.sum()) < 1e-3
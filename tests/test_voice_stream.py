@@ -0,0 +1,65 @@
+"""
+Unit tests for the ring-buffer voice stream.
+"""
+import wave
+
+import numpy as np
+
+from modules.voice.stream import RingBuffer, VoiceStream, array_blocks, wav_blocks
+from modules.voice.voice_emotion import infer_from_audio_chunk
+
+SR = 8000
+
+def make_audio(seconds=3.0, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(SR * seconds)
+    return (rng.normal(0, 0.05, n) * np.linspace(0, 1, n)).astype(np.float32)
+
+def test_ring_buffer_latest_is_contiguous_view():
+    """Test the latest window matches the tail of the input without copying."""
+    ring = RingBuffer(1000)
+    audio = make_audio()
+    for block in array_blocks(audio, 337):
+        ring.write(block)
+        view = ring.latest(1000)
+        assert np.shares_memory(view, ring._buf)
+        expected = audio[:ring.total_written][-1000:]
+        assert np.array_equal(view[:, 0], expected)
+
+def test_stream_results_independent_of_block_size():
+    """Test every hop scores the last window of the input."""
+    audio = make_audio()
+    window, hop = int(SR * 1.0), int(SR * 0.25)
+    expected = [
+        infer_from_audio_chunk(audio[end - window:end].reshape(-1, 1))
+        for end in range(window, len(audio) + 1, hop)
+    ]
+    for block in (1, 100, 2000, 5000, len(audio)):
+        stream = VoiceStream(samplerate=SR, window=1.0, hop=0.25, infer=infer_from_audio_chunk)
+        got = list(stream.run(array_blocks(audio, block)))
+        assert [{k: r[k] for k in e} for r, e in zip(got, expected)] == expected
+        assert len(got) == len(expected)
+
+def test_incremental_stream_matches_window_scoring():
+    """Test the default running-sum path agrees with rescoring each window."""
+    audio = make_audio(6.0)
+    exact = VoiceStream(samplerate=SR, window=1.0, hop=0.25, infer=infer_from_audio_chunk)
+    fast = VoiceStream(samplerate=SR, window=1.0, hop=0.25)
+    for a, b in zip(exact.run(array_blocks(audio, 300)), fast.run(array_blocks(audio, 300))):
+        for key in ("valence", "arousal", "confidence"):
+            assert abs(a[key] - b[key]) <= 1e-4
+
+def test_wav_source(tmp_path):
+    """Test a WAV file streams through the same path."""
+    audio = make_audio(2.0)
+    path = tmp_path / "clip.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SR)
+        w.writeframes((audio * 32767).astype(np.int16).tobytes())
+
+    stream = VoiceStream(samplerate=SR, window=1.0, hop=0.5)
+    results = list(stream.run(wav_blocks(str(path), 777)))
+    assert [r["t_end"] for r in results] == [1.0, 1.5, 2.0]
+    assert results[-1]["arousal"] > results[0]["arousal"]